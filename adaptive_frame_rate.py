@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Adaptive Capture Frame Rate
+
+Varies the screen capture rate with what is happening on screen instead of
+sampling at one fixed fps. Any interaction (mouse, keyboard) or a visible
+change between consecutive frames raises the rate to the ceiling; while
+nothing happens it decays exponentially toward the floor. Idle stretches
+cost a few frames per second, bursts such as typing into a Murex grid or a
+double-click are captured at the full rate.
+
+Frames are encoded as captured, so the recorder stores the actual capture
+time of every frame in the frame sidecar.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_FLOOR_FPS = 2
+HOLD_SECONDS = 1.0  # stay at the ceiling this long after the last activity
+DECAY_HALF_LIFE = 1.5  # seconds for the rate to halve once the hold has passed
+CHANGE_THUMBNAIL_SIZE = (64, 36)
+CHANGE_THRESHOLD = 1.5  # mean absolute grey-level difference of the thumbnails
+
+
+class FrameChangeDetector:
+    """Cheap visual activity check on a small greyscale thumbnail of each frame"""
+
+    def __init__(self, threshold: float = CHANGE_THRESHOLD):
+        self.threshold = threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def changed(self, frame: np.ndarray) -> bool:
+        """Whether frame differs visibly from the previous frame passed in"""
+        thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), CHANGE_THUMBNAIL_SIZE,
+                               interpolation=cv2.INTER_AREA).astype(np.int16)
+        previous, self._previous = self._previous, thumbnail
+        if previous is None:
+            return False
+        return float(np.mean(np.abs(thumbnail - previous))) > self.threshold
+
+
+class AdaptiveFrameRate:
+    """Capture interval controller: ceiling on activity, exponential decay to the floor when idle"""
+
+    def __init__(self, ceiling_fps: float, floor_fps: float = DEFAULT_FLOOR_FPS,
+                 hold_seconds: float = HOLD_SECONDS, half_life: float = DECAY_HALF_LIFE):
+        self.ceiling_fps = ceiling_fps
+        self.floor_fps = min(floor_fps, ceiling_fps)
+        self.hold_seconds = hold_seconds
+        self.half_life = half_life
+        self.current_fps = ceiling_fps
+        self.last_activity_time = float('-inf')
+        self.wakeup = threading.Event()
+        self._intervals = 0
+        self._fps_total = 0.0
+
+    def on_activity(self, timestamp: float) -> None:
+        """Activity at session time timestamp: back to the ceiling, wake a sleeping capture loop"""
+        self.last_activity_time = timestamp
+        if self.current_fps < self.ceiling_fps:
+            self.wakeup.set()
+
+    def interval(self, now: float) -> float:
+        """Seconds until the next capture"""
+        idle = now - self.last_activity_time - self.hold_seconds
+        if idle <= 0:
+            fps = self.ceiling_fps
+        else:
+            fps = max(self.floor_fps, self.ceiling_fps * 0.5 ** (idle / self.half_life))
+        self.current_fps = fps
+        self._intervals += 1
+        self._fps_total += fps
+        return 1.0 / fps
+
+    def wait(self, seconds: float) -> None:
+        """Sleep until the next capture, returning early if activity arrives"""
+        self.wakeup.wait(seconds)
+        self.wakeup.clear()
+
+    def describe(self) -> Dict:
+        """Settings and average rate stored in the frame sidecar"""
+        return {
+            'ceiling_fps': self.ceiling_fps,
+            'floor_fps': self.floor_fps,
+            'hold_seconds': self.hold_seconds,
+            'half_life': self.half_life,
+            'average_target_fps': round(self._fps_total / self._intervals, 2) if self._intervals else None
+        }
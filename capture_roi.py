@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Region-of-interest Capture
+
+Limits screen grabs to the part of the monitor that matters: either the
+frontmost application's window (tracked through Quartz window bounds, e.g.
+the Murex client) or a fixed user-chosen rectangle. Frames of a changing
+region are letterboxed into the fixed output size chosen at start, and the
+current transform maps screen points to output pixels so click coordinates
+can be rewritten into ROI space.
+"""
+
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from Quartz import (
+        CGWindowListCopyWindowInfo, kCGWindowListOptionOnScreenOnly,
+        kCGWindowListExcludeDesktopElements, kCGNullWindowID
+    )
+    from AppKit import NSWorkspace
+    QUARTZ_AVAILABLE = True
+except ImportError:
+    QUARTZ_AVAILABLE = False
+
+WINDOW_POLL_INTERVAL = 0.5  # seconds between frontmost-window bound lookups
+MIN_REGION_SIZE = 100  # points; smaller windows (palettes, tooltips) are ignored
+WINDOW_OUTPUT_SIZE = (1920, 1080)  # fixed output for window tracking (capped to the monitor)
+
+
+def clamp_region(region: Dict, monitor: Dict) -> Optional[Dict]:
+    """Intersect a region with the monitor (mss-style dicts in screen points)"""
+    left = max(region['left'], monitor['left'])
+    top = max(region['top'], monitor['top'])
+    right = min(region['left'] + region['width'], monitor['left'] + monitor['width'])
+    bottom = min(region['top'] + region['height'], monitor['top'] + monitor['height'])
+    if right - left < MIN_REGION_SIZE or bottom - top < MIN_REGION_SIZE:
+        return None
+    return {'left': int(left), 'top': int(top), 'width': int(right - left), 'height': int(bottom - top)}
+
+
+def frontmost_window_bounds() -> Optional[Dict]:
+    """Bounds of the frontmost application's main on-screen window, in screen points"""
+    if not QUARTZ_AVAILABLE:
+        return None
+    try:
+        pid = NSWorkspace.sharedWorkspace().frontmostApplication().processIdentifier()
+        if pid == os.getpid():
+            # The recorder's own window (e.g. while pressing Start) is never the ROI
+            return None
+        windows = CGWindowListCopyWindowInfo(
+            kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements, kCGNullWindowID
+        )
+        for window in windows or []:
+            if window.get('kCGWindowOwnerPID') != pid or window.get('kCGWindowLayer', 0) != 0:
+                continue
+            bounds = window.get('kCGWindowBounds') or {}
+            if bounds.get('Width', 0) >= MIN_REGION_SIZE and bounds.get('Height', 0) >= MIN_REGION_SIZE:
+                return {'left': int(bounds['X']), 'top': int(bounds['Y']),
+                        'width': int(bounds['Width']), 'height': int(bounds['Height'])}
+    except Exception:
+        return None
+    return None
+
+
+def letterbox(frame: np.ndarray, out_width: int, out_height: int) -> Tuple[np.ndarray, float, int, int]:
+    """Fit frame into out_width x out_height keeping its aspect ratio (black bars)
+
+    Returns (canvas, scale, pad_x, pad_y).
+    """
+    height, width = frame.shape[:2]
+    if (width, height) == (out_width, out_height):
+        return frame, 1.0, 0, 0
+    scale = min(out_width / width, out_height / height)
+    new_width, new_height = max(1, int(width * scale)), max(1, int(height * scale))
+    resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    canvas = np.zeros((out_height, out_width, 3), dtype=np.uint8)
+    pad_x, pad_y = (out_width - new_width) // 2, (out_height - new_height) // 2
+    canvas[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = resized
+    return canvas, scale, pad_x, pad_y
+
+
+class RoiTracker:
+    """Current capture region: the frontmost window ('window') or a fixed rectangle"""
+
+    def __init__(self, roi, monitor: Dict):
+        self.mode = 'window' if roi == 'window' else 'rect'
+        self.monitor = monitor
+        if self.mode == 'rect':
+            self.region = clamp_region(roi, monitor) or dict(monitor)
+        else:
+            bounds = frontmost_window_bounds()
+            self.region = (clamp_region(bounds, monitor) if bounds else None) or dict(monitor)
+        self._last_poll = time.monotonic()
+
+    def output_size(self, pixels_per_point: float, max_width: int, max_height: int) -> Tuple[int, int]:
+        """Fixed (even) output frame size: the rectangle's pixel size, or WINDOW_OUTPUT_SIZE"""
+        if self.mode == 'rect':
+            width = int(self.region['width'] * pixels_per_point)
+            height = int(self.region['height'] * pixels_per_point)
+        else:
+            width, height = WINDOW_OUTPUT_SIZE
+        width, height = min(width, max_width), min(height, max_height)
+        return width - width % 2, height - height % 2
+
+    def current_region(self) -> Dict:
+        """Region to grab now; window bounds are re-read at most every WINDOW_POLL_INTERVAL"""
+        if self.mode == 'window' and time.monotonic() - self._last_poll >= WINDOW_POLL_INTERVAL:
+            self._last_poll = time.monotonic()
+            bounds = frontmost_window_bounds()
+            region = clamp_region(bounds, self.monitor) if bounds else None
+            if region:
+                self.region = region
+        return self.region
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Click-anchored Region Snapshots
+
+Captures a crop around every click straight from the video recorder's
+in-memory frame ring: one frame from just before the press and one from
+shortly after it. Crops are JPEG-encoded on a worker thread and attached to
+the click event as 'visual_context', so prompt builders get per-click
+close-ups without decoding the video afterwards.
+"""
+
+import base64
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+DEFAULT_CROP_SIZE = (360, 240)  # width, height in frame pixels
+DEFAULT_AFTER_DELAY = 0.4  # seconds after the press for the "after" frame
+DEFAULT_JPEG_QUALITY = 70
+MAX_WAIT_FOR_FRAME = 1.5  # seconds to wait for the "after" frame to be captured
+
+
+class ClickSnapshotter:
+    """Turns mouse_press events into before/after JPEG crops from a recorder's frame ring
+
+    frame_source must provide snapshot_frames() -> [(session_time, BGR frame)],
+    latest_frame_time(), screen_to_frame(x, y) and a recording flag (see
+    MultiScreenVideoRecorder). A source with recorder_for_point(x, y), such as
+    MultiMonitorRecorder, is asked for the pipeline of the monitor clicked on.
+    """
+
+    def __init__(self, frame_source, crop_size: Tuple[int, int] = DEFAULT_CROP_SIZE,
+                 after_delay: float = DEFAULT_AFTER_DELAY, jpeg_quality: int = DEFAULT_JPEG_QUALITY):
+        self.frame_source = frame_source
+        self.crop_size = crop_size
+        self.after_delay = after_delay
+        self.jpeg_quality = jpeg_quality
+        self.snapshot_count = 0
+        self.active = False
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self.active = True
+        self.snapshot_count = 0
+        self._worker = threading.Thread(target=self._run)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def on_interaction(self, interaction: Dict) -> None:
+        """Interaction logger listener: queue clicks, never block the mouse thread"""
+        if self.active and interaction.get('type') == 'mouse_press':
+            source = self._source_for(interaction)
+            if source is None:
+                return
+            # Hold a reference to the frame on screen at the press; nothing is copied here
+            before = self._frame_before(source.snapshot_frames(), interaction['timestamp'])
+            self._queue.put((interaction, source, before))
+
+    def _source_for(self, interaction: Dict):
+        resolve = getattr(self.frame_source, 'recorder_for_point', None)
+        if resolve is None:
+            return self.frame_source
+        position = interaction.get('position', {})
+        return resolve(position.get('x', 0), position.get('y', 0))
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the queued clicks (so they are attached before the log is saved)"""
+        if not self.active:
+            return
+        self.active = False
+        self._queue.put(None)
+        if self._worker:
+            self._worker.join(timeout=timeout)
+        print(f"🖼️ Click snapshots captured: {self.snapshot_count}")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._capture(*item)
+            except Exception as e:
+                print(f"⚠️ Click snapshot error: {e}")
+
+    def _capture(self, event: Dict, source, before: Optional[Tuple[float, object]]) -> None:
+        click_time = event['timestamp']
+        after_time = click_time + self.after_delay
+
+        # Wait (briefly) until the recorder has captured a frame after the click
+        deadline = time.monotonic() + MAX_WAIT_FOR_FRAME
+        while source.latest_frame_time() < after_time and time.monotonic() < deadline:
+            if not source.recording:
+                break
+            time.sleep(0.05)
+
+        frames = source.snapshot_frames()
+        if not frames:
+            return
+
+        before = before or frames[0]
+        after = self._frame_after(frames, after_time)
+        position = event.get('position', {})
+        center = source.screen_to_frame(position.get('x', 0), position.get('y', 0))
+        if center is None:
+            return
+
+        crop_box = None
+        context = {}
+        for label, (frame_time, frame) in (('before', before), ('after', after)):
+            crop, crop_box = self._crop(frame, center)
+            ok, jpeg = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+            context[label] = {
+                'frame_time': round(frame_time, 3),
+                'jpeg_base64': base64.b64encode(jpeg.tobytes()).decode('ascii')
+            }
+        if context:
+            context['crop'] = crop_box
+            event['visual_context'] = context
+            self.snapshot_count += 1
+
+    @staticmethod
+    def _frame_before(frames: List[Tuple[float, object]], timestamp: float) -> Optional[Tuple[float, object]]:
+        candidates = [item for item in frames if item[0] <= timestamp]
+        return candidates[-1] if candidates else (frames[0] if frames else None)
+
+    @staticmethod
+    def _frame_after(frames: List[Tuple[float, object]], timestamp: float) -> Tuple[float, object]:
+        for item in frames:
+            if item[0] >= timestamp:
+                return item
+        return frames[-1]
+
+    def _crop(self, frame, center: Tuple[int, int]):
+        """Crop of crop_size centred on the click, shifted to stay inside the frame"""
+        height, width = frame.shape[:2]
+        crop_width, crop_height = min(self.crop_size[0], width), min(self.crop_size[1], height)
+        left = min(max(0, center[0] - crop_width // 2), width - crop_width)
+        top = min(max(0, center[1] - crop_height // 2), height - crop_height)
+        crop_box = {'x': left, 'y': top, 'width': crop_width, 'height': crop_height}
+        return frame[top:top + crop_height, left:left + crop_width], crop_box
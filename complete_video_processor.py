@@ -8,12 +8,16 @@ complete workflows from start to finish without missing any steps.
 
 import json
 import base64
-import requests
+import math
 import os
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass
 from enhanced_murex_rpa_generator import EnhancedMurexRpaGenerator, UIInteraction
+from recording_session import RecordingSession
+from rpa_tracing import annotate, span, traced
+import timeline_analytics
+from hedged_generation import HedgedRequestRunner, CancelToken
 
 class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
     """Processes complete video from start to finish ensuring no steps are missed"""
@@ -28,43 +32,23 @@ class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
             "include_idle_moments": True
         }
     
-    def analyze_complete_video_duration(self, json_path: str) -> Tuple[float, float, int]:
+    @traced()
+    def analyze_complete_video_duration(self, json_path: Union[str, RecordingSession]) -> Tuple[float, float, int]:
         """Analyze the complete duration and interaction spread"""
         
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        session = RecordingSession.coerce(json_path)
         
-        # Get session duration
-        session_duration = data.get('session_info', {}).get('duration', 0)
-        
-        # Find first and last interaction timestamps
-        all_timestamps = []
-        
-        # Collect all timestamps
-        for event in data.get('mouse_interactions', []):
-            if 'timestamp' in event:
-                all_timestamps.append(event['timestamp'])
-        
-        for event in data.get('keyboard_events', []):
-            if 'timestamp' in event:
-                all_timestamps.append(event['timestamp'])
-        
-        for event in data.get('app_switches', []):
-            if 'timestamp' in event:
-                all_timestamps.append(event['timestamp'])
-        
-        if all_timestamps:
-            first_interaction = min(all_timestamps)
-            last_interaction = max(all_timestamps)
-        else:
-            first_interaction = 0
-            last_interaction = session_duration
+        # Session duration plus first and last interaction timestamps
+        session_duration = session.duration
+        first_interaction, last_interaction = session.interaction_span
         
         return session_duration, first_interaction, last_interaction
     
+    @traced()
     def create_complete_timeline(self, interactions: List[UIInteraction], 
                                session_duration: float, first_interaction: float, 
-                               last_interaction: float) -> str:
+                               last_interaction: float, 
+                               session: Optional[RecordingSession] = None) -> str:
         """Create timeline ensuring complete video coverage"""
         
         timeline = []
@@ -95,21 +79,35 @@ class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
         timeline.append("COMPLETE INTERACTION SEQUENCE (chronological order):")
         timeline.append("")
         
+        segmented = session is not None and session.video_is_segmented
+        if segmented:
+            timeline.append("⏸️ Idle periods were cut or sped up in this video; 'video' times give the position in the file")
+            timeline.append("")
+        
         for i, interaction in enumerate(interactions, 1):
-            timeline.append(f"{i:2d}. [{interaction.timestamp:6.1f}s] {interaction.description}")
+            if segmented:
+                video_time = session.video_time_at(interaction.timestamp)
+                timeline.append(f"{i:2d}. [{interaction.timestamp:6.1f}s | video {video_time:6.1f}s] {interaction.description}")
+            else:
+                timeline.append(f"{i:2d}. [{interaction.timestamp:6.1f}s] {interaction.description}")
             if interaction.coordinates:
                 timeline.append(f"     📍 Location: {interaction.coordinates}")
             if interaction.text_content:
                 timeline.append(f"     📝 Text: '{interaction.text_content}'")
             if interaction.ui_context:
                 timeline.append(f"     🎯 Context: {interaction.ui_context}")
+            if interaction.visual_context:
+                timeline.append(f"     🖼️ Close-up attached: click at {interaction.timestamp:.1f}s (before/after)")
         
         # Add coverage gaps analysis
         timeline.append("")
         timeline.append("🔍 COVERAGE ANALYSIS:")
         
         # Check for gaps in interactions
-        gaps = self._find_interaction_gaps(interactions, session_duration)
+        if session:
+            gaps = session.memoize(('gaps', 5.0), lambda: self._find_interaction_gaps(interactions, session_duration))
+        else:
+            gaps = self._find_interaction_gaps(interactions, session_duration)
         if gaps:
             timeline.append("   ⚠️  Potential gaps in interactions:")
             for gap in gaps:
@@ -118,11 +116,24 @@ class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
         else:
             timeline.append("   ✅ Good interaction coverage throughout video")
         
+        # Busiest periods deserve the closest frame-by-frame attention
+        if session:
+            density = session.memoize(('density', 5.0), lambda: self._interaction_density(interactions, session_duration))
+        else:
+            density = self._interaction_density(interactions, session_duration)
+        busiest = sorted((count, start) for start, count in zip(density['bin_starts'], density['counts']) if count)
+        if busiest:
+            bin_seconds = density['bin_seconds']
+            timeline.append("   📈 Busiest periods (analyze these closely):")
+            for count, start in sorted(busiest[-3:], key=lambda period: period[1]):
+                timeline.append(f"      {start:.1f}s - {start + bin_seconds:.1f}s: {count} interactions")
+        
         timeline.append("")
         timeline.append("=" * 80)
         
         return "\n".join(timeline)
     
+    @traced()
     def _find_interaction_gaps(self, interactions: List[UIInteraction], 
                               session_duration: float, gap_threshold: float = 5.0) -> List[Dict]:
         """Find gaps between interactions that might contain important workflow steps"""
@@ -130,6 +141,10 @@ class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
         if not interactions:
             return [{'start': 0, 'end': session_duration, 'duration': session_duration}]
         
+        if timeline_analytics.NUMPY_AVAILABLE:
+            timestamps = timeline_analytics.timestamp_array(interactions)
+            return timeline_analytics.find_gaps(timestamps, session_duration, gap_threshold)
+        
         gaps = []
         
         # Sort interactions by timestamp
@@ -168,6 +183,27 @@ class CompleteVideoProcessor(EnhancedMurexRpaGenerator):
         
         return gaps
     
+    @traced()
+    def _interaction_density(self, interactions: List[UIInteraction], session_duration: float,
+                             bin_seconds: float = 5.0) -> Dict[str, List]:
+        """Interaction counts per bin_seconds bucket over the whole session"""
+        
+        if timeline_analytics.NUMPY_AVAILABLE:
+            timestamps = timeline_analytics.timestamp_array(interactions)
+            return timeline_analytics.interaction_density(timestamps, session_duration, bin_seconds)
+        
+        span_end = max([session_duration] + [interaction.timestamp for interaction in interactions])
+        bin_count = max(1, math.ceil(span_end / bin_seconds))
+        counts = [0] * bin_count
+        for interaction in interactions:
+            counts[min(max(int(interaction.timestamp // bin_seconds), 0), bin_count - 1)] += 1
+        return {
+            'bin_seconds': bin_seconds,
+            'bin_starts': [index * bin_seconds for index in range(bin_count)],
+            'counts': counts
+        }
+    
+    @traced()
     def create_complete_workflow_prompt(self, complete_timeline: str, 
                                       session_duration: float) -> str:
         """Create enhanced prompt that emphasizes complete video analysis"""
@@ -318,13 +354,23 @@ Generate the COMPLETE RPA workflow commands that document every step from video
 
         return prompt
     
-    def process_complete_workflow(self, video_path: str, json_path: str) -> str:
-        """Process the complete video ensuring end-to-end coverage"""
+    @traced()
+    def process_complete_workflow(self, video_path: str, json_path: Union[str, RecordingSession],
+                                  hedged: bool = False) -> str:
+        """Process the complete video ensuring end-to-end coverage
+        
+        With hedged=True several generation configs are raced (see
+        RpaConfig.HEDGE_*) and the best scoring workflow is kept. json_path
+        may be an already parsed RecordingSession (the daemon keeps them warm).
+        """
         
         print("Processing video for RPA workflow generation...")
         
-        # Validate inputs (silently)
-        validation_results = self.validator.validate_complete_workflow(video_path, json_path)
+        # Parse the recording once and share it with every step below
+        session = RecordingSession.coerce(json_path, video_path)
+        
+        # Validate inputs (silently); the slow video health check is left to rpa_cli.py validate
+        validation_results = self.validator.validate_complete_workflow(video_path, session, health_check=False)
         
         has_errors = False
         for category, results in validation_results.items():
@@ -337,28 +383,30 @@ Generate the COMPLETE RPA workflow commands that document every step from video
             return None
         
         # Analyze video and extract interactions
-        session_duration, first_interaction, last_interaction = self.analyze_complete_video_duration(json_path)
-        interactions = self.extract_enhanced_interactions(json_path)
+        session_duration, first_interaction, last_interaction = self.analyze_complete_video_duration(session)
+        interactions = self.extract_enhanced_interactions(session)
         
         # Create complete timeline
         complete_timeline = self.create_complete_timeline(
-            interactions, session_duration, first_interaction, last_interaction
+            interactions, session_duration, first_interaction, last_interaction, session
         )
         
         # Create complete workflow prompt
         prompt = self.create_complete_workflow_prompt(complete_timeline, session_duration)
         
         # Check video file
-        size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        size_mb = session.video_size_mb
         if size_mb > self.config.MAX_FILE_SIZE_MB:
             print(f"❌ Video file too large: {size_mb:.1f} MB")
             return None
         
         # Encode video
         try:
-            with open(video_path, 'rb') as f:
-                video_bytes = f.read()
-            video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+            with span("encode_video") as encode_span:
+                with open(video_path, 'rb') as f:
+                    video_bytes = f.read()
+                video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+                encode_span.set(bytes=len(video_bytes), encoded_bytes=len(video_base64))
         except Exception as e:
             print(f"❌ Error encoding video: {e}")
             return None
@@ -377,8 +425,81 @@ Generate the COMPLETE RPA workflow commands that document every step from video
             "fps": self.complete_video_config["fps"]  # Ensure good coverage
         }
         
-        # Prepare API request
-        payload = {
+        # Click close-ups captured live by the recorder (no video decode needed)
+        image_parts = self._click_snapshot_parts(interactions)
+        
+        print(f"Analyzing complete video ({session_duration:.1f}s) for end-to-end workflow...")
+        
+        try:
+            if hedged:
+                rpa_commands, completion_score = self._generate_hedged(
+                    prompt, video_base64, complete_video_metadata, complete_config,
+                    session_duration, interactions, image_parts
+                )
+            else:
+                payload = self._build_video_payload(prompt, video_base64, complete_video_metadata,
+                                                    complete_config, image_parts)
+                rpa_commands = self._request_rpa_commands(payload, timeout=600)  # Longer timeout
+                completion_score = None
+                if rpa_commands:
+                    # Validate that we got a complete workflow
+                    completion_score = self._assess_workflow_completeness(
+                        rpa_commands, session_duration, interactions
+                    )
+        except Exception as e:
+            print(f"❌ Processing error: {e}")
+            return None
+        
+        if not rpa_commands:
+            return None
+        
+        # Only output if completeness is adequate
+        if completion_score['score'] < 6:
+            print(f"⚠️  Workflow completeness score: {completion_score['score']:.1f}/10")
+            print("❌ Generated workflow may be incomplete - missing key elements")
+            if not completion_score['has_login']:
+                print("   Missing: Login sequence")
+            if not completion_score['has_completion']:
+                print("   Missing: Completion/final state")
+            if not completion_score['adequate_length']:
+                print("   Missing: Adequate detail level")
+            if not completion_score['has_murex_patterns']:
+                print(f"   Missing: Murex UI patterns (found {completion_score['murex_pattern_count']}/8)")
+            if not completion_score['has_structured_format']:
+                print("   Missing: Structured format with numbered steps and headers")
+            print("🔄 Consider re-processing with better video quality or longer recording")
+            return None
+        
+        # Save clean RPA commands only
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_name = f"{base_name}_RPA_commands.txt"
+        
+        output_dir = self.config.ensure_output_dir()
+        output_path = os.path.join(output_dir, output_name)
+        
+        # Save only the clean RPA commands
+        with span("write_output", bytes=len(rpa_commands)), open(output_path, 'w') as f:
+            f.write(rpa_commands)
+        
+        print(f"✅ Complete RPA workflow saved to: {output_path}")
+        print(f"✅ Completeness score: {completion_score['score']:.1f}/10")
+        print(f"✅ Murex UI patterns: {completion_score['murex_pattern_count']}/8 detected")
+        print(f"✅ Structured format: {'Yes' if completion_score['has_structured_format'] else 'No'}")
+        
+        # Output the clean RPA commands directly
+        print("\n" + "="*50)
+        print("RPA WORKFLOW COMMANDS:")
+        print("="*50)
+        print(rpa_commands)
+        print("="*50)
+        
+        return rpa_commands
+    
+    @traced()
+    def _build_video_payload(self, prompt: str, video_base64: str, video_metadata: Dict,
+                             generation_config: Dict, image_parts: Optional[List[Dict]] = None) -> Dict:
+        """Build a generateContent payload with the prompt, inline video and any click close-ups"""
+        return {
             "contents": [
                 {
                     "parts": [
@@ -388,94 +509,136 @@ Generate the COMPLETE RPA workflow commands that document every step from video
                                 "mime_type": "video/mp4",
                                 "data": video_base64
                             },
-                            "video_metadata": complete_video_metadata
-                        }
+                            "video_metadata": video_metadata
+                        },
+                        *(image_parts or [])
                     ]
                 }
             ],
-            "generationConfig": complete_config
+            "generationConfig": generation_config
         }
-        
-        # Make API request
+    
+    @traced()
+    def _click_snapshot_parts(self, interactions: List[UIInteraction]) -> List[Dict]:
+        """Labelled inline JPEG parts for the clicks that carry recorder close-ups"""
+        parts = []
+        clicks = [i for i in interactions if i.visual_context][:self.config.MAX_CLICK_SNAPSHOTS]
+        for interaction in clicks:
+            for label in ('before', 'after'):
+                snapshot = interaction.visual_context.get(label)
+                if not snapshot:
+                    continue
+                parts.append({"text": f"Close-up of the click at {interaction.timestamp:.1f}s ({label} the click):"})
+                parts.append({"inline_data": {"mime_type": "image/jpeg", "data": snapshot['jpeg_base64']}})
+        return parts
+    
+    @traced()
+    def _request_rpa_commands(self, payload: Dict, timeout: int) -> Optional[str]:
+        """Send a single generateContent request and return the candidate text"""
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.config.GEMINI_MODEL}:generateContent"
         headers = {
             "Content-Type": "application/json",
             "x-goog-api-key": self.api_key
         }
         
-        print(f"Analyzing complete video ({session_duration:.1f}s) for end-to-end workflow...")
+        with self.api_slot():
+            response = self.http.post(url, headers=headers, json=payload, timeout=timeout)
+        annotate(response_bytes=len(response.content))
         
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=600)  # Longer timeout
+        if response.status_code != 200:
+            print(f"❌ API Error: HTTP {response.status_code}")
+            if response.text:
+                print(f"Error details: {response.text[:300]}")
+            return None
+        
+        result = response.json()
+        usage = result.get("usageMetadata", {})
+        annotate(prompt_tokens=usage.get('promptTokenCount', 0),
+                 output_tokens=usage.get('candidatesTokenCount', 0),
+                 total_tokens=usage.get('totalTokenCount', 0))
+        
+        # Extract complete RPA commands
+        if "candidates" in result and len(result["candidates"]) > 0:
+            candidate = result["candidates"][0]
+            if "content" in candidate and "parts" in candidate["content"]:
+                text_parts = [part.get("text", "") for part in candidate["content"]["parts"]]
+                return "".join(text_parts).strip()
+        
+        return None
+    
+    @traced()
+    def _stream_rpa_commands(self, payload: Dict, timeout: int, token: CancelToken) -> Optional[str]:
+        """Stream a generateContent request so a losing hedge can be aborted mid-flight"""
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.config.GEMINI_MODEL}:streamGenerateContent?alt=sse"
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key
+        }
+        
+        # A session of its own so a losing hedge can be closed without touching the pool
+        import requests
+        with self.api_slot(token) as granted, requests.Session() as http:
+            # A loser cancelled while queued for a slot never uploads the video
+            if not granted or token.is_cancelled():
+                return None
+            token.add_callback(http.close)
+            response = http.post(url, headers=headers, json=payload, timeout=timeout, stream=True)
+            token.add_callback(response.close)
             
-            if response.status_code == 200:
-                result = response.json()
-                
-                
-                # Extract complete RPA commands
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    candidate = result["candidates"][0]
-                    if "content" in candidate and "parts" in candidate["content"]:
-                        text_parts = [part.get("text", "") for part in candidate["content"]["parts"]]
-                        rpa_commands = "".join(text_parts).strip()
-                        
-                        # Validate that we got a complete workflow
-                        completion_score = self._assess_workflow_completeness(
-                            rpa_commands, session_duration, interactions
-                        )
-                        
-                        # Only output if completeness is adequate
-                        if completion_score['score'] < 6:
-                            print(f"⚠️  Workflow completeness score: {completion_score['score']:.1f}/10")
-                            print("❌ Generated workflow may be incomplete - missing key elements")
-                            if not completion_score['has_login']:
-                                print("   Missing: Login sequence")
-                            if not completion_score['has_completion']:
-                                print("   Missing: Completion/final state")
-                            if not completion_score['adequate_length']:
-                                print("   Missing: Adequate detail level")
-                            if not completion_score['has_murex_patterns']:
-                                print(f"   Missing: Murex UI patterns (found {completion_score['murex_pattern_count']}/8)")
-                            if not completion_score['has_structured_format']:
-                                print("   Missing: Structured format with numbered steps and headers")
-                            print("🔄 Consider re-processing with better video quality or longer recording")
-                            return None
-                        
-                        # Save clean RPA commands only
-                        base_name = os.path.splitext(os.path.basename(video_path))[0]
-                        output_name = f"{base_name}_RPA_commands.txt"
-                        
-                        output_dir = self.config.ensure_output_dir()
-                        output_path = os.path.join(output_dir, output_name)
-                        
-                        # Save only the clean RPA commands
-                        with open(output_path, 'w') as f:
-                            f.write(rpa_commands)
-                        
-                        print(f"✅ Complete RPA workflow saved to: {output_path}")
-                        print(f"✅ Completeness score: {completion_score['score']:.1f}/10")
-                        print(f"✅ Murex UI patterns: {completion_score['murex_pattern_count']}/8 detected")
-                        print(f"✅ Structured format: {'Yes' if completion_score['has_structured_format'] else 'No'}")
-                        
-                        # Output the clean RPA commands directly
-                        print("\n" + "="*50)
-                        print("RPA WORKFLOW COMMANDS:")
-                        print("="*50)
-                        print(rpa_commands)
-                        print("="*50)
-                        
-                        return rpa_commands
-                        
-            else:
+            if response.status_code != 200:
                 print(f"❌ API Error: HTTP {response.status_code}")
                 if response.text:
                     print(f"Error details: {response.text[:300]}")
-                
-        except Exception as e:
-            print(f"❌ Processing error: {e}")
+                return None
             
-        return None
+            text_parts = []
+            for line in response.iter_lines(decode_unicode=True):
+                if token.is_cancelled():
+                    return None
+                if not line or not line.startswith("data:"):
+                    continue
+                chunk = json.loads(line[len("data:"):])
+                if "usageMetadata" in chunk:
+                    usage = chunk["usageMetadata"]
+                    annotate(prompt_tokens=usage.get('promptTokenCount', 0),
+                             output_tokens=usage.get('candidatesTokenCount', 0),
+                             total_tokens=usage.get('totalTokenCount', 0))
+                for candidate in chunk.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        text_parts.append(part.get("text", ""))
+        
+        return "".join(text_parts).strip() or None
+    
+    @traced()
+    def _generate_hedged(self, prompt: str, video_base64: str, video_metadata: Dict,
+                         base_config: Dict, session_duration: float,
+                         interactions: List[UIInteraction],
+                         image_parts: Optional[List[Dict]] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """Race several generation configs and keep the best completeness score"""
+        configs = self.config.get_hedged_generation_configs(base_config)
+        runner = HedgedRequestRunner(
+            hedge_delay=self.config.HEDGE_DELAY,
+            deadline=self.config.HEDGE_DEADLINE,
+            accept_score=self.config.HEDGE_ACCEPT_SCORE
+        )
+        
+        def attempt(generation_config, token):
+            payload = self._build_video_payload(prompt, video_base64, video_metadata, generation_config, image_parts)
+            return self._stream_rpa_commands(payload, timeout=600, token=token)
+        
+        winner = runner.run(
+            configs,
+            attempt,
+            lambda rpa_commands: self._assess_workflow_completeness(rpa_commands, session_duration, interactions)
+        )
+        
+        if winner is None:
+            print("❌ No hedge attempt produced a workflow")
+            return None, None
+        
+        return winner.result, winner.details
     
+    @traced()
     def _assess_workflow_completeness(self, rpa_commands: str, session_duration: float, 
                                     interactions: List[UIInteraction]) -> Dict:
         """Assess if the generated workflow captures the complete process and follows Murex patterns"""
@@ -548,9 +711,11 @@ def main():
     
     # File paths
     import sys
-    if len(sys.argv) > 2:
-        video_path = sys.argv[1]
-        json_path = sys.argv[2]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    hedged = '--hedged' in sys.argv
+    if len(args) > 1:
+        video_path = args[0]
+        json_path = args[1]
     else:
         # Default paths
         video_path = "records/enhanced_multiscreen_20250803_064201.mp4"
@@ -570,7 +735,7 @@ def main():
     
     try:
         processor = CompleteVideoProcessor()
-        workflow = processor.process_complete_workflow(video_path, json_path)
+        workflow = processor.process_complete_workflow(video_path, json_path, hedged=hedged)
         
         if workflow:
             print(f"\n✅ RPA workflow ready for execution")
@@ -13,16 +13,16 @@ Key Features:
 - Optimized frame rate for UI processing
 """
 
-import json
 import base64
-import requests
 import os
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Iterable, Tuple, Optional, Union
 from dataclasses import dataclass
+from functools import cached_property
 from simple_rpa_generator import SimpleRpaGenerator
-from rpa_config import RpaConfig
-from workflow_validator import WorkflowValidator
+from recording_session import RecordingSession
+from rpa_tracing import span, traced
+import timeline_analytics
 
 @dataclass
 class UIInteraction:
@@ -34,6 +34,7 @@ class UIInteraction:
     coordinates: Optional[Tuple[int, int]] = None
     text_content: Optional[str] = None
     confidence: float = 0.0
+    visual_context: Optional[Dict] = None  # before/after JPEG crops captured around a click
 
 @dataclass
 class WorkflowSection:
@@ -47,39 +48,69 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
     
     def __init__(self):
         super().__init__()
-        self.validator = WorkflowValidator()
         # Optimized for UI processing
         self.ui_video_config = {
             "fps": 0.8,  # Lower frame rate for UI interactions
             "sample_key_moments": True,
             "focus_on_changes": True
         }
-        
-    def extract_enhanced_interactions(self, json_path: str) -> List[UIInteraction]:
+    
+    @cached_property
+    def validator(self):
+        """Input/output validator, imported on first use (video health checks load OpenCV)"""
+        from workflow_validator import WorkflowValidator
+        return WorkflowValidator()
+    
+    @traced()
+    def extract_enhanced_interactions(self, json_path: Union[str, RecordingSession]) -> List[UIInteraction]:
         """Extract interactions with enhanced context analysis"""
         
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        session = RecordingSession.coerce(json_path)
+        return session.memoize('enhanced_interactions', lambda: self._extract_session_interactions(session))
+    
+    def _extract_session_interactions(self, session: RecordingSession) -> List[UIInteraction]:
+        """Build the chronological UIInteraction list for a session"""
         
         interactions = []
         
         # Process mouse interactions
-        mouse_events = data.get('mouse_interactions', [])
+        mouse_events = session.iter_events('mouse_interactions', ('mouse_press',))
         clicks = []
+        # ROI recordings give click coordinates in recorded-frame pixels, never mixed with screen ones
+        roi_frame = session.session_info.get('coordinate_space') == 'roi_frame'
         
         for event in mouse_events:
             if event.get('type') == 'mouse_press' and event.get('button') == 'left':
+                position = event.get('roi_position') if roi_frame else event.get('position', {})
+                if position is None:
+                    # Clicked outside the recorded region: keep the step, but without coordinates
+                    clicks.append(UIInteraction(
+                        timestamp=event.get('timestamp', 0),
+                        action_type='click',
+                        description="Click outside the recorded region",
+                        visual_context=event.get('visual_context')
+                    ))
+                    continue
                 clicks.append(UIInteraction(
                     timestamp=event.get('timestamp', 0),
                     action_type='click',
-                    description=f"Click at screen location",
-                    coordinates=(event.get('position', {}).get('x', 0), 
-                               event.get('position', {}).get('y', 0))
+                    description="Click in recorded frame" if roi_frame else "Click at screen location",
+                    coordinates=(position.get('x', 0), 
+                               position.get('y', 0)),
+                    visual_context=event.get('visual_context')
                 ))
         
-        # Process keyboard interactions with better text grouping
-        keyboard_events = data.get('keyboard_events', [])
-        text_sequences = self._group_text_sequences(keyboard_events)
+        # Prefer typing sessions reconstructed at capture time; older logs
+        # fall back to re-deriving text from the raw key presses
+        if session.has_section('typing_sessions'):
+            text_sequences = [
+                {'timestamp': typing['timestamp'], 'text': typing.get('final_text', ''),
+                 'end_action': typing.get('end_action')}
+                for typing in session.typing_sessions
+            ]
+        else:
+            keyboard_events = session.iter_events('keyboard_events', ('key_press',))
+            text_sequences = self._group_text_sequences(keyboard_events)
         
         for seq in text_sequences:
             if seq['text'].strip():
@@ -95,7 +126,7 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         interactions.extend(clicks)
         
         # Process application switches
-        for switch in data.get('app_switches', []):
+        for switch in session.app_switches:
             interactions.append(UIInteraction(
                 timestamp=switch.get('timestamp', 0),
                 action_type='navigate',
@@ -108,7 +139,8 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         
         return interactions
     
-    def _group_text_sequences(self, keyboard_events: List[Dict]) -> List[Dict]:
+    @traced()
+    def _group_text_sequences(self, keyboard_events: Iterable[Dict]) -> List[Dict]:
         """Improved text sequence grouping with better end action detection"""
         
         sequences = []
@@ -116,9 +148,11 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         sequence_start = None
         
         for event in keyboard_events:
-            if event.get('type') == 'key_press' and event.get('is_character'):
+            if event.get('type') == 'key_press' and (event.get('is_character') or event.get('is_special')):
                 key = event.get('key_name', '')
                 timestamp = event.get('timestamp', 0)
+                if key == 'Space':
+                    key = ' '
                 
                 if key in ['Return', 'Enter']:
                     if current_text.strip():
@@ -162,7 +196,9 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         
         return sequences
     
-    def create_interaction_timeline(self, interactions: List[UIInteraction]) -> str:
+    @traced()
+    def create_interaction_timeline(self, interactions: List[UIInteraction], 
+                                    session: Optional[RecordingSession] = None) -> str:
         """Create a detailed timeline for video analysis"""
         
         timeline = []
@@ -173,7 +209,10 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         timeline.append("")
         
         # Group interactions by time windows for efficient video sampling
-        time_windows = self._create_time_windows(interactions)
+        if session:
+            time_windows = session.memoize(('time_windows', 2.0), lambda: self._create_time_windows(interactions))
+        else:
+            time_windows = self._create_time_windows(interactions)
         
         for i, window in enumerate(time_windows):
             timeline.append(f"--- Time Window {i+1}: {window['start']:.1f}s - {window['end']:.1f}s ---")
@@ -187,12 +226,16 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         
         return "\n".join(timeline)
     
+    @traced()
     def _create_time_windows(self, interactions: List[UIInteraction], window_size: float = 2.0) -> List[Dict]:
         """Group interactions into time windows for efficient video analysis"""
         
         if not interactions:
             return []
         
+        if timeline_analytics.NUMPY_AVAILABLE:
+            return timeline_analytics.create_time_windows(interactions, window_size)
+        
         windows = []
         current_window = {
             'start': interactions[0].timestamp,
@@ -219,6 +262,7 @@ class EnhancedMurexRpaGenerator(SimpleRpaGenerator):
         
         return windows
     
+    @traced()
     def create_enhanced_prompt(self, timeline: str, interactions: List[UIInteraction]) -> str:
         """Create an enhanced prompt that leverages video analysis for UI context"""
         
@@ -306,6 +350,7 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
         
         return "\n".join(summary)
     
+    @traced()
     def process_enhanced_workflow(self, video_path: str, json_path: str) -> str:
         """Process workflow with enhanced video analysis"""
         
@@ -315,7 +360,8 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
         
         # Validate inputs first
         print("🔍 Validating input files...")
-        validation_results = self.validator.validate_complete_workflow(video_path, json_path)
+        session = RecordingSession(json_path, video_path)
+        validation_results = self.validator.validate_complete_workflow(video_path, session, health_check=False)
         
         # Check for critical errors
         has_errors = False
@@ -337,17 +383,17 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
         
         # Extract enhanced interactions
         print("🔍 Extracting UI interactions with context...")
-        interactions = self.extract_enhanced_interactions(json_path)
+        interactions = self.extract_enhanced_interactions(session)
         print(f"📊 Found {len(interactions)} contextual interactions")
         
         # Create analysis timeline
-        timeline = self.create_interaction_timeline(interactions)
+        timeline = self.create_interaction_timeline(interactions, session)
         
         # Create enhanced prompt
         prompt = self.create_enhanced_prompt(timeline, interactions)
         
         # Check video file
-        size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        size_mb = session.video_size_mb
         if size_mb > self.config.MAX_FILE_SIZE_MB:
             print(f"❌ Video file too large: {size_mb:.1f} MB")
             return None
@@ -357,9 +403,11 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
         # Encode video with optimized settings for UI analysis
         print("🎬 Encoding video for UI element analysis...")
         try:
-            with open(video_path, 'rb') as f:
-                video_bytes = f.read()
-            video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+            with span("encode_video") as encode_span:
+                with open(video_path, 'rb') as f:
+                    video_bytes = f.read()
+                video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+                encode_span.set(bytes=len(video_bytes), encoded_bytes=len(video_base64))
         except Exception as e:
             print(f"❌ Error encoding video: {e}")
             return None
@@ -407,7 +455,9 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
         print("🧠 Analyzing video for UI context and generating RPA commands...")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=400)
+            with self.api_slot(), span("gemini_request", upload_bytes=len(video_base64)) as request_span:
+                response = self.http.post(url, headers=headers, json=payload, timeout=400)
+                request_span.set(response_bytes=len(response.content))
             
             if response.status_code == 200:
                 result = response.json()
@@ -416,6 +466,9 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
                 if "usageMetadata" in result:
                     usage = result["usageMetadata"]
                     total_tokens = usage.get('totalTokenCount', 0)
+                    request_span.set(prompt_tokens=usage.get('promptTokenCount', 0),
+                                     output_tokens=usage.get('candidatesTokenCount', 0),
+                                     total_tokens=total_tokens)
                     estimated_cost = (total_tokens / 1000) * 0.00015
                     print(f"💰 Tokens used: {total_tokens:,}, Estimated cost: ${estimated_cost:.6f}")
                 
@@ -438,7 +491,7 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
                             rpa_commands, video_path, json_path, interactions
                         )
                         
-                        with open(output_path, 'w') as f:
+                        with span("write_output", bytes=len(structured_output)), open(output_path, 'w') as f:
                             f.write(structured_output)
                         
                         # Validate generated output
@@ -478,6 +531,7 @@ Generate structured, contextual RPA commands that describe the specific UI eleme
             
         return None
     
+    @traced()
     def _create_structured_output(self, rpa_commands: str, video_path: str, 
                                  json_path: str, interactions: List[UIInteraction]) -> str:
         """Create well-structured, human-editable output"""
@@ -9,6 +9,9 @@ import os
 import sys
 import time
 import json
+import argparse
+import tempfile
+import queue
 import threading
 import traceback
 import subprocess
@@ -16,35 +19,46 @@ from datetime import datetime
 from pathlib import Path
 import platform
 import wave
+from array import array
+from collections import deque
+from importlib.util import find_spec
+
+from adaptive_frame_rate import DEFAULT_FLOOR_FPS, AdaptiveFrameRate, FrameChangeDetector
+from capture_roi import RoiTracker, letterbox
+from click_snapshots import ClickSnapshotter
+from finalization_queue import FinalizationQueue
+from frame_sources import MSS_AVAILABLE, RESOLUTIONS, MssFrameSource, synthetic_source_factory
+from mouse_trajectory import DEFAULT_TOLERANCE, TrajectoryCompressor
+from recorder_telemetry import CaptureTelemetry, EventRates, format_status, metrics_path, write_session_metrics
+from recording_clock import RecordingClock, frame_sidecar_path
+from typing_sessions import TypingSessionTracker
+from worker_supervisor import WorkerSupervisor
 
 # Basic imports
 try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog
     import cv2
     import numpy as np
-    import mss
-    from PIL import Image, ImageDraw, ImageFont
 except ImportError as e:
     print(f"Error importing required libraries: {e}")
     print("Please install requirements: pip install opencv-python mss pillow")
     sys.exit(1)
 
-# Audio imports
-try:
-    import pyaudio
-    AUDIO_AVAILABLE = True
-except ImportError:
-    AUDIO_AVAILABLE = False
+# Optional components are only looked up here; each is imported where it is
+# used, so headless recording never loads Tk, PyAudio or AppKit
+
+# GUI (not needed for headless recording, see --headless)
+TK_AVAILABLE = find_spec('tkinter') is not None
+if not TK_AVAILABLE:
+    print("Tk not available - only headless recording is possible")
+
+# Audio (imported by the audio thread)
+AUDIO_AVAILABLE = find_spec('pyaudio') is not None
+if not AUDIO_AVAILABLE:
     print("Audio recording not available (pyaudio not installed)")
 
-# macOS specific imports
-try:
-    from AppKit import NSPasteboard, NSEvent, NSWorkspace
-    from Cocoa import NSRunLoop, NSDefaultRunLoopMode
-    APPKIT_AVAILABLE = True
-except ImportError:
-    APPKIT_AVAILABLE = False
+# macOS clipboard and app focus (imported by FullKeyboardLogger)
+APPKIT_AVAILABLE = find_spec('AppKit') is not None and find_spec('Foundation') is not None
+if not APPKIT_AVAILABLE:
     print("AppKit not available - some keyboard features disabled")
 
 # Accessibility
@@ -57,6 +71,88 @@ except ImportError:
 
 PLATFORM = platform.system()
 
+
+def _import_tk():
+    """Load tkinter into this module for the GUI and the recording border"""
+    global tk, ttk, messagebox, filedialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+
+# Core Graphics event types seen by the keyboard event tap (CGEventType values)
+CG_EVENT_KEY_DOWN = 10
+CG_EVENT_KEY_UP = 11
+CG_EVENT_FLAGS_CHANGED = 12
+
+# macOS virtual key codes to readable names
+KEY_CODE_NAMES = {
+    0: 'a', 1: 's', 2: 'd', 3: 'f', 4: 'h', 5: 'g', 6: 'z', 7: 'x', 8: 'c', 9: 'v',
+    10: '§', 11: 'b', 12: 'q', 13: 'w', 14: 'e', 15: 'r', 16: 'y', 17: 't',
+    18: '1', 19: '2', 20: '3', 21: '4', 22: '6', 23: '5', 24: '=', 25: '9',
+    26: '7', 27: '-', 28: '8', 29: '0', 30: ']', 31: 'o', 32: 'u', 33: '[',
+    34: 'i', 35: 'p', 36: 'Return', 37: 'l', 38: 'j', 39: "'", 40: 'k', 41: ';',
+    42: '\\', 43: ',', 44: '/', 45: 'n', 46: 'm', 47: '.', 48: 'Tab',
+    49: 'Space', 50: '`', 51: 'Delete', 52: 'Enter', 53: 'Escape',
+    54: 'RightCommand', 55: 'Command', 56: 'Shift', 57: 'CapsLock',
+    58: 'Option', 59: 'Control', 60: 'RightShift', 61: 'RightOption',
+    62: 'RightControl', 63: 'Function'
+}
+
+CHARACTER_PUNCTUATION = frozenset(['.', ',', '!', '?', ';', ':', "'", '"', ' '])
+SPECIAL_KEYS = frozenset(['Return', 'Tab', 'Delete', 'Escape', 'Space'])
+RELEASE_LOGGED_KEYS = frozenset(['Return', 'Tab', 'Delete', 'Escape', 'Command', 'Shift', 'Control', 'Option'])
+
+# Recent frames kept in memory (references only) for click snapshots
+FRAME_RING_SIZE = 8
+
+# Activity-triggered recording: JPEG pre-roll kept while idle, flushed when activity starts.
+# Compression, flushes and writes run on an encoder thread fed by the capture loop;
+# pre-roll frames are stored downscaled and scaled back up when flushed.
+DEFAULT_PRE_ROLL_SECONDS = 5.0
+DEFAULT_IDLE_TIMEOUT = 20.0
+PRE_ROLL_JPEG_QUALITY = 80
+PRE_ROLL_MAX_WIDTH = 960
+ENCODE_QUEUE_MAX_FRAMES = 30
+
+# NSPasteboard.changeCount is a cheap integer read; content is only fetched when it moves
+CLIPBOARD_CHANGE_POLL = 0.1
+# Only used when workspace activation notifications cannot be registered
+APP_POLL_FALLBACK = 0.5
+
+# How often the GUI picks up progress from background finalization jobs
+FINALIZATION_POLL_MS = 250
+# How often the GUI refreshes the live recorder telemetry
+TELEMETRY_POLL_MS = 1000
+
+class CallbackLatencyStats:
+    """Latency of the event-tap callback, recorded into a preallocated ring"""
+    
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.samples = array('q', bytes(8 * capacity))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+    
+    def record(self, elapsed_ns):
+        self.samples[self.count % self.capacity] = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+    
+    def summary(self):
+        """Callback latency in microseconds (percentiles over the most recent samples)"""
+        if not self.count:
+            return {'count': 0}
+        recent = sorted(self.samples[:min(self.count, self.capacity)])
+        return {
+            'count': self.count,
+            'mean_us': round(self.total_ns / self.count / 1000, 2),
+            'p50_us': round(recent[len(recent) // 2] / 1000, 2),
+            'p99_us': round(recent[min(len(recent) - 1, int(len(recent) * 0.99))] / 1000, 2),
+            'max_us': round(self.max_ns / 1000, 2)
+        }
+
 class ScreenHighlighter:
     """Visual highlight overlay for recording area"""
     
@@ -69,6 +165,7 @@ class ScreenHighlighter:
     def show_recording_area(self, monitor_info, recording=False):
         """Show visual highlight of recording area"""
         try:
+            _import_tk()
             self.recording_mode = recording
             if PLATFORM == "Darwin":
                 self._show_macos_highlight(monitor_info)
@@ -223,37 +320,92 @@ class ScreenHighlighter:
             pass
 
 class MultiScreenVideoRecorder:
-    """Multi-screen video recorder with proper frame writing and visual feedback"""
+    """Multi-screen video recorder with proper frame writing and visual feedback
     
-    def __init__(self):
+    frame_source is a callable returning a FrameSource (see frame_sources);
+    screens are grabbed through mss by default. headless=True skips the
+    on-screen recording area highlight.
+    """
+    
+    def __init__(self, frame_source=None, headless=False):
         self.recording = False
         self.output_path = None
         self.fps = 15
-        self.record_thread = None
-        self.audio_thread = None
+        # Capture and audio threads; stopped through one Event (see worker_supervisor)
+        self.workers = WorkerSupervisor('video')
         self.video_writer = None
         self.audio_frames = []
         self.selected_monitor = 1  # Default to primary monitor
-        self.highlighter = ScreenHighlighter()
+        self.frame_source = frame_source or MssFrameSource
+        self.highlighter = None if headless else ScreenHighlighter()
         
         # Audio settings
-        self.audio_format = pyaudio.paInt16
+        self.audio_format = None  # pyaudio.paInt16, set once the audio thread imports pyaudio
         self.channels = 1
         self.rate = 22050
         self.chunk = 512
         self.audio = None
         
-        # SYNC FIX: Shared timing coordination
+        # SYNC FIX: Shared timing coordination (session-relative, see RecordingClock)
+        self.clock = RecordingClock()
         self.recording_start_time = None
         self.sync_barrier = threading.Barrier(2)  # For audio and video sync
         self.frame_timestamps = []  # Track actual frame timing
         
+        # Most recent (session time, frame) pairs for live consumers such as click snapshots
+        self.frame_ring = deque(maxlen=FRAME_RING_SIZE)
+        self.frame_ring_lock = threading.Lock()
+        self.capture_geometry = None
+        
+        # Region of interest: None (whole monitor), 'window' (frontmost window) or a rect dict
+        self.roi = None
+        self.roi_region = None
+        self.roi_changes = []
+        
+        # Activity-triggered mode (off unless requested in start_recording)
+        self.activity_triggered = False
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.pre_roll = deque()
+        self.encode_queue = None
+        self.writing = True
+        self.last_activity_time = float('-inf')
+        self.active_segments = []
+        
+        # Adaptive frame rate (None = fixed fps)
+        self.rate_controller = None
+        
+        # Stage timings, frame/audio health and process load (see recorder_telemetry)
+        self.telemetry = CaptureTelemetry()
+        
+    def snapshot_frames(self):
+        """Copy of the frame ring as [(session_time, BGR frame)], oldest first"""
+        with self.frame_ring_lock:
+            return list(self.frame_ring)
+    
+    def latest_frame_time(self):
+        with self.frame_ring_lock:
+            return self.frame_ring[-1][0] if self.frame_ring else float('-inf')
+    
+    def screen_to_frame(self, x, y):
+        """Map a screen point (mouse coordinates) to pixel coordinates in the recorded frame
+        
+        Returns None for points outside the captured region.
+        """
+        geometry = self.capture_geometry
+        if not geometry:
+            return None
+        frame_x = int((x - geometry['left']) * geometry['scale_x']) + geometry.get('pad_x', 0)
+        frame_y = int((y - geometry['top']) * geometry['scale_y']) + geometry.get('pad_y', 0)
+        if 'width' in geometry and not (0 <= frame_x < geometry['width'] and 0 <= frame_y < geometry['height']):
+            return None
+        return frame_x, frame_y
+    
     def get_available_monitors(self):
         """Get list of available monitors"""
         try:
-            with mss.mss() as sct:
+            with self.frame_source() as source:
                 monitors = []
-                for i, monitor in enumerate(sct.monitors):
+                for i, monitor in enumerate(source.monitors):
                     if i == 0:  # Skip the "All monitors" option
                         continue
                     monitors.append({
@@ -276,27 +428,72 @@ class MultiScreenVideoRecorder:
         print(f"📺 Selected monitor {monitor_index} for recording")
         
         # Show visual highlight of recording area (preview mode)
-        monitors = self.get_available_monitors()
+        monitors = self.get_available_monitors() if self.highlighter else []
         for monitor in monitors:
             if monitor['index'] == monitor_index:
                 self.highlighter.show_recording_area(monitor['monitor_data'], recording=False)
                 break
     
-    def start_recording(self, output_path, fps=15, record_audio=True):
-        """Start multi-screen recording with improved frame writing and sync"""
+    def start_recording(self, output_path, fps=15, record_audio=True, clock=None,
+                        activity_triggered=False, pre_roll_seconds=DEFAULT_PRE_ROLL_SECONDS,
+                        idle_timeout=DEFAULT_IDLE_TIMEOUT, roi=None, adaptive_fps=False,
+                        floor_fps=DEFAULT_FLOOR_FPS):
+        """Start multi-screen recording with improved frame writing and sync
+        
+        With activity_triggered=True frames are only encoded while the interaction
+        logger reports activity (see on_interaction); the last pre_roll_seconds are
+        kept downscaled and JPEG-compressed in memory and written when activity
+        starts, and writing pauses after idle_timeout seconds without activity.
+        In this mode frames are handed to an encoder thread so neither the
+        compression nor a pre-roll flush holds up capture.
+        
+        roi='window' grabs only the frontmost window and roi={'left', 'top', 'width',
+        'height'} (screen points) a fixed rectangle; frames are letterboxed into a
+        fixed output size.
+        
+        adaptive_fps=True treats fps as a ceiling: capture runs at fps during
+        interactions or on-screen changes and decays toward floor_fps while idle.
+        Frames are written as captured (the container is tagged with the ceiling),
+        so the sidecar timestamps give the real capture time of each frame.
+        """
         if self.recording:
             return False
         
+        self.roi = roi
+        self.roi_region = None
+        self.roi_changes = []
+        self.activity_triggered = activity_triggered
+        self.idle_timeout = idle_timeout
+        self.pre_roll = deque(maxlen=max(1, int(pre_roll_seconds * min(max(fps, 5), 30))))
+        self.encode_queue = queue.Queue() if activity_triggered else None
+        self.writing = not activity_triggered
+        self.last_activity_time = float('-inf')
+        self.active_segments = []
+        if activity_triggered and record_audio:
+            # Continuous audio cannot be muxed against a video with idle gaps cut out
+            print("⚠️ Audio is not recorded in activity-triggered mode")
+            record_audio = False
+        self.rate_controller = AdaptiveFrameRate(min(max(fps, 5), 30), floor_fps) if adaptive_fps else None
+        if adaptive_fps and record_audio:
+            # Nor against one whose idle stretches play back faster than real time
+            print("⚠️ Audio is not recorded with adaptive FPS")
+            record_audio = False
+        
+        self.clock = clock or RecordingClock()
         self.output_path = output_path
         self.fps = fps
         self.recording = True
         self.audio_frames = []
         self.frame_timestamps = []
+        with self.frame_ring_lock:
+            self.frame_ring.clear()
+        self.capture_geometry = None
+        self.telemetry = CaptureTelemetry(fps)
         
         print(f"🎬 Starting multi-screen recording on monitor {self.selected_monitor}: {output_path}")
         
         # Show recording border (stays visible during recording)
-        monitors = self.get_available_monitors()
+        monitors = self.get_available_monitors() if self.highlighter else []
         for monitor in monitors:
             if monitor['index'] == self.selected_monitor:
                 self.highlighter.show_recording_area(monitor['monitor_data'], recording=True)
@@ -308,17 +505,19 @@ class MultiScreenVideoRecorder:
             barrier_count = 2
         self.sync_barrier = threading.Barrier(barrier_count)
         
+        # A stop during the sync wait or an idle-rate sleep must not wait them out
+        self.workers = WorkerSupervisor(f"video-mon{self.selected_monitor}")
+        self.workers.on_stop(self.sync_barrier.abort)
+        if self.rate_controller:
+            self.workers.on_stop(self.rate_controller.wakeup.set)
+        
         # Start video recording
-        self.record_thread = threading.Thread(target=self._video_loop)
-        self.record_thread.daemon = True
-        self.record_thread.start()
+        self.workers.start('capture', self._video_loop)
         
         # Start audio recording
         if AUDIO_AVAILABLE and record_audio:
             try:
-                self.audio_thread = threading.Thread(target=self._audio_loop)
-                self.audio_thread.daemon = True
-                self.audio_thread.start()
+                self.workers.start('audio', self._audio_loop)
                 print("🎤 Multi-screen audio recording enabled")
             except Exception as e:
                 print(f"⚠️ Audio recording failed: {e}")
@@ -327,20 +526,20 @@ class MultiScreenVideoRecorder:
     
     def _video_loop(self):
         """FIXED: Video recording loop for specific monitor"""
+        encoder = None
         try:
-            with mss.mss() as sct:
+            with self.frame_source() as source:
                 # Get the specific monitor
-                if self.selected_monitor >= len(sct.monitors):
+                if self.selected_monitor >= len(source.monitors):
                     print(f"❌ Monitor {self.selected_monitor} not available, using monitor 1")
                     self.selected_monitor = 1
                 
-                monitor = sct.monitors[self.selected_monitor]
+                monitor = source.monitors[self.selected_monitor]
                 print(f"📺 Recording monitor {self.selected_monitor}: {monitor['width']}x{monitor['height']} at ({monitor['left']}, {monitor['top']})")
                 
                 # FIXED: Take first screenshot to determine ACTUAL frame dimensions (like working version)
                 try:
-                    first_screenshot = sct.grab(monitor)
-                    first_frame = np.array(first_screenshot)
+                    first_frame = source.grab(monitor)
                     print(f"✅ First screenshot captured: {first_frame.shape}")
                     
                     # Convert to BGR to get final dimensions
@@ -353,6 +552,21 @@ class MultiScreenVideoRecorder:
                     height, width = first_frame.shape[:2]
                     print(f"📐 ACTUAL frame dimensions from screenshot: {width}x{height}")
                     
+                    # Screen points -> frame pixels (Retina grabs are larger than the monitor size)
+                    self.capture_geometry = {
+                        'left': monitor['left'],
+                        'top': monitor['top'],
+                        'scale_x': width / monitor['width'] if monitor['width'] else 1.0,
+                        'scale_y': height / monitor['height'] if monitor['height'] else 1.0
+                    }
+                    
+                    # Region of interest: grab only that region, letterboxed into a fixed size
+                    roi_tracker = None
+                    if self.roi:
+                        roi_tracker = RoiTracker(self.roi, monitor)
+                        width, height = roi_tracker.output_size(self.capture_geometry['scale_x'], width, height)
+                        print(f"🎯 ROI capture ({roi_tracker.mode}): output {width}x{height}")
+                    
                 except Exception as e:
                     print(f"❌ First screenshot failed: {e}")
                     return
@@ -404,28 +618,40 @@ class MultiScreenVideoRecorder:
                 
                 print(f"✅ Video writer initialized successfully")
                 
-                frame_count = 0
-                last_status_time = time.time()
+                self.frames_written = 0
+                self.last_status_time = self.clock.now()
+                if self.encode_queue:
+                    encoder = self.workers.start('encoder', self._encoder_loop, width, height)
                 
                 # SYNC FIX: Wait for all threads to be ready, then start synchronized
                 print("📹 Video thread ready, waiting for sync...")
                 try:
                     self.sync_barrier.wait(timeout=5.0)
-                    self.recording_start_time = time.time()
-                    print(f"✅ Synchronized recording started at {self.recording_start_time}")
+                    self.recording_start_time = self.clock.mark_stream_start('video')
+                    print(f"✅ Synchronized recording started at {self.recording_start_time:.3f}s session time")
                 except threading.BrokenBarrierError:
                     print("⚠️ Sync barrier broken, starting video anyway")
-                    self.recording_start_time = time.time()
+                    self.recording_start_time = self.clock.mark_stream_start('video')
                 
                 # SYNC FIX: Precise frame timing
                 target_frame_duration = 1.0 / self.fps
                 next_frame_time = self.recording_start_time
+                self.telemetry.target_fps = self.fps
+                self.telemetry.start(self.recording_start_time)
+                change_detector = FrameChangeDetector() if self.rate_controller else None
+                if self.rate_controller:
+                    self.rate_controller.ceiling_fps = self.fps
+                    print(f"📉 Adaptive FPS: {self.rate_controller.floor_fps}-{self.fps} fps")
                 
                 while self.recording:
                     try:
-                        # Capture screenshot
-                        screenshot = sct.grab(monitor)
-                        frame = np.array(screenshot)
+                        # Capture screenshot (only the ROI when one is set)
+                        lateness = self.clock.now() - next_frame_time if not self.rate_controller else 0.0
+                        grab_started = time.perf_counter()
+                        region = roi_tracker.current_region() if roi_tracker else monitor
+                        frame = source.grab(region)
+                        convert_started = time.perf_counter()
+                        self.telemetry.stage('grab', convert_started - grab_started)
                         
                         # FIXED: Proper color space conversion
                         if frame.shape[2] == 4:  # BGRA
@@ -433,6 +659,9 @@ class MultiScreenVideoRecorder:
                         elif frame.shape[2] == 3:  # RGB  
                             frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
                         
+                        if roi_tracker:
+                            frame = self._fit_roi_frame(frame, region, width, height)
+                        
                         # FIXED: ALWAYS ensure frame dimensions match video writer (like working version)
                         if frame.shape[:2] != (height, width):
                             print(f"🔧 Resizing frame from {frame.shape[1]}x{frame.shape[0]} to {width}x{height}")
@@ -459,75 +688,205 @@ class MultiScreenVideoRecorder:
                         if not frame.flags['C_CONTIGUOUS']:
                             frame = np.ascontiguousarray(frame)
                         
-                        # Write frame with enhanced error checking
-                        if self.video_writer and self.video_writer.isOpened():
-                            try:
-                                success = self.video_writer.write(frame)
-                                if success:
-                                    frame_count += 1
-                                    
-                                    # SYNC FIX: Track actual frame timestamp
-                                    frame_timestamp = time.time() - self.recording_start_time
-                                    self.frame_timestamps.append(frame_timestamp)
-                                    
-                                    # Status update every 3 seconds
-                                    current_time = time.time()
-                                    if current_time - last_status_time > 3.0:
-                                        actual_fps = frame_count / frame_timestamp if frame_timestamp > 0 else 0
-                                        print(f"📹 Recording: {frame_count} frames ({frame_timestamp:.1f}s) actual FPS: {actual_fps:.1f} ✅")
-                                        last_status_time = current_time
-                                else:
-                                    print(f"❌ Frame write returned False at frame {frame_count}")
-                                    print(f"   Frame shape: {frame.shape}, dtype: {frame.dtype}")
-                                    print(f"   Writer opened: {self.video_writer.isOpened()}")
-                                    
-                                    # Try to recover by recreating the writer
-                                    if frame_count > 0:  # Only if we've successfully written some frames
-                                        print("🔧 Attempting to recover video writer...")
-                                        try:
-                                            fourcc = self.video_writer.get(cv2.CAP_PROP_FOURCC)
-                                            self.video_writer.release()
-                                            self.video_writer = cv2.VideoWriter(self.output_path, int(fourcc), self.fps, (width, height))
-                                            if self.video_writer.isOpened():
-                                                print("✅ Video writer recovered")
-                                            else:
-                                                print("❌ Video writer recovery failed")
-                                        except Exception as recovery_error:
-                                            print(f"❌ Recovery error: {recovery_error}")
-                                            
-                            except Exception as write_error:
-                                print(f"❌ Frame write exception: {write_error}")
+                        capture_time = self.clock.now()
+                        self.telemetry.stage('convert', time.perf_counter() - convert_started)
+                        self.telemetry.frame_captured(lateness)
+                        with self.frame_ring_lock:
+                            self.frame_ring.append((capture_time, frame))
+                        
+                        if self.encode_queue:
+                            # Activity-triggered mode: the encoder thread writes or keeps it as pre-roll
+                            self._queue_frame(capture_time, frame)
+                            self.telemetry.encoder_queue(self.encode_queue.qsize(), len(self.pre_roll))
                         else:
-                            print("❌ Video writer not available or not opened")
+                            encode_started = time.perf_counter()
+                            self._encode_frame(frame, capture_time, width, height)
+                            self.telemetry.encoder_queue(1)
+                            self.telemetry.stage('encode', time.perf_counter() - encode_started)
+                        self.telemetry.maybe_sample(capture_time)
+                        
+                        if self.rate_controller:
+                            # Adaptive: next capture relative to this one, brought forward by activity
+                            if change_detector.changed(frame):
+                                self.rate_controller.on_activity(capture_time)
+                            interval = self.rate_controller.interval(capture_time)
+                            self.rate_controller.wait(capture_time + interval - self.clock.now())
+                            continue
                         
                         # SYNC FIX: Precise frame rate control
                         next_frame_time += target_frame_duration
-                        current_time = time.time()
+                        current_time = self.clock.now()
                         sleep_time = next_frame_time - current_time
                         
                         if sleep_time > 0:
-                            time.sleep(sleep_time)
+                            self.workers.wait(sleep_time)
                         elif sleep_time < -target_frame_duration:
                             # If we're more than one frame behind, skip ahead
+                            self.telemetry.frames_skipped(int(-sleep_time / target_frame_duration))
                             next_frame_time = current_time + target_frame_duration
                         
                     except Exception as e:
                         print(f"Frame capture error: {e}")
-                        time.sleep(0.1)
+                        self.workers.wait(0.1)
                 
-                print(f"📹 Multi-screen video complete: {frame_count} frames on monitor {self.selected_monitor}")
+                self._drain_encoder(encoder)
+                encoder = None
+                print(f"📹 Multi-screen video complete: {self.frames_written} frames on monitor {self.selected_monitor}")
                 
         except Exception as e:
             print(f"Video recording error: {e}")
             traceback.print_exc()
         finally:
+            self._drain_encoder(encoder)
             if self.video_writer:
                 self.video_writer.release()
                 print("📹 Video writer released")
     
+    def _fit_roi_frame(self, frame, region, width, height):
+        """Letterbox an ROI grab into the output size and keep the screen->frame transform current"""
+        grab_height, grab_width = frame.shape[:2]
+        frame, scale, pad_x, pad_y = letterbox(frame, width, height)
+        if region != self.roi_region:
+            self.roi_region = dict(region)
+            self.roi_changes.append({'timestamp': self.clock.now(), 'region': self.roi_region})
+        self.capture_geometry = {
+            'left': region['left'],
+            'top': region['top'],
+            'scale_x': grab_width / region['width'] * scale,
+            'scale_y': grab_height / region['height'] * scale,
+            'pad_x': pad_x,
+            'pad_y': pad_y,
+            'width': width,
+            'height': height
+        }
+        return frame
+    
+    def _queue_frame(self, capture_time, frame):
+        """Activity-triggered mode: track activity and hand the frame to the encoder thread"""
+        active = capture_time - self.last_activity_time <= self.idle_timeout
+        if active and not self.writing:
+            # Activity started: the encoder flushes the pre-roll so the lead-up is not lost
+            self.writing = True
+            segment = {'start': capture_time}
+            self.active_segments.append(segment)
+            self.encode_queue.put(('flush', segment, None))
+        elif not active and self.writing:
+            self.writing = False
+            self.active_segments[-1]['end'] = capture_time
+            print(f"⏸️ Idle for {self.idle_timeout:.0f}s - buffering pre-roll only")
+        
+        if self.encode_queue.qsize() >= ENCODE_QUEUE_MAX_FRAMES:
+            # Encoder is behind (e.g. mid-flush): drop rather than grow without bound
+            self.telemetry.frames_skipped(1)
+            return
+        self.encode_queue.put(('write' if active else 'pre_roll', capture_time, frame))
+    
+    def _encoder_loop(self, width, height):
+        """Activity-triggered mode: write live frames, flush the pre-roll and compress idle frames"""
+        while True:
+            item = self.encode_queue.get()
+            if item is None:
+                return
+            kind, value, frame = item
+            try:
+                if kind == 'pre_roll':
+                    jpeg = self._compress_pre_roll(frame)
+                    if jpeg is not None:
+                        self.pre_roll.append((value, jpeg))
+                elif kind == 'flush':
+                    pre_roll = list(self.pre_roll)
+                    self.pre_roll.clear()
+                    if pre_roll:
+                        value['start'] = pre_roll[0][0]
+                    print(f"▶️ Activity detected - writing video (+{len(pre_roll)} pre-roll frames)")
+                    for frame_time, jpeg in pre_roll:
+                        self._encode_frame(self._restore_pre_roll(jpeg, width, height), frame_time, width, height)
+                else:
+                    encode_started = time.perf_counter()
+                    self._encode_frame(frame, value, width, height)
+                    self.telemetry.stage('encode', time.perf_counter() - encode_started)
+            except Exception as e:
+                print(f"Encoder error: {e}")
+    
+    def _drain_encoder(self, encoder):
+        """Let the encoder thread write what was queued (before the writer is released)"""
+        if encoder:
+            self.encode_queue.put(None)
+            encoder.thread.join()
+    
+    @staticmethod
+    def _compress_pre_roll(frame):
+        """Downscale to PRE_ROLL_MAX_WIDTH and JPEG-encode an idle frame (None on failure)"""
+        height, width = frame.shape[:2]
+        if width > PRE_ROLL_MAX_WIDTH:
+            size = (PRE_ROLL_MAX_WIDTH, max(1, round(height * PRE_ROLL_MAX_WIDTH / width)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, PRE_ROLL_JPEG_QUALITY])
+        return jpeg.tobytes() if ok else None
+    
+    @staticmethod
+    def _restore_pre_roll(jpeg, width, height):
+        """Decode a pre-roll frame back to the output size"""
+        frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        return frame
+    
+    def on_interaction(self, interaction):
+        """Interaction logger listener: any mouse or keyboard event counts as activity"""
+        self.last_activity_time = self.clock.now()
+        if self.rate_controller:
+            self.rate_controller.on_activity(self.last_activity_time)
+    
+    def _encode_frame(self, frame, frame_time, width, height):
+        """Write one frame to the encoder and record its session time"""
+        # Write frame with enhanced error checking
+        if self.video_writer and self.video_writer.isOpened():
+            try:
+                success = self.video_writer.write(frame)
+                self.telemetry.frame_written(self.clock.now(), bool(success))
+                if success:
+                    self.frames_written += 1
+                    
+                    # SYNC FIX: Track actual frame timestamp (session time of capture)
+                    self.frame_timestamps.append(frame_time)
+                    
+                    # Status update every 3 seconds
+                    current_time = self.clock.now()
+                    elapsed = current_time - self.recording_start_time
+                    if current_time - self.last_status_time > 3.0:
+                        actual_fps = self.frames_written / elapsed if elapsed > 0 else 0
+                        print(f"📹 Recording: {self.frames_written} frames ({elapsed:.1f}s) actual FPS: {actual_fps:.1f} ✅")
+                        self.last_status_time = current_time
+                else:
+                    print(f"❌ Frame write returned False at frame {self.frames_written}")
+                    print(f"   Frame shape: {frame.shape}, dtype: {frame.dtype}")
+                    print(f"   Writer opened: {self.video_writer.isOpened()}")
+                    
+                    # Try to recover by recreating the writer
+                    if self.frames_written > 0:  # Only if we've successfully written some frames
+                        print("🔧 Attempting to recover video writer...")
+                        try:
+                            fourcc = self.video_writer.get(cv2.CAP_PROP_FOURCC)
+                            self.video_writer.release()
+                            self.video_writer = cv2.VideoWriter(self.output_path, int(fourcc), self.fps, (width, height))
+                            if self.video_writer.isOpened():
+                                print("✅ Video writer recovered")
+                            else:
+                                print("❌ Video writer recovery failed")
+                        except Exception as recovery_error:
+                            print(f"❌ Recovery error: {recovery_error}")
+                            
+            except Exception as write_error:
+                print(f"❌ Frame write exception: {write_error}")
+        else:
+            print("❌ Video writer not available or not opened")
+    
     def _audio_loop(self):
         """Audio recording loop with sync coordination"""
         try:
+            import pyaudio
+            self.audio_format = pyaudio.paInt16
             self.audio = pyaudio.PyAudio()
             
             # Find a working input device
@@ -563,23 +922,28 @@ class MultiScreenVideoRecorder:
             except threading.BrokenBarrierError:
                 print("⚠️ Audio sync barrier broken, starting anyway")
             
-            audio_start_time = time.time()
+            audio_start_time = self.clock.mark_stream_start('audio')
             chunk_count = 0
             
             while self.recording:
                 try:
+                    # Input waiting beyond a few chunks means the loop is falling behind the device
+                    backlog = stream.get_read_available()
                     data = stream.read(self.chunk, exception_on_overflow=False)
                     self.audio_frames.append(data)
                     chunk_count += 1
+                    self.telemetry.audio_read(backlog, self.chunk,
+                                              self.clock.now() - audio_start_time - chunk_count * self.chunk / self.rate)
                     
                     # Optional: Track audio timing for debugging
                     if chunk_count % 100 == 0:  # Every ~2.3 seconds at 22050Hz/512chunk
                         audio_duration = chunk_count * self.chunk / self.rate
-                        actual_duration = time.time() - audio_start_time
+                        actual_duration = self.clock.now() - audio_start_time
                         print(f"🎵 Audio: {audio_duration:.1f}s recorded, {actual_duration:.1f}s elapsed")
                         
                 except:
-                    time.sleep(0.01)
+                    self.telemetry.audio_error()
+                    self.workers.wait(0.01)
             
             stream.stop_stream()
             stream.close()
@@ -595,27 +959,83 @@ class MultiScreenVideoRecorder:
         if not self.recording:
             return
         
+        self.request_stop()
+        self.finish_recording()
+    
+    def request_stop(self):
+        """Signal the capture threads to stop (returns immediately)"""
         print("🛑 Stopping multi-screen recording...")
         self.recording = False
+        self.workers.request_stop()
         
         # Hide recording border
-        self.highlighter.hide_highlight()
-        
-        if self.record_thread:
-            self.record_thread.join(timeout=5)
-        if self.audio_thread:
-            self.audio_thread.join(timeout=3)
-        
+        if self.highlighter:
+            self.highlighter.hide_highlight()
+    
+    def finish_recording(self):
+        """Wait for the capture threads, then write audio, mux and the frame sidecar"""
+        self.join_capture()
+        for label, step in self.finalization_steps():
+            step()
+        print("✅ Multi-screen recording stopped")
+    
+    def join_capture(self):
+        """Wait for the capture threads (the video thread releases the writer as it exits)"""
+        if self.workers.join(timeout=5) and self.workers.workers:
+            print(f"🧵 {self.workers.name} workers stopped (max {self.workers.status()['max_stop_latency_ms']} ms)")
+        if self.active_segments and 'end' not in self.active_segments[-1]:
+            self.active_segments[-1]['end'] = self.clock.now()
+        
+        if self.rate_controller and self.frame_timestamps:
+            span = self.frame_timestamps[-1] - self.frame_timestamps[0]
+            if span > 0:
+                print(f"📉 Adaptive FPS: {len(self.frame_timestamps) / span:.1f} fps average capture rate")
+    
+    def telemetry_snapshot(self):
+        """Live capture telemetry (stage timings, late/dropped frames, audio, process load)"""
+        return self.telemetry.snapshot(self.clock.now())
+    
+    def telemetry_history(self):
+        """Periodic telemetry samples of this pipeline, keyed by monitor"""
+        return {f"mon{self.selected_monitor}": self.telemetry.history}
+    
+    def finalization_steps(self):
+        """Output steps to run after join_capture, as (label, callable); independent of each other"""
+        return [('frame sidecar', self._save_frame_timestamps), ('audio + mux', self._save_audio_track)]
+    
+    def _save_audio_track(self):
         # Save audio and combine with video
         if self.audio_frames:
             self._save_and_combine_audio()
-        
-        print("✅ Multi-screen recording stopped")
+    
+    def _save_frame_timestamps(self):
+        """Write the session time of every video frame next to the video"""
+        if not self.output_path or not self.frame_timestamps:
+            return
+        try:
+            sidecar_path = frame_sidecar_path(self.output_path)
+            with open(sidecar_path, 'w') as f:
+                json.dump({
+                    'video_file': os.path.basename(self.output_path),
+                    'fps': self.fps,
+                    'frame_count': len(self.frame_timestamps),
+                    'activity_triggered': self.activity_triggered,
+                    'active_segments': self.active_segments,
+                    'roi': self.roi,
+                    'roi_changes': self.roi_changes,
+                    'adaptive_fps': self.rate_controller.describe() if self.rate_controller else None,
+                    'clock': self.clock.describe(),
+                    'frame_timestamps': [round(t, 6) for t in self.frame_timestamps]
+                }, f)
+            print(f"🕒 Frame timestamps saved: {sidecar_path}")
+        except Exception as e:
+            print(f"⚠️ Could not save frame timestamps: {e}")
     
     def _save_and_combine_audio(self):
         """Save audio and attempt to combine with video using ffmpeg with sync fixes"""
         try:
             # Save audio to temporary file
+            import pyaudio
             audio_path = self.output_path.replace('.mp4', '_audio.wav')
             with wave.open(audio_path, 'wb') as wf:
                 wf.setnchannels(self.channels)
@@ -679,16 +1099,132 @@ class MultiScreenVideoRecorder:
         except Exception as e:
             print(f"Audio save error: {e}")
 
+def monitor_for_point(monitors, x, y):
+    """Index of the monitor (get_available_monitors entries) containing a screen point, or None"""
+    for monitor in monitors:
+        data = monitor.get('monitor_data') or {}
+        if not data:
+            continue
+        if (data['left'] <= x < data['left'] + data['width'] and
+                data['top'] <= y < data['top'] + data['height']):
+            return monitor['index']
+    return None
+
+class MultiMonitorRecorder:
+    """Records several monitors at once: one MultiScreenVideoRecorder pipeline (thread) per monitor
+    
+    All pipelines stamp frames with the same RecordingClock. Audio is recorded
+    once, by the first pipeline. Exposes the frame-source API used by click
+    snapshots and activity triggering, routed to the monitor under the point.
+    Pipelines are headless: one highlight overlay cannot outline several
+    monitors, and a Tk overlay per pipeline is wasted work.
+    """
+    
+    def __init__(self, frame_source=None):
+        self.frame_source = frame_source
+        self.recorders = {}
+        self.monitors = []
+    
+    @property
+    def recording(self):
+        return any(recorder.recording for recorder in self.recorders.values())
+    
+    @property
+    def output_paths(self):
+        return {index: recorder.output_path for index, recorder in self.recorders.items()}
+    
+    def start_recording(self, base_path, monitor_indices, fps=15, record_audio=True, clock=None, **options):
+        """Start one pipeline per monitor index, writing <base_path>_mon<index>.mp4"""
+        if self.recording:
+            return False
+        
+        clock = clock or RecordingClock()
+        self.recorders = {}
+        self.monitors = []
+        for position, index in enumerate(monitor_indices):
+            recorder = MultiScreenVideoRecorder(frame_source=self.frame_source, headless=True)
+            if not self.monitors:
+                # Monitor layout for routing points, read once through the first pipeline
+                self.monitors = recorder.get_available_monitors()
+            recorder.selected_monitor = index
+            started = recorder.start_recording(f"{base_path}_mon{index}.mp4", fps,
+                                               record_audio and position == 0, clock, **options)
+            if started:
+                self.recorders[index] = recorder
+        print(f"🖥️ Recording {len(self.recorders)} monitors in parallel: {sorted(self.recorders)}")
+        return bool(self.recorders)
+    
+    def stop_recording(self):
+        # Signal every pipeline first so they wind down together, then finalize each
+        self.request_stop()
+        self.join_capture()
+        for label, step in self.finalization_steps():
+            step()
+    
+    def request_stop(self):
+        for recorder in self.recorders.values():
+            if recorder.recording:
+                recorder.request_stop()
+    
+    def join_capture(self):
+        for recorder in self.recorders.values():
+            recorder.join_capture()
+    
+    def finalization_steps(self):
+        return [(f"monitor {index} {label}", step)
+                for index, recorder in self.recorders.items()
+                for label, step in recorder.finalization_steps()]
+    
+    def recorder_for_point(self, x, y):
+        index = monitor_for_point(self.monitors, x, y)
+        return self.recorders.get(index)
+    
+    def on_interaction(self, interaction):
+        for recorder in self.recorders.values():
+            recorder.on_interaction(interaction)
+    
+    def screen_to_frame(self, x, y):
+        recorder = self.recorder_for_point(x, y)
+        return recorder.screen_to_frame(x, y) if recorder else None
+    
+    def snapshot_frames(self, x=None, y=None):
+        """Frame ring of the monitor under (x, y), or of the first pipeline without a point"""
+        if x is not None and y is not None:
+            recorder = self.recorder_for_point(x, y)
+        else:
+            recorder = next(iter(self.recorders.values()), None)
+        return recorder.snapshot_frames() if recorder else []
+    
+    def latest_frame_time(self):
+        return max((recorder.latest_frame_time() for recorder in self.recorders.values()), default=float('-inf'))
+    
+    def telemetry_snapshot(self):
+        return {'monitors': {index: recorder.telemetry_snapshot() for index, recorder in self.recorders.items()}}
+    
+    def telemetry_history(self):
+        history = {}
+        for recorder in self.recorders.values():
+            history.update(recorder.telemetry_history())
+        return history
+
 class FullKeyboardLogger:
     """ENHANCED keyboard logger with Core Graphics event monitoring"""
     
     def __init__(self):
         self.keyboard_events = []
         self.logging = False
+        # Closed once stop_logging has finished: nothing is appended to the event lists after that
+        self.closed = True
         self.event_tap = None
-        self.event_thread = None
-        self.clipboard_thread = None
-        self.app_monitor_thread = None
+        self.workers = WorkerSupervisor('keyboard')
+        self.app_observer = None
+        
+        # The tap callback only appends raw tuples here (and sets key_ready); the consumer decodes them
+        self.raw_key_events = deque()
+        self.key_ready = threading.Event()
+        self.callback_latency = CallbackLatencyStats()
+        self.max_queue_depth = 0
+        self.clock = RecordingClock()
         
         # State tracking
         self.last_clipboard = ""
@@ -697,30 +1233,46 @@ class FullKeyboardLogger:
         self.consecutive_keys = 0
         self.last_key_time = 0
         
-    def start_logging(self):
+        # Capture-time reconstruction of typed text and app switches
+        self.typing_tracker = TypingSessionTracker()
+        self.app_switches = []
+        
+        # Callbacks run for every logged keyboard-side event (must return quickly)
+        self.listeners = []
+        
+    def start_logging(self, clock=None):
         """Start comprehensive keyboard logging"""
         if self.logging:
             return True
             
+        self.clock = clock or RecordingClock()
+        self.clock.mark_stream_start('keyboard')
         self.logging = True
+        self.closed = False
         self.keyboard_events = []
+        self.typing_tracker = TypingSessionTracker()
+        self.app_switches = []
+        self.raw_key_events = deque()
+        self.key_ready = threading.Event()
+        self.callback_latency = CallbackLatencyStats()
+        self.max_queue_depth = 0
+        self.workers = WorkerSupervisor('keyboard')
+        self.workers.on_stop(self.key_ready.set)
         
         print("⌨️ Starting ENHANCED keyboard logging...")
         
+        # Decode and enrich key events off the event-tap thread
+        self.workers.start('key-consumer', self._key_event_consumer)
+        
         # Start Core Graphics event monitoring
-        self.event_thread = threading.Thread(target=self._core_graphics_monitor)
-        self.event_thread.daemon = True
-        self.event_thread.start()
+        self.workers.start('event-tap', self._core_graphics_monitor)
         
         # Start clipboard monitoring
-        self.clipboard_thread = threading.Thread(target=self._clipboard_monitor)
-        self.clipboard_thread.daemon = True
-        self.clipboard_thread.start()
+        self.workers.start('clipboard', self._clipboard_monitor)
         
-        # Start app monitoring
-        self.app_monitor_thread = threading.Thread(target=self._app_monitor)
-        self.app_monitor_thread.daemon = True
-        self.app_monitor_thread.start()
+        # Start app monitoring (workspace notifications, polling only as a fallback)
+        if not self._start_app_observer():
+            self.workers.start('app-poll', self._app_monitor)
         
         return True
     
@@ -731,71 +1283,43 @@ class FullKeyboardLogger:
             from Quartz import (
                 CGEventTapCreate, CGEventTapEnable, CGEventMaskBit, 
                 kCGEventKeyDown, kCGEventKeyUp, kCGEventFlagsChanged,
+                kCGEventTapDisabledByTimeout, kCGEventTapDisabledByUserInput,
                 kCGHIDEventTap, kCGHeadInsertEventTap, kCGEventTapOptionListenOnly,
                 CFRunLoopGetCurrent, CFRunLoopAddSource, kCFRunLoopDefaultMode,
+                CFRunLoopRunInMode, CFRunLoopStop,
                 CGEventGetIntegerValueField, kCGKeyboardEventKeycode,
                 CFMachPortCreateRunLoopSource, CFMachPortInvalidate,
                 CGEventGetFlags
             )
-            from Cocoa import NSRunLoop, NSDefaultRunLoopMode, NSDate
-            
             print("🔑 Starting Core Graphics keyboard monitoring...")
             
+            raw_key_events = self.raw_key_events
+            key_ready = self.key_ready
+            latency = self.callback_latency
+            monotonic_ns = time.monotonic_ns
+            perf_counter_ns = time.perf_counter_ns
+            
             def key_event_callback(proxy, event_type, event, refcon):
+                # Runs on the event-tap thread: keep it to a raw append so macOS
+                # never disables the tap for being slow. Decoding happens in
+                # _key_event_consumer.
+                started = perf_counter_ns()
                 try:
-                    if not self.logging:
-                        return event
-                    
-                    timestamp = time.time()
-                    key_code = int(CGEventGetIntegerValueField(event, kCGKeyboardEventKeycode))
-                    key_name = self._key_code_to_name(key_code)
-                    flags = CGEventGetFlags(event)
-                    modifiers = self._decode_flags(flags)
-                    
-                    # Log key events with full context
-                    if event_type == kCGEventKeyDown:
-                        self._log_key_event({
-                            'type': 'key_press',
-                            'key_code': key_code,
-                            'key_name': key_name,
-                            'modifiers': modifiers,
-                            'is_character': key_name.isalnum() or key_name in ['.', ',', '!', '?', ';', ':', "'", '"', ' '],
-                            'is_special': key_name in ['Return', 'Tab', 'Delete', 'Escape', 'Space'],
-                            'timestamp': timestamp,
-                            'capture_method': 'core_graphics'
-                        })
-                        
-                        # Track typing patterns
-                        self._update_typing_session(key_name, timestamp)
-                        
-                        print(f"🔑 Key pressed: {key_name} (code: {key_code}) {'+'.join(modifiers) if modifiers else ''}")
-                    
-                    elif event_type == kCGEventKeyUp:
-                        # Only log key releases for special keys
-                        if key_name in ['Return', 'Tab', 'Delete', 'Escape', 'Command', 'Shift', 'Control', 'Option']:
-                            self._log_key_event({
-                                'type': 'key_release',
-                                'key_code': key_code,
-                                'key_name': key_name,
-                                'modifiers': modifiers,
-                                'timestamp': timestamp,
-                                'capture_method': 'core_graphics'
-                            })
-                    
-                    elif event_type == kCGEventFlagsChanged:
-                        # Log modifier changes
-                        self._log_key_event({
-                            'type': 'modifier_change',
-                            'modifiers': modifiers,
-                            'timestamp': timestamp,
-                            'capture_method': 'core_graphics'
-                        })
-                    
-                    return event
-                    
-                except Exception as e:
-                    print(f"Key event callback error: {e}")
-                    return event
+                    if event_type in (kCGEventTapDisabledByTimeout, kCGEventTapDisabledByUserInput):
+                        if self.event_tap is not None:
+                            CGEventTapEnable(self.event_tap, True)
+                    elif self.logging:
+                        raw_key_events.append((
+                            monotonic_ns(),
+                            CGEventGetIntegerValueField(event, kCGKeyboardEventKeycode),
+                            CGEventGetFlags(event),
+                            event_type
+                        ))
+                        key_ready.set()
+                except Exception:
+                    pass
+                latency.record(perf_counter_ns() - started)
+                return event
             
             # Create event tap with proper parameters
             event_mask = (
@@ -818,6 +1342,7 @@ class FullKeyboardLogger:
                     print("❌ Failed to create event tap - accessibility permissions needed")
                     print("💡 Enable 'Accessibility' permission for Terminal/Python in System Preferences")
                     return
+                self.event_tap = event_tap
                 
                 # Set up run loop
                 run_loop_source = CFMachPortCreateRunLoopSource(None, event_tap, 0)
@@ -827,17 +1352,18 @@ class FullKeyboardLogger:
                 CGEventTapEnable(event_tap, True)
                 print("✅ Core Graphics event tap enabled - capturing all keystrokes")
                 
-                # Run event loop
-                while self.logging:
+                # Run event loop until a stop request calls CFRunLoopStop on it
+                self.workers.on_stop(lambda: CFRunLoopStop(run_loop))
+                while not self.workers.stopping:
                     try:
-                        run_until = NSDate.dateWithTimeIntervalSinceNow_(0.1)
-                        NSRunLoop.currentRunLoop().runMode_beforeDate_(NSDefaultRunLoopMode, run_until)
+                        CFRunLoopRunInMode(kCFRunLoopDefaultMode, 1.0, False)
                     except Exception as e:
                         print(f"Event loop error: {e}")
-                        time.sleep(0.1)
+                        self.workers.wait(0.1)
                 
                 # Cleanup
                 CGEventTapEnable(event_tap, False)
+                self.event_tap = None
                 print("🛑 Core Graphics event tap disabled")
                 
             except Exception as e:
@@ -848,21 +1374,74 @@ class FullKeyboardLogger:
         except Exception as e:
             print(f"❌ Core Graphics monitoring failed: {e}")
     
+    def _key_event_consumer(self):
+        """Decode raw tap events, enrich them and track typing sessions"""
+        raw_key_events = self.raw_key_events
+        while True:
+            # Woken by the tap callback, or by a stop request (then drain and exit)
+            self.key_ready.wait()
+            self.key_ready.clear()
+            depth = len(raw_key_events)
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+            while raw_key_events:
+                try:
+                    self._process_raw_key_event(*raw_key_events.popleft())
+                except Exception as e:
+                    print(f"Key event processing error: {e}")
+            if self.workers.stopping:
+                return
+    
+    def _process_raw_key_event(self, monotonic_ns, key_code, flags, event_type):
+        """Turn one (monotonic_ns, key code, flags, event type) tuple into logged events"""
+        timestamp = self.clock.from_monotonic_ns(monotonic_ns)
+        key_code = int(key_code)
+        key_name = self._key_code_to_name(key_code)
+        modifiers = self._decode_flags(flags)
+        
+        # Log key events with full context
+        if event_type == CG_EVENT_KEY_DOWN:
+            self._log_key_event({
+                'type': 'key_press',
+                'key_code': key_code,
+                'key_name': key_name,
+                'modifiers': modifiers,
+                'is_character': key_name.isalnum() or key_name in CHARACTER_PUNCTUATION,
+                'is_special': key_name in SPECIAL_KEYS,
+                'timestamp': timestamp,
+                'capture_method': 'core_graphics'
+            })
+            
+            # Track typing patterns
+            self._update_typing_session(key_name, timestamp)
+            self.typing_tracker.feed_key(key_name, modifiers, timestamp, self.last_app)
+            
+            print(f"🔑 Key pressed: {key_name} (code: {key_code}) {'+'.join(modifiers) if modifiers else ''}")
+        
+        elif event_type == CG_EVENT_KEY_UP:
+            # Only log key releases for special keys
+            if key_name in RELEASE_LOGGED_KEYS:
+                self._log_key_event({
+                    'type': 'key_release',
+                    'key_code': key_code,
+                    'key_name': key_name,
+                    'modifiers': modifiers,
+                    'timestamp': timestamp,
+                    'capture_method': 'core_graphics'
+                })
+        
+        elif event_type == CG_EVENT_FLAGS_CHANGED:
+            # Log modifier changes
+            self._log_key_event({
+                'type': 'modifier_change',
+                'modifiers': modifiers,
+                'timestamp': timestamp,
+                'capture_method': 'core_graphics'
+            })
+    
     def _key_code_to_name(self, key_code):
         """Convert macOS key code to readable name"""
-        key_map = {
-            0: 'a', 1: 's', 2: 'd', 3: 'f', 4: 'h', 5: 'g', 6: 'z', 7: 'x', 8: 'c', 9: 'v',
-            10: '§', 11: 'b', 12: 'q', 13: 'w', 14: 'e', 15: 'r', 16: 'y', 17: 't',
-            18: '1', 19: '2', 20: '3', 21: '4', 22: '6', 23: '5', 24: '=', 25: '9',
-            26: '7', 27: '-', 28: '8', 29: '0', 30: ']', 31: 'o', 32: 'u', 33: '[',
-            34: 'i', 35: 'p', 36: 'Return', 37: 'l', 38: 'j', 39: "'", 40: 'k', 41: ';',
-            42: '\\', 43: ',', 44: '/', 45: 'n', 46: 'm', 47: '.', 48: 'Tab',
-            49: 'Space', 50: '`', 51: 'Delete', 52: 'Enter', 53: 'Escape',
-            54: 'RightCommand', 55: 'Command', 56: 'Shift', 57: 'CapsLock',
-            58: 'Option', 59: 'Control', 60: 'RightShift', 61: 'RightOption',
-            62: 'RightControl', 63: 'Function'
-        }
-        return key_map.get(key_code, f'Key{key_code}')
+        return KEY_CODE_NAMES.get(key_code, f'Key{key_code}')
     
     def _decode_flags(self, flags):
         """Decode modifier flags"""
@@ -878,15 +1457,25 @@ class FullKeyboardLogger:
         return modifiers
     
     def _clipboard_monitor(self):
-        """Monitor clipboard changes"""
+        """Monitor clipboard changes via NSPasteboard.changeCount"""
         if not APPKIT_AVAILABLE:
             return
             
         try:
+            from AppKit import NSPasteboard
+            pasteboard = NSPasteboard.generalPasteboard()
+            last_change_count = pasteboard.changeCount()
             self.last_clipboard = self._get_clipboard()
             
-            while self.logging:
+            while not self.workers.wait(CLIPBOARD_CHANGE_POLL):
                 try:
+                    change_count = pasteboard.changeCount()
+                    if change_count == last_change_count:
+                        continue
+                    
+                    # Only now transfer the clipboard contents
+                    timestamp = self.clock.now()
+                    last_change_count = change_count
                     current_clipboard = self._get_clipboard()
                     
                     if current_clipboard != self.last_clipboard and current_clipboard:
@@ -895,43 +1484,85 @@ class FullKeyboardLogger:
                             'action': 'copy_paste',
                             'content_length': len(current_clipboard),
                             'content_preview': self._safe_preview(current_clipboard),
-                            'timestamp': time.time(),
+                            'change_count': change_count,
+                            'timestamp': timestamp,
                             'inferred_shortcut': 'Cmd+C or Cmd+V'
                         })
                         self.last_clipboard = current_clipboard
-                    
-                    time.sleep(0.3)
                 except:
-                    time.sleep(1)
+                    self.workers.wait(1)
                     
         except Exception as e:
             print(f"Clipboard monitoring error: {e}")
     
+    def _start_app_observer(self):
+        """Register for workspace app activation notifications; False if unavailable"""
+        if not APPKIT_AVAILABLE:
+            return False
+        
+        try:
+            from AppKit import NSWorkspace, NSWorkspaceDidActivateApplicationNotification, NSWorkspaceApplicationKey
+            from Foundation import NSOperationQueue
+            self.last_app = self._get_current_app()
+            center = NSWorkspace.sharedWorkspace().notificationCenter()
+            
+            def on_activate(notification):
+                try:
+                    app = notification.userInfo()[NSWorkspaceApplicationKey]
+                    self._record_app_switch(str(app.localizedName() or 'Unknown'), self.clock.now())
+                except Exception as e:
+                    print(f"App activation handling error: {e}")
+            
+            self.app_observer = center.addObserverForName_object_queue_usingBlock_(
+                NSWorkspaceDidActivateApplicationNotification, None,
+                NSOperationQueue.alloc().init(), on_activate
+            )
+            print("🪟 App switches tracked via workspace activation notifications")
+            return True
+        except Exception as e:
+            print(f"⚠️ Workspace notifications unavailable, polling app focus instead: {e}")
+            self.app_observer = None
+            return False
+    
+    def _stop_app_observer(self):
+        if self.app_observer is None:
+            return
+        try:
+            from AppKit import NSWorkspace
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self.app_observer)
+        except Exception:
+            pass
+        self.app_observer = None
+    
+    def _record_app_switch(self, current_app, timestamp):
+        """Log an app focus change and close any typing session in the previous app"""
+        if not self.logging or current_app == self.last_app:
+            return
+        switch = {
+            'type': 'app_switch',
+            'from_app': self.last_app,
+            'to_app': current_app,
+            'timestamp': timestamp,
+            'inferred_shortcut': 'Cmd+Tab or mouse click'
+        }
+        self._log_key_event(switch)
+        self.app_switches.append(switch)
+        self.typing_tracker.finish('app_switch', timestamp)
+        self.last_app = current_app
+    
     def _app_monitor(self):
-        """Monitor app focus changes"""
+        """Poll app focus changes (fallback when notifications are unavailable)"""
         if not APPKIT_AVAILABLE:
             return
             
         try:
             self.last_app = self._get_current_app()
             
-            while self.logging:
+            while not self.workers.wait(APP_POLL_FALLBACK):
                 try:
-                    current_app = self._get_current_app()
-                    
-                    if current_app != self.last_app:
-                        self._log_key_event({
-                            'type': 'app_switch',
-                            'from_app': self.last_app,
-                            'to_app': current_app,
-                            'timestamp': time.time(),
-                            'inferred_shortcut': 'Cmd+Tab or mouse click'
-                        })
-                        self.last_app = current_app
-                    
-                    time.sleep(0.5)
+                    self._record_app_switch(self._get_current_app(), self.clock.now())
                 except:
-                    time.sleep(1)
+                    self.workers.wait(1)
                     
         except Exception as e:
             print(f"App monitoring error: {e}")
@@ -939,6 +1570,7 @@ class FullKeyboardLogger:
     def _get_clipboard(self):
         """Get clipboard content"""
         try:
+            from AppKit import NSPasteboard
             pb = NSPasteboard.generalPasteboard()
             return pb.stringForType_("public.utf8-plain-text") or ""
         except:
@@ -947,6 +1579,7 @@ class FullKeyboardLogger:
     def _get_current_app(self):
         """Get current app name"""
         try:
+            from AppKit import NSWorkspace
             workspace = NSWorkspace.sharedWorkspace()
             active_app = workspace.activeApplication()
             return active_app.get('NSApplicationName', 'Unknown')
@@ -1001,69 +1634,115 @@ class FullKeyboardLogger:
     
     def _log_key_event(self, event_data):
         """Log keyboard event"""
+        if self.closed:
+            return
         try:
             event = {
-                'datetime': datetime.now().isoformat(),
+                'datetime': self.clock.isoformat(event_data.get('timestamp')),
                 'source': 'enhanced_keyboard_logger',
                 **event_data
             }
             self.keyboard_events.append(event)
+            for listener in self.listeners:
+                listener(event)
             
         except Exception as e:
             print(f"Keyboard event logging error: {e}")
     
-    def stop_logging(self):
-        """Stop keyboard logging"""
+    def request_stop(self):
+        """Stop capturing keys now; stop_logging waits for the threads"""
         if not self.logging:
             return
-            
+        
         self.logging = False
+        self.workers.request_stop()
+        self._stop_app_observer()
+    
+    def stop_logging(self):
+        """Stop keyboard logging"""
+        self.request_stop()
+        if self.closed:
+            return
+        
+        # Wait for threads to finish (the consumer drains what the tap queued)
+        self.workers.join(timeout=2)
         
-        # Wait for threads to finish
-        if self.event_thread:
-            self.event_thread.join(timeout=2)
-        if self.clipboard_thread:
-            self.clipboard_thread.join(timeout=1)
-        if self.app_monitor_thread:
-            self.app_monitor_thread.join(timeout=1)
+        # Close any text still being typed when recording stopped
+        self.typing_tracker.finish('stopped', self.clock.now())
+        self.closed = True
         
-        print(f"✅ Enhanced keyboard logging stopped - captured {len(self.keyboard_events)} events")
+        print(f"✅ Enhanced keyboard logging stopped - captured {len(self.keyboard_events)} events, "
+              f"{len(self.typing_tracker.sessions)} typing sessions")
+        latency = self.callback_latency.summary()
+        if latency['count']:
+            print(f"⏱️ Event-tap callback latency: p50 {latency['p50_us']}µs, p99 {latency['p99_us']}µs, "
+                  f"max {latency['max_us']}µs over {latency['count']} events (max queue depth {self.max_queue_depth})")
+    
+    def capture_stats(self):
+        """Keyboard capture health for session_info"""
+        return {
+            'callback_latency': self.callback_latency.summary(),
+            'max_queue_depth': self.max_queue_depth
+        }
 
 class MultiScreenInteractionLogger:
     """Multi-screen interaction logger with enhanced keyboard support"""
     
-    def __init__(self, accessibility_inspector=None):
+    def __init__(self, accessibility_inspector=None, trajectory_tolerance=DEFAULT_TOLERANCE):
         self.inspector = accessibility_inspector
         self.interactions = []
         self.logging = False
+        # Closed once stop_logging has finished: nothing is appended to interactions after that
+        self.closed = True
         
-        # Mouse tracking
-        self.mouse_thread = None
+        # Mouse tracking (path compressed to inflection points and hover dwells)
+        self.workers = WorkerSupervisor('mouse')
         self.last_position = None
         self.click_state = False
+        self.trajectory_tolerance = trajectory_tolerance
+        self.trajectory = TrajectoryCompressor(trajectory_tolerance)
+        
+        # Callbacks run for every logged interaction (must return quickly)
+        self.listeners = []
+        
+        # Optional screen point -> recorded frame pixel mapping (ROI capture)
+        self.position_mapper = None
+        
+        # Monitor layout (get_available_monitors entries) for tagging events with their monitor
+        self.monitor_layout = []
         
         # Enhanced keyboard logger
         self.keyboard_logger = FullKeyboardLogger()
         
+        # Mouse and keyboard event rates for the live telemetry
+        self.event_rates = EventRates()
+        self.add_listener(self.event_rates.record)
+        
+        self.clock = RecordingClock()
         self.start_time = None
+        self.stop_time = None
         
-    def start_logging(self, capture_keyboard=True):
+    def start_logging(self, capture_keyboard=True, clock=None):
         """Start comprehensive interaction logging"""
         if self.logging:
             return True
         
         self.logging = True
+        self.closed = False
         self.interactions = []
-        self.start_time = time.time()
+        self.trajectory = TrajectoryCompressor(self.trajectory_tolerance)
+        self.event_rates.reset()
+        self.clock = clock or RecordingClock()
+        self.start_time = self.clock.mark_stream_start('mouse')
+        self.stop_time = None
         
         # Start mouse tracking
-        self.mouse_thread = threading.Thread(target=self._mouse_loop)
-        self.mouse_thread.daemon = True
-        self.mouse_thread.start()
+        self.workers = WorkerSupervisor('mouse')
+        self.workers.start('mouse', self._mouse_loop)
         
         # Start enhanced keyboard logging
         if capture_keyboard and APPKIT_AVAILABLE:
-            self.keyboard_logger.start_logging()
+            self.keyboard_logger.start_logging(self.clock)
         
         print("✅ Multi-screen interaction logging started with enhanced keyboard capture")
         return True
@@ -1072,36 +1751,25 @@ class MultiScreenInteractionLogger:
         """Mouse tracking loop"""
         print("🔍 Starting mouse tracking...")
         
-        while self.logging:
+        while not self.workers.stopping:
             try:
                 current_pos = self._get_safe_mouse_position()
                 
                 if current_pos != (0, 0):
-                    # Mouse movement detection
-                    if self.last_position:
-                        dx = abs(current_pos[0] - self.last_position[0])
-                        dy = abs(current_pos[1] - self.last_position[1])
-                        
-                        if dx > 10 or dy > 10:
-                            interaction = {
-                                'type': 'mouse_move',
-                                'timestamp': self._get_relative_timestamp(),
-                                'datetime': datetime.now().isoformat(),
-                                'position': {'x': current_pos[0], 'y': current_pos[1]},
-                                'movement': {'dx': dx, 'dy': dy},
-                                'source': 'multiscreen_enhanced'
-                            }
-                            self._safe_log_interaction(interaction)
+                    # Mouse movement: only inflection points and hover dwells are kept
+                    timestamp = self._get_relative_timestamp()
+                    for point in self.trajectory.add(timestamp, current_pos[0], current_pos[1]):
+                        self._log_trajectory_point(point)
                     
                     # Click detection
                     self._check_for_clicks(current_pos)
                     self.last_position = current_pos
                 
-                time.sleep(0.1)
+                self.workers.wait(0.1)
                 
             except Exception as e:
                 print(f"⚠️ Mouse tracking error: {e}")
-                time.sleep(0.5)
+                self.workers.wait(0.5)
         
         print("🛑 Mouse tracking stopped")
     
@@ -1129,41 +1797,88 @@ class MultiScreenInteractionLogger:
                 
                 if current_mouse_down > 0 and not self.click_state:
                     self.click_state = True
+                    timestamp = self._get_relative_timestamp()
+                    # Keep the exact path end where the click happened
+                    for point in self.trajectory.anchor_at(timestamp, current_pos[0], current_pos[1]):
+                        self._log_trajectory_point(point)
+                    # A click moves focus, so whatever was being typed is finished
+                    self.keyboard_logger.typing_tracker.finish('click', timestamp)
                     interaction = {
                         'type': 'mouse_press',
-                        'timestamp': self._get_relative_timestamp(),
-                        'datetime': datetime.now().isoformat(),
+                        'timestamp': timestamp,
+                        'datetime': self.clock.isoformat(timestamp),
                         'position': {'x': current_pos[0], 'y': current_pos[1]},
                         'button': 'left',
                         'source': 'multiscreen_enhanced'
                     }
+                    self._add_roi_position(interaction, current_pos)
                     self._safe_log_interaction(interaction)
                     
                 elif current_mouse_down == 0 and self.click_state:
                     self.click_state = False
+                    timestamp = self._get_relative_timestamp()
                     interaction = {
                         'type': 'mouse_release',
-                        'timestamp': self._get_relative_timestamp(),
-                        'datetime': datetime.now().isoformat(),
+                        'timestamp': timestamp,
+                        'datetime': self.clock.isoformat(timestamp),
                         'position': {'x': current_pos[0], 'y': current_pos[1]},
                         'button': 'left',
                         'source': 'multiscreen_enhanced'
                     }
+                    self._add_roi_position(interaction, current_pos)
                     self._safe_log_interaction(interaction)
         except:
             pass
     
+    def _add_roi_position(self, interaction, position):
+        """Add the click position in recorded-frame (ROI) pixels; left out for clicks outside the ROI"""
+        if self.position_mapper is None:
+            return
+        mapped = self.position_mapper(position[0], position[1])
+        if mapped:
+            interaction['roi_position'] = {'x': mapped[0], 'y': mapped[1]}
+    
+    def _log_trajectory_point(self, point):
+        """Log a kept path point ('move') or hover pause ('dwell') from the trajectory compressor"""
+        interaction = {
+            'type': 'mouse_move' if point['kind'] == 'move' else 'mouse_dwell',
+            'timestamp': point['timestamp'],
+            'datetime': self.clock.isoformat(point['timestamp']),
+            'position': {'x': point['x'], 'y': point['y']},
+            'source': 'multiscreen_enhanced'
+        }
+        if point['kind'] == 'move':
+            interaction['movement'] = {'dx': point['dx'], 'dy': point['dy']}
+        else:
+            interaction['duration'] = point['duration']
+        self._safe_log_interaction(interaction)
+    
     def _get_relative_timestamp(self):
-        """Get relative timestamp"""
+        """Get session-relative timestamp from the shared recording clock"""
         try:
-            return time.time() - self.start_time if self.start_time else 0
+            return self.clock.now()
         except:
             return 0
     
+    def add_listener(self, callback):
+        """Register callback(interaction) to be told about each logged mouse and keyboard event"""
+        self.listeners.append(callback)
+        self.keyboard_logger.listeners.append(callback)
+    
     def _safe_log_interaction(self, interaction):
         """Log interaction safely"""
+        if self.closed:
+            return
         try:
+            if self.monitor_layout and 'position' in interaction:
+                position = interaction['position']
+                interaction['monitor'] = monitor_for_point(self.monitor_layout, position['x'], position['y'])
             self.interactions.append(interaction)
+            for listener in self.listeners:
+                try:
+                    listener(interaction)
+                except Exception as e:
+                    print(f"⚠️ Interaction listener error: {e}")
             
             if len(self.interactions) % 50 == 0:
                 print(f"📝 Logged {len(self.interactions)} interactions...")
@@ -1171,34 +1886,68 @@ class MultiScreenInteractionLogger:
         except Exception as e:
             print(f"⚠️ Interaction log error: {e}")
     
-    def stop_logging(self):
-        """Stop interaction logging"""
+    def request_stop(self):
+        """Stop capturing now (returns immediately); stop_logging joins and flushes"""
         if not self.logging:
             return
         
         self.logging = False
+        self.stop_time = self._get_relative_timestamp()
+        self.workers.request_stop()
+        self.keyboard_logger.request_stop()
+    
+    def stop_logging(self):
+        """Stop interaction logging"""
+        self.request_stop()
+        if self.closed:
+            return
         
         # Stop mouse thread
-        if self.mouse_thread:
-            self.mouse_thread.join(timeout=3)
+        self.workers.join(timeout=3)
+        for point in self.trajectory.flush():
+            self._log_trajectory_point(point)
+        self.closed = True
         
         # Stop keyboard logger
         self.keyboard_logger.stop_logging()
         
         print(f"✅ Multi-screen interaction logging stopped")
         print(f"   Mouse interactions: {len(self.interactions)}")
+        trajectory = self.trajectory.stats()
+        if trajectory['compression_ratio']:
+            print(f"   Mouse path: {trajectory['samples']} samples -> {trajectory['moves_kept']} moves + "
+                  f"{trajectory['dwells']} dwells ({trajectory['compression_ratio']}x)")
         print(f"   Keyboard events: {len(self.keyboard_logger.keyboard_events)}")
+        for status in (self.workers.status(), self.keyboard_logger.workers.status()):
+            if status['workers']:
+                print(f"   🧵 {status['supervisor']} workers stopped (max {status['max_stop_latency_ms']} ms)")
+    
+    def telemetry_snapshot(self):
+        """Event counts by type, recent event rate and keyboard queue depth"""
+        return {**self.event_rates.snapshot(), 'keyboard_queue_max': self.keyboard_logger.max_queue_depth}
     
     def save_interactions(self, output_path):
         """Save all interaction data"""
         try:
+            # Every stream is already stamped on the shared session clock
+            typing_sessions = list(self.keyboard_logger.typing_tracker.sessions)
+            app_switches = list(self.keyboard_logger.app_switches)
+            
             comprehensive_data = {
                 'session_info': {
                     'platform': PLATFORM,
-                    'start_time': datetime.now().isoformat(),
-                    'duration': self._get_relative_timestamp(),
+                    'start_time': self.clock.isoformat(0),
+                    'duration': self.stop_time if self.stop_time is not None else self._get_relative_timestamp(),
+                    'clock': self.clock.describe(),
                     'interaction_count': len(self.interactions),
                     'keyboard_event_count': len(self.keyboard_logger.keyboard_events),
+                    'typing_session_count': len(typing_sessions),
+                    'app_switch_count': len(app_switches),
+                    'keyboard_capture': self.keyboard_logger.capture_stats(),
+                    'mouse_trajectory': self.trajectory.stats(),
+                    # 'roi_frame': clicks inside the ROI carry roi_position in recorded-frame pixels
+                    'coordinate_space': 'roi_frame' if self.position_mapper else 'screen',
+                    'worker_shutdown': [self.workers.status(), self.keyboard_logger.workers.status()],
                     'capture_method': 'multiscreen_enhanced_fixed',
                     'features': {
                         'multi_screen_recording': True,
@@ -1206,6 +1955,7 @@ class MultiScreenInteractionLogger:
                         'enhanced_keyboard_logging': True,
                         'core_graphics_event_tap': True,
                         'mouse_tracking': True,
+                        'mouse_trajectory_compression': True,
                         'click_detection': True,
                         'clipboard_monitoring': True,
                         'app_switching': True,
@@ -1214,7 +1964,9 @@ class MultiScreenInteractionLogger:
                     }
                 },
                 'mouse_interactions': self.interactions,
-                'keyboard_events': self.keyboard_logger.keyboard_events
+                'keyboard_events': self.keyboard_logger.keyboard_events,
+                'typing_sessions': typing_sessions,
+                'app_switches': app_switches
             }
             
             with open(output_path, 'w') as f:
@@ -1231,6 +1983,7 @@ class MultiScreenRPARecorderApp:
     """Enhanced Multi-screen RPA Recorder GUI with visual feedback"""
     
     def __init__(self):
+        _import_tk()
         self.root = tk.Tk()
         self.root.title("Enhanced RPA Recorder (Multi-Screen Fixed Edition)")
         self.root.geometry("700x580")  # More compact size
@@ -1243,19 +1996,46 @@ class MultiScreenRPARecorderApp:
             except Exception as e:
                 print(f"⚠️ Accessibility inspector failed: {e}")
         
-        self.video_recorder = MultiScreenVideoRecorder()
-        self.interaction_logger = MultiScreenInteractionLogger(self.accessibility_inspector)
+        # Get available monitors
+        self.monitors = MultiScreenVideoRecorder().get_available_monitors()
+        
+        # Recorders and logger; each recording gets fresh ones so a stopped one can finish in the background
+        self._create_pipeline()
+        
+        # Stopped recordings are written out in the background (see finalization_queue)
+        self.finalization_queue = FinalizationQueue()
         
         # State
         self.recording = False
         self.output_directory = str(Path.cwd() / "records")
         Path(self.output_directory).mkdir(exist_ok=True)
         
-        # Get available monitors
-        self.monitors = self.video_recorder.get_available_monitors()
-        
         self.setup_gui()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(FINALIZATION_POLL_MS, self._poll_finalization)
+        self.root.after(TELEMETRY_POLL_MS, self._poll_telemetry)
+    
+    def _create_pipeline(self):
+        """Fresh recorders, logger and snapshotter (the active recorder is wired in on start)"""
+        self.video_recorder = MultiScreenVideoRecorder()
+        self.multi_monitor_recorder = MultiMonitorRecorder()
+        # Whichever of the two is recording (set on start)
+        self.active_recorder = self.video_recorder
+        self.interaction_logger = MultiScreenInteractionLogger(self.accessibility_inspector)
+        self.interaction_logger.monitor_layout = self.monitors
+        
+        # Per-click close-ups taken live from the video frame ring
+        self.click_snapshotter = ClickSnapshotter(self.video_recorder)
+        self.interaction_logger.add_listener(self.click_snapshotter.on_interaction)
+    
+    def _wire_active_recorder(self, recorder, roi=None):
+        """Route snapshots, activity and (for ROI capture) click mapping to the recorder that is recording"""
+        self.active_recorder = recorder
+        self.click_snapshotter.frame_source = recorder
+        # Activity-triggered recording and adaptive FPS listen for any interaction
+        self.interaction_logger.add_listener(recorder.on_interaction)
+        # Full-monitor recordings keep clicks in screen coordinates only
+        self.interaction_logger.position_mapper = recorder.screen_to_frame if roi else None
     
     def setup_gui(self):
         """Setup compact multi-screen GUI"""
@@ -1272,6 +2052,11 @@ class MultiScreenRPARecorderApp:
         status_label = ttk.Label(self.root, textvariable=self.status_var, font=("Arial", 11, "bold"))
         status_label.pack(pady=3)
         
+        # Live recorder telemetry (refreshed every TELEMETRY_POLL_MS while recording)
+        self.telemetry_var = tk.StringVar(value="")
+        ttk.Label(self.root, textvariable=self.telemetry_var, font=("Courier", 9),
+                  foreground="gray25", justify=tk.CENTER).pack(pady=(0, 3))
+        
         # Main content frame with two columns
         main_frame = ttk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
@@ -1344,6 +2129,38 @@ class MultiScreenRPARecorderApp:
         self.fps_var = tk.StringVar(value="15")
         ttk.Entry(video_audio_frame, textvariable=self.fps_var, width=4, font=("Arial", 9)).pack(side=tk.LEFT, padx=(2, 0))
         
+        # FPS above becomes the ceiling; idle periods drop toward DEFAULT_FLOOR_FPS
+        self.adaptive_fps_enabled = tk.BooleanVar(value=False)
+        ttk.Checkbutton(video_audio_frame, text="Adaptive", variable=self.adaptive_fps_enabled).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Region of interest
+        roi_frame = ttk.Frame(options_frame)
+        roi_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(roi_frame, text="Capture:").pack(side=tk.LEFT)
+        self.roi_mode_var = tk.StringVar(value="Full monitor")
+        ttk.Combobox(roi_frame, textvariable=self.roi_mode_var, state="readonly", width=14, font=("Arial", 9),
+                     values=["Full monitor", "Active window", "Rectangle"]).pack(side=tk.LEFT, padx=(2, 0))
+        self.roi_rect_var = tk.StringVar(value="0,0,1600,1000")
+        ttk.Entry(roi_frame, textvariable=self.roi_rect_var, width=14, font=("Arial", 9)).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Activity-triggered recording (pre-roll + idle timeout)
+        activity_frame = ttk.Frame(options_frame)
+        activity_frame.pack(fill=tk.X, pady=2)
+        
+        self.activity_triggered = tk.BooleanVar(value=False)
+        ttk.Checkbutton(activity_frame, text="Only during activity", variable=self.activity_triggered).pack(side=tk.LEFT)
+        ttk.Label(activity_frame, text="Idle s:").pack(side=tk.LEFT, padx=(10, 0))
+        self.idle_timeout_var = tk.StringVar(value=str(int(DEFAULT_IDLE_TIMEOUT)))
+        ttk.Entry(activity_frame, textvariable=self.idle_timeout_var, width=4, font=("Arial", 9)).pack(side=tk.LEFT, padx=(2, 0))
+        
+        # Every monitor at once, one capture pipeline per monitor
+        self.all_monitors_enabled = tk.BooleanVar(value=False)
+        all_monitors_cb = ttk.Checkbutton(options_frame, text="Record all monitors", variable=self.all_monitors_enabled)
+        all_monitors_cb.pack(anchor=tk.W, pady=2)
+        if len(self.monitors) < 2:
+            all_monitors_cb.configure(state="disabled")
+        
         # RIGHT COLUMN CONTENT
         
         # Enhanced keyboard (compact)
@@ -1437,6 +2254,9 @@ class MultiScreenRPARecorderApp:
             if self.recording:
                 return
             
+            # The previous recording's objects may still be finalizing in the background
+            self._create_pipeline()
+            
             # Set monitor before recording
             self.on_monitor_changed()
             
@@ -1446,7 +2266,11 @@ class MultiScreenRPARecorderApp:
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_path = Path(self.output_directory) / f"enhanced_multiscreen_{timestamp}"
+            self.recording_base_path = str(base_path)
+            self.telemetry_var.set("")
             
+            # One clock for video, audio, mouse and keyboard so their timestamps line up
+            recording_clock = RecordingClock()
             started_components = []
             
             # Start video recording
@@ -1456,8 +2280,30 @@ class MultiScreenRPARecorderApp:
                     video_path = str(base_path) + ".mp4"
                     record_audio = self.audio_enabled.get() and AUDIO_AVAILABLE
                     
-                    success = self.video_recorder.start_recording(video_path, fps, record_audio)
+                    activity_triggered = self.activity_triggered.get()
+                    adaptive_fps = self.adaptive_fps_enabled.get()
+                    if activity_triggered or adaptive_fps:
+                        record_audio = False
+                    idle_timeout = float(self.idle_timeout_var.get() or DEFAULT_IDLE_TIMEOUT)
+                    
+                    if self.all_monitors_enabled.get() and len(self.monitors) > 1:
+                        # Per-monitor files <base>_mon<N>.mp4; ROI capture is single-monitor only
+                        self._wire_active_recorder(self.multi_monitor_recorder)
+                        success = self.multi_monitor_recorder.start_recording(
+                            str(base_path), [m['index'] for m in self.monitors], fps, record_audio,
+                            recording_clock, activity_triggered=activity_triggered, idle_timeout=idle_timeout,
+                            adaptive_fps=adaptive_fps
+                        )
+                    else:
+                        roi = self._selected_roi()
+                        self._wire_active_recorder(self.video_recorder, roi)
+                        success = self.video_recorder.start_recording(
+                            video_path, fps, record_audio, recording_clock,
+                            activity_triggered=activity_triggered, idle_timeout=idle_timeout,
+                            roi=roi, adaptive_fps=adaptive_fps
+                        )
                     if success:
+                        self.click_snapshotter.start()
                         if record_audio:
                             started_components.append("video+audio-fixed")
                         else:
@@ -1475,7 +2321,7 @@ class MultiScreenRPARecorderApp:
                 try:
                     capture_keyboard = self.keyboard_enabled.get() and APPKIT_AVAILABLE
                     
-                    success = self.interaction_logger.start_logging(capture_keyboard)
+                    success = self.interaction_logger.start_logging(capture_keyboard, recording_clock)
                     if success:
                         components = []
                         if self.mouse_enabled.get():
@@ -1512,39 +2358,59 @@ class MultiScreenRPARecorderApp:
             
             self.recording = False
             self.record_button.configure(text="Start Enhanced Multi-Screen Recording")
-            self.status_var.set("⏳ Saving enhanced data...")
             
-            stopped_components = []
+            # Only signal the capture threads here; joining, encoding and saving run in the background
+            recorder = self.active_recorder
+            logger = self.interaction_logger
+            snapshotter = self.click_snapshotter
+            recorder.request_stop()
+            logger.request_stop()
             
-            # Stop video recording
-            try:
-                self.video_recorder.stop_recording()
-                stopped_components.append("video+audio-integrated")
-            except Exception as e:
-                print(f"⚠️ Error stopping video: {e}")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            interaction_path = Path(self.output_directory) / f"enhanced_multiscreen_interactions_{timestamp}.json"
             
-            # Stop interaction logging and save
-            try:
-                self.interaction_logger.stop_logging()
-                if len(self.interaction_logger.interactions) > 0 or len(self.interaction_logger.keyboard_logger.keyboard_events) > 0:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    interaction_path = Path(self.output_directory) / f"enhanced_multiscreen_interactions_{timestamp}.json"
-                    success = self.interaction_logger.save_interactions(str(interaction_path))
-                    if success:
-                        stopped_components.append("enhanced-interactions")
-            except Exception as e:
-                print(f"⚠️ Error saving interactions: {e}")
+            def finish_interactions():
+                logger.stop_logging()
+                snapshotter.stop()
+            
+            def save_interactions():
+                if logger.interactions or logger.keyboard_logger.keyboard_events:
+                    if not logger.save_interactions(str(interaction_path)):
+                        raise RuntimeError("interaction log not saved")
+            
+            metrics_file = metrics_path(self.recording_base_path)
             
-            self.status_var.set("✅ Enhanced recording saved!")
-            print(f"🛑 Enhanced multi-screen recording completed: {', '.join(stopped_components)}")
-            messagebox.showinfo("Recording Complete", 
-                              f"Enhanced multi-screen recording saved!\n\nComponents: {', '.join(stopped_components)}\n\n✅ Fixed video frame writing\n🔑 Enhanced keyboard logging\n🎵 Audio integration\n✨ Visual feedback")
+            def save_metrics():
+                write_session_metrics(metrics_file, recorder.telemetry_snapshot(), recorder.telemetry_history(),
+                                      logger.telemetry_snapshot(), {'interaction_log': interaction_path.name})
+                print(f"📈 Recording metrics saved: {metrics_file}")
+            
+            self.finalization_queue.submit(f"recording {timestamp}", [
+                [('capture threads', recorder.join_capture), ('interaction capture', finish_interactions)],
+                recorder.finalization_steps() + [('interaction log', save_interactions), ('metrics', save_metrics)]
+            ])
+            
+            self.status_var.set("⏳ Saving in background - ready for the next recording")
+            print(f"🛑 Enhanced multi-screen recording stopped, finalizing in background: {timestamp}")
             
         except Exception as e:
             print(f"❌ Error stopping recording: {e}")
             self.status_var.set("❌ Error during stop")
             messagebox.showerror("Error", f"Error stopping recording: {e}")
     
+    def _selected_roi(self):
+        """ROI from the GUI: None, 'window' or a rectangle offset by the selected monitor"""
+        mode = self.roi_mode_var.get()
+        if mode == "Active window":
+            return 'window'
+        if mode != "Rectangle":
+            return None
+        left, top, width, height = (int(value.strip()) for value in self.roi_rect_var.get().split(','))
+        monitor = next((m['monitor_data'] for m in self.monitors if m['index'] == self.video_recorder.selected_monitor), {})
+        # The rectangle is entered relative to the selected monitor
+        return {'left': monitor.get('left', 0) + left, 'top': monitor.get('top', 0) + top,
+                'width': width, 'height': height}
+    
     def open_output_folder(self):
         """Open output folder"""
         try:
@@ -1557,15 +2423,40 @@ class MultiScreenRPARecorderApp:
         except Exception as e:
             print(f"Error opening folder: {e}")
     
+    def _poll_finalization(self):
+        """Show background finalization progress (runs on the Tk thread via after())"""
+        try:
+            for job, message, finished in self.finalization_queue.drain():
+                print(f"💾 {job}: {message}")
+                if finished:
+                    if not self.recording:
+                        self.status_var.set(f"✅ Enhanced recording saved ({message})")
+                elif not self.recording:
+                    self.status_var.set(f"⏳ Saving: {message}")
+        finally:
+            self.root.after(FINALIZATION_POLL_MS, self._poll_finalization)
+    
+    def _poll_telemetry(self):
+        """Render live recorder telemetry in the status area (runs on the Tk thread via after())"""
+        try:
+            if self.recording:
+                self.telemetry_var.set(format_status(self.active_recorder.telemetry_snapshot(),
+                                                     self.interaction_logger.telemetry_snapshot()))
+        except Exception as e:
+            print(f"⚠️ Telemetry update error: {e}")
+        finally:
+            self.root.after(TELEMETRY_POLL_MS, self._poll_telemetry)
+    
     def on_closing(self):
         """Handle application closing"""
         try:
             if self.recording:
                 if messagebox.askokcancel("Quit", "Enhanced recording in progress. Stop and quit?"):
                     self.stop_recording()
-                    time.sleep(2)
+                    self.finalization_queue.wait(timeout=90)
                     self.root.destroy()
             else:
+                self.finalization_queue.wait(timeout=90)
                 self.root.destroy()
         except Exception as e:
             print(f"Error during closing: {e}")
@@ -1578,8 +2469,126 @@ class MultiScreenRPARecorderApp:
         except Exception as e:
             print(f"GUI error: {e}")
 
-def main():
-    """Main entry point"""
+def run_headless(output_path, seconds=10.0, fps=15, frame_source=None, monitor=1, **options):
+    """Record video only, without the GUI or the recording area highlight
+    
+    Runs the same capture/convert/encode path as the GUI for seconds, then
+    writes the frame sidecar and <output>_metrics.json. Returns the final
+    telemetry snapshot and the actual output path.
+    """
+    recorder = MultiScreenVideoRecorder(frame_source=frame_source, headless=True)
+    recorder.selected_monitor = monitor
+    if not recorder.start_recording(output_path, fps, record_audio=False, **options):
+        return None
+    recorder.workers.wait(seconds)
+    snapshot = recorder.telemetry_snapshot()
+    recorder.stop_recording()
+    write_session_metrics(metrics_path(recorder.output_path), snapshot, recorder.telemetry_history(),
+                          extra={'headless': True})
+    return {'output_path': recorder.output_path, 'telemetry': snapshot}
+
+def benchmark_capture(resolutions=tuple(RESOLUTIONS), seconds=10.0, fps=30, video_path=None, output_dir=None):
+    """End-to-end capture + encode throughput from a synthetic source at each resolution
+    
+    capacity_fps is the rate the loop could sustain from its mean stage
+    times (grab + convert + encode) if it were not paced to fps.
+    """
+    output_dir = output_dir or tempfile.mkdtemp(prefix="rpa_capture_bench_")
+    results = []
+    for resolution in resolutions:
+        print(f"\n⏱️  Capture benchmark: {resolution} for {seconds:.0f}s at {fps} fps")
+        run = run_headless(os.path.join(output_dir, f"capture_{resolution}.mp4"), seconds, fps,
+                           synthetic_source_factory(resolution, video_path))
+        if not run:
+            continue
+        telemetry = run['telemetry']
+        stages = telemetry['stages']
+        stage_ms = sum(stages[name].get('mean_ms', 0) for name in ('grab', 'convert', 'encode'))
+        results.append({
+            'resolution': resolution,
+            'target_fps': telemetry['target_fps'],
+            'average_fps': telemetry['average_fps'],
+            'capacity_fps': round(1000 / stage_ms, 1) if stage_ms else None,
+            'frames_written': telemetry['frames_written'],
+            'frames_late': telemetry['frames_late'],
+            'frames_dropped': telemetry['frames_dropped'],
+            'stage_mean_ms': {name: stages[name].get('mean_ms') for name in stages},
+            'stage_p95_ms': {name: stages[name].get('p95_ms') for name in stages},
+            'output_mb': round(os.path.getsize(run['output_path']) / (1024 * 1024), 2)
+                         if os.path.exists(run['output_path']) else None
+        })
+    
+    print("\n📊 Capture throughput")
+    print("-" * 100)
+    print(f"   {'resolution':<11} {'fps':>6} {'capacity':>9} {'grab ms':>8} {'convert ms':>11} "
+          f"{'encode ms':>10} {'late':>5} {'dropped':>8} {'MB':>8}")
+    for row in results:
+        mean = row['stage_mean_ms']
+        print(f"   {row['resolution']:<11} {row['average_fps'] or 0:>6.1f} {row['capacity_fps'] or 0:>9.1f} "
+              f"{mean['grab'] or 0:>8.1f} {mean['convert'] or 0:>11.1f} {mean['encode'] or 0:>10.1f} "
+              f"{row['frames_late']:>5} {row['frames_dropped']:>8} {row['output_mb'] or 0:>8.1f}")
+    print(f"📁 Benchmark recordings: {output_dir}")
+    return results
+
+def headless_main(args):
+    """--headless: record from the screen (mss) or a synthetic source without Tk"""
+    if args.source == 'screen':
+        if not MSS_AVAILABLE:
+            print("❌ Screen capture needs mss (pip install mss); use --source synthetic")
+            return 1
+        frame_source = MssFrameSource
+    else:
+        frame_source = synthetic_source_factory(args.resolution, args.replay)
+    
+    if args.benchmark:
+        if args.source == 'screen':
+            print("❌ --benchmark uses the synthetic source")
+            return 1
+        results = benchmark_capture(args.benchmark_resolutions, args.seconds, args.fps, args.replay)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Results saved: {args.output}")
+        return 0
+    
+    output_path = args.output or os.path.join(
+        "records", f"headless_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    run = run_headless(output_path, args.seconds, args.fps, frame_source, args.monitor)
+    if not run:
+        return 1
+    print(format_status(run['telemetry'], None))
+    print(f"🎬 Headless recording saved: {run['output_path']}")
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enhanced multi-screen RPA recorder")
+    parser.add_argument("--headless", action="store_true",
+                        help="Record without the GUI or the recording area highlight")
+    parser.add_argument("--source", choices=["synthetic", "screen"], default="synthetic",
+                        help="Headless frame source (default: synthetic)")
+    parser.add_argument("--replay", metavar="VIDEO", help="Synthetic source: replay this recording's frames")
+    parser.add_argument("--resolution", help="Synthetic source size: 1080p, 1440p, 4k or WIDTHxHEIGHT")
+    parser.add_argument("--monitor", type=int, default=1, help="Monitor index for --source screen")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Headless recording length")
+    parser.add_argument("--fps", type=int, default=15, help="Target frames per second")
+    parser.add_argument("--output", help="Headless video path (or benchmark results JSON with --benchmark)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure capture + encode throughput at several resolutions (synthetic source)")
+    parser.add_argument("--benchmark-resolutions", nargs="+", default=list(RESOLUTIONS), metavar="RES",
+                        help=f"Resolutions for --benchmark (default: {' '.join(RESOLUTIONS)})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main entry point (argv: recorder options, e.g. from rpa_cli.py record)"""
+    args = parse_args(argv)
+    if args.headless:
+        sys.exit(headless_main(args))
+    if not TK_AVAILABLE or not MSS_AVAILABLE:
+        print("❌ The recorder GUI needs tkinter and mss; use --headless on machines without a display")
+        sys.exit(1)
+    _import_tk()
+    
     print("🚀 Starting Enhanced RPA Recorder (MULTI-SCREEN FIXED EDITION)...")
     print(f"Platform: {PLATFORM}")
     print(f"Audio Recording: {'✅' if AUDIO_AVAILABLE else '❌'}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Background Recording Finalization
+
+Runs the slow end-of-recording work (joining capture threads, releasing the
+writer, writing the WAV, ffmpeg mux, frame sidecar and interaction JSON)
+off the GUI thread so the operator can start the next recording right away.
+
+A job is a list of stages run one after another; the steps inside a stage
+are independent and run concurrently on a shared pool. Progress messages
+are queued for the GUI, which drains them from a Tk after() callback
+(Tk itself must only be touched from its own thread).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_WORKERS = 4
+
+Step = Tuple[str, Callable[[], object]]
+
+
+class FinalizationQueue:
+    """Background finalization jobs with progress messages for the GUI"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='finalize')
+        self._messages: queue.Queue = queue.Queue()
+        self._jobs: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active_jobs(self) -> int:
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.is_alive()]
+            return len(self._jobs)
+
+    def submit(self, name: str, stages: Sequence[Sequence[Step]]) -> None:
+        """Run stages in order (steps within a stage concurrently) on a job thread"""
+        # Not a daemon: interpreter exit waits for recordings to be written out
+        job = threading.Thread(target=self._run, args=(name, stages), name=f"finalize-{name}")
+        with self._lock:
+            self._jobs.append(job)
+        job.start()
+
+    def drain(self) -> List[Tuple[str, str, bool]]:
+        """Pending (job name, message, job finished) tuples, oldest first"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all submitted jobs; True if none is still running"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.active_jobs == 0
+
+    def _run(self, name: str, stages: Sequence[Sequence[Step]]) -> None:
+        errors: List[str] = []
+        started = time.monotonic()
+        for stage in stages:
+            futures = [(label, self._pool.submit(step)) for label, step in stage]
+            for label, future in futures:
+                self._messages.put((name, f"{label}...", False))
+            for label, future in futures:
+                try:
+                    future.result()
+                    self._messages.put((name, f"{label} done", False))
+                except Exception as e:
+                    errors.append(f"{label}: {e}")
+                    self._messages.put((name, f"{label} failed: {e}", False))
+        summary = f"finalized in {time.monotonic() - started:.1f}s"
+        if errors:
+            summary += f" with {len(errors)} error(s)"
+        self._messages.put((name, summary, True))
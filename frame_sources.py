@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Pluggable Frame Sources for the Recorder
+
+The video loop reads frames through a small interface instead of calling
+mss directly, so the capture and encode path can run without a display:
+
+- MssFrameSource: real screen grabs through mss (the default)
+- SyntheticFrameSource: replays the frames of an existing recording, or
+  renders UI-like frames (window chrome, a data grid, a typing line, a
+  moving cursor, periodic scrolling) at any resolution
+
+Sources are context managers exposing mss-style monitors (index 0 is the
+union of all monitors) and grab(region) returning a BGRA array, the same
+layout mss produces, so the recorder's conversion stage is exercised too.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4k': (3840, 2160)
+}
+SCROLL_EVERY_FRAMES = 45  # generated grid scrolls by one row this often
+TYPING_CHARS_PER_FRAME = 0.5
+GRID_ROW_HEIGHT = 28
+
+# UI colours (BGR)
+DESKTOP_COLOUR = (92, 72, 48)
+WINDOW_COLOUR = (245, 245, 245)
+TITLE_BAR_COLOUR = (225, 225, 225)
+SIDEBAR_COLOUR = (236, 230, 222)
+GRID_LINE_COLOUR = (210, 210, 210)
+TEXT_COLOUR = (40, 40, 40)
+ACCENT_COLOUR = (200, 120, 30)
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    """'1080p', '1440p', '4k' or 'WIDTHxHEIGHT' -> (width, height)"""
+    key = value.lower()
+    if key in RESOLUTIONS:
+        return RESOLUTIONS[key]
+    try:
+        width, height = (int(part) for part in key.split('x'))
+    except ValueError:
+        raise ValueError(f"Unknown resolution {value!r} (use {', '.join(RESOLUTIONS)} or WIDTHxHEIGHT)")
+    return width, height
+
+
+class FrameSource(ABC):
+    """Base class: mss-style monitors and BGRA grabs of a region"""
+
+    name = 'source'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    @property
+    @abstractmethod
+    def monitors(self) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def grab(self, region: Dict) -> np.ndarray:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class MssFrameSource(FrameSource):
+    """Screen grabs through mss"""
+
+    name = 'mss'
+
+    def __init__(self):
+        if not MSS_AVAILABLE:
+            raise RuntimeError("mss is not installed (pip install mss)")
+        self._sct = mss.mss()
+
+    @property
+    def monitors(self) -> List[Dict]:
+        return self._sct.monitors
+
+    def grab(self, region: Dict) -> np.ndarray:
+        return np.array(self._sct.grab(region))
+
+    def close(self) -> None:
+        self._sct.close()
+
+
+class SyntheticFrameSource(FrameSource):
+    """A single virtual monitor fed from a video file or from generated UI-like frames
+
+    A replayed video loops at its end and is resized to the requested
+    resolution (its own size by default). Frames advance once per grab.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None,
+                 video_path: Optional[str] = None, seed: int = 0):
+        self.video_path = video_path
+        self._capture = None
+        self._frame_index = 0
+        if video_path:
+            self._capture = cv2.VideoCapture(video_path)
+            if not self._capture.isOpened():
+                raise RuntimeError(f"Cannot open video for replay: {video_path}")
+            width = width or int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = height or int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.width, self.height = width or RESOLUTIONS['1080p'][0], height or RESOLUTIONS['1080p'][1]
+        self._rng = np.random.default_rng(seed)
+        self._base = None if video_path else self._render_base()
+        self._last_replayed = None
+
+    @property
+    def monitors(self) -> List[Dict]:
+        monitor = {'left': 0, 'top': 0, 'width': self.width, 'height': self.height}
+        return [dict(monitor), monitor]
+
+    def grab(self, region: Dict) -> np.ndarray:
+        frame = self._next_replayed() if self._capture else self._next_generated()
+        self._frame_index += 1
+        left, top = max(0, region['left']), max(0, region['top'])
+        return frame[top:top + region['height'], left:left + region['width']]
+
+    def close(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def _next_replayed(self) -> np.ndarray:
+        ok, frame = self._capture.read()
+        if not ok:
+            # Loop the recording; keep the last frame if it cannot be rewound
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._capture.read()
+            if not ok:
+                if self._last_replayed is None:
+                    raise RuntimeError(f"No decodable frames in {self.video_path}")
+                return self._last_replayed
+        if frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        self._last_replayed = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+        return self._last_replayed
+
+    # Generated frames
+
+    def _layout(self) -> Dict:
+        scale = self.height / 1080
+        margin = int(40 * scale)
+        window = (margin, margin, self.width - margin, self.height - margin)
+        title_height = int(36 * scale)
+        sidebar_width = int(260 * scale)
+        grid_left = window[0] + sidebar_width + int(20 * scale)
+        grid_top = window[1] + title_height + int(80 * scale)
+        return {
+            'scale': scale,
+            'window': window,
+            'title_height': title_height,
+            'sidebar_width': sidebar_width,
+            'grid': (grid_left, grid_top, window[2] - int(20 * scale), window[3] - int(60 * scale)),
+            'row_height': max(12, int(GRID_ROW_HEIGHT * scale)),
+            'typing_origin': (grid_left, window[1] + title_height + int(50 * scale))
+        }
+
+    def _render_base(self) -> np.ndarray:
+        """Static desktop, window chrome and sidebar; the grid and dynamic parts are drawn per frame"""
+        layout = self._layout()
+        scale = layout['scale']
+        frame = np.empty((self.height, self.width, 3), np.uint8)
+        frame[:] = DESKTOP_COLOUR
+        left, top, right, bottom = layout['window']
+        cv2.rectangle(frame, (left, top), (right, bottom), WINDOW_COLOUR, -1)
+        cv2.rectangle(frame, (left, top), (right, top + layout['title_height']), TITLE_BAR_COLOUR, -1)
+        for i, colour in enumerate(((90, 95, 255), (40, 190, 255), (80, 200, 40))):
+            cv2.circle(frame, (left + int((20 + 22 * i) * scale), top + layout['title_height'] // 2),
+                       max(2, int(7 * scale)), colour, -1)
+        cv2.putText(frame, "Murex - Trade Blotter", (left + int(110 * scale), top + int(25 * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6 * scale, TEXT_COLOUR, 1, cv2.LINE_AA)
+        sidebar_bottom = bottom
+        cv2.rectangle(frame, (left, top + layout['title_height']),
+                      (left + layout['sidebar_width'], sidebar_bottom), SIDEBAR_COLOUR, -1)
+        for i, label in enumerate(("Deals", "Positions", "Market Data", "Reports", "Settings")):
+            cv2.putText(frame, label, (left + int(24 * scale), top + layout['title_height'] + int((40 + 36 * i) * scale)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55 * scale, TEXT_COLOUR, 1, cv2.LINE_AA)
+        self._rows = [self._random_row() for _ in range(400)]
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+
+    def _random_row(self) -> List[str]:
+        return [f"{self._rng.integers(100000, 999999)}", self._rng.choice(['EUR', 'USD', 'GBP', 'JPY']),
+                f"{self._rng.uniform(-5e6, 5e6):,.2f}", f"{self._rng.uniform(0.5, 1.5):.5f}",
+                self._rng.choice(['Pending', 'Validated', 'Booked'])]
+
+    def _next_generated(self) -> np.ndarray:
+        layout = self._layout()
+        scale = layout['scale']
+        frame = self._base.copy()
+        grid_left, grid_top, grid_right, grid_bottom = layout['grid']
+        row_height = layout['row_height']
+        first_row = self._frame_index // SCROLL_EVERY_FRAMES
+        column_width = (grid_right - grid_left) // 5
+        font_scale = 0.5 * scale
+        for row, y in enumerate(range(grid_top, grid_bottom - row_height, row_height)):
+            cv2.line(frame, (grid_left, y), (grid_right, y), GRID_LINE_COLOUR, 1)
+            values = self._rows[(first_row + row) % len(self._rows)]
+            for column, value in enumerate(values):
+                cv2.putText(frame, value, (grid_left + column * column_width + int(8 * scale), y + row_height - int(8 * scale)),
+                            cv2.FONT_HERSHEY_SIMPLEX, font_scale, TEXT_COLOUR, 1, cv2.LINE_AA)
+        typed = "Counterparty: ACME CAPITAL PARTNERS LTD / Notional 25,000,000 EUR"
+        length = int(self._frame_index * TYPING_CHARS_PER_FRAME) % (len(typed) + 1)
+        cv2.putText(frame, typed[:length] + "|", layout['typing_origin'],
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, ACCENT_COLOUR, max(1, int(2 * scale)), cv2.LINE_AA)
+        self._draw_cursor(frame, *self._cursor_position(), scale)
+        return frame
+
+    def _cursor_position(self) -> Tuple[int, int]:
+        t = self._frame_index / 30.0
+        x = int(self.width * (0.5 + 0.35 * np.sin(t * 0.7)))
+        y = int(self.height * (0.5 + 0.3 * np.sin(t * 1.1 + 1.0)))
+        return x, y
+
+    @staticmethod
+    def _draw_cursor(frame: np.ndarray, x: int, y: int, scale: float) -> None:
+        size = max(8, int(22 * scale))
+        points = np.array([[x, y], [x, y + size], [x + size * 2 // 7, y + size * 5 // 7],
+                           [x + size * 5 // 7, y + size * 5 // 7]], np.int32)
+        cv2.fillPoly(frame, [points], (0, 0, 0, 255))
+        cv2.polylines(frame, [points], True, (255, 255, 255, 255), 1)
+
+
+def synthetic_source_factory(resolution: Optional[str] = None, video_path: Optional[str] = None,
+                             seed: int = 0) -> Callable[[], FrameSource]:
+    """Factory for the recorder's frame_source option"""
+    width, height = parse_resolution(resolution) if resolution else (None, None)
+    return lambda: SyntheticFrameSource(width, height, video_path, seed)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Hedged Generation for RPA Workflow Requests
+
+Fires several Gemini requests with different generation configs (optionally
+staggered by a hedging delay) and keeps either the first result that passes
+the acceptance check or the best scored result within a deadline. Attempts
+that lose the race are cancelled.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CancelToken:
+    """Cancellation flag shared between the runner and one in-flight attempt"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    # threading.Event-style aliases, so waits (e.g. for a rate limiter slot) can end on cancel
+    is_set = is_cancelled
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block up to timeout seconds; True once cancelled"""
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Register a callback (e.g. closing an HTTP response) run on cancel"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+@dataclass
+class HedgedAttempt:
+    """Outcome of a single hedged request"""
+    index: int
+    generation_config: Dict[str, Any]
+    result: Any = None
+    score: Optional[float] = None
+    details: Optional[Dict] = None
+    error: Optional[str] = None
+    started_at: float = 0.0
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+
+class HedgedRequestRunner:
+    """Runs staggered attempts and picks a winner by score"""
+
+    def __init__(self, hedge_delay: float = 15.0, deadline: float = 600.0,
+                 accept_score: float = 6):
+        self.hedge_delay = max(0.0, hedge_delay)
+        self.deadline = deadline
+        self.accept_score = accept_score
+
+    def run(self, configs: List[Dict[str, Any]],
+            attempt_fn: Callable[[Dict[str, Any], CancelToken], Any],
+            score_fn: Callable[[Any], Dict]) -> Optional[HedgedAttempt]:
+        """Run attempts and return the winning one (None if nothing usable)
+
+        attempt_fn(config, token) performs one request and returns its result
+        (or None). It should check token.is_cancelled() or register a cancel
+        callback so that a losing attempt stops promptly.
+        score_fn(result) returns a dict with at least a numeric 'score'.
+        """
+        if not configs:
+            return None
+
+        run_start = time.monotonic()
+        deadline_at = run_start + self.deadline
+        attempts: List[HedgedAttempt] = []
+        tokens: List[CancelToken] = []
+        pending = {}
+        winner = None
+
+        executor = ThreadPoolExecutor(max_workers=len(configs), thread_name_prefix="hedge")
+
+        def launch(index):
+            attempt = HedgedAttempt(index=index, generation_config=configs[index],
+                                    started_at=time.monotonic() - run_start)
+            token = CancelToken()
+            attempts.append(attempt)
+            tokens.append(token)
+            print(f"🚀 Hedge attempt {index + 1}/{len(configs)} started "
+                  f"(temperature={configs[index].get('temperature')}, topK={configs[index].get('topK')})")
+            future = executor.submit(self._timed_attempt, attempt_fn, configs[index], token)
+            pending[future] = attempt
+
+        try:
+            launch(0)
+            next_launch = run_start + self.hedge_delay
+
+            while pending or len(attempts) < len(configs):
+                now = time.monotonic()
+                if now >= deadline_at:
+                    print(f"⏱️ Hedge deadline reached after {now - run_start:.1f}s")
+                    break
+
+                # Fire the next hedge when its delay elapses, or straight away
+                # if every launched attempt has already come back unaccepted
+                if len(attempts) < len(configs) and (now >= next_launch or not pending):
+                    launch(len(attempts))
+                    next_launch = now + self.hedge_delay
+                    continue
+
+                wake_at = deadline_at
+                if len(attempts) < len(configs):
+                    wake_at = min(wake_at, next_launch)
+                done, _ = wait(list(pending), timeout=max(0.0, wake_at - now),
+                               return_when=FIRST_COMPLETED)
+
+                accepted = []
+                for future in done:
+                    attempt = pending.pop(future)
+                    result, elapsed, error = future.result()
+                    attempt.elapsed = elapsed
+                    attempt.result = result
+                    attempt.error = error
+                    if result is None:
+                        print(f"⚠️ Hedge attempt {attempt.index + 1} returned no workflow"
+                              + (f": {error}" if error else ""))
+                        continue
+                    attempt.details = score_fn(result)
+                    attempt.score = attempt.details['score']
+                    print(f"📊 Hedge attempt {attempt.index + 1} scored {attempt.score:.1f}/10 in {elapsed:.1f}s")
+                    if attempt.score >= self.accept_score:
+                        accepted.append(attempt)
+
+                # Several attempts can finish in one wait(): keep the best of them, not the first seen
+                if accepted and winner is None:
+                    winner = max(accepted, key=lambda a: (a.score, -a.elapsed))
+
+                if winner:
+                    break
+        finally:
+            # Cancel every attempt that is still in flight or not yet started
+            for attempt in pending.values():
+                attempt.cancelled = True
+                tokens[attempt.index].cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if winner is None:
+            scored = [a for a in attempts if a.score is not None]
+            if scored:
+                winner = max(scored, key=lambda a: (a.score, -a.elapsed))
+
+        cancelled = sum(1 for a in attempts if a.cancelled)
+        if winner:
+            print(f"🏁 Hedge winner: attempt {winner.index + 1} "
+                  f"(score {winner.score:.1f}/10, {time.monotonic() - run_start:.1f}s total, {cancelled} cancelled)")
+        return winner
+
+    @staticmethod
+    def _timed_attempt(attempt_fn, config, token):
+        start = time.monotonic()
+        try:
+            result = attempt_fn(config, token)
+            return result, time.monotonic() - start, None
+        except Exception as e:
+            if token.is_cancelled():
+                return None, time.monotonic() - start, "cancelled"
+            return None, time.monotonic() - start, str(e)
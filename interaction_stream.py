@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Streaming Reader for Interaction Logs
+
+Iterates the event arrays of a recorded interaction JSON (mouse_interactions,
+keyboard_events, ...) incrementally instead of building the whole document
+with json.load. Only one event is held in memory at a time, events can be
+filtered by type during the scan, and the first event is available as soon
+as its bytes have been read.
+
+Uses ijson (with its C backend when present) as a fast path if installed,
+otherwise a built-in incremental parser over json.JSONDecoder.raw_decode.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+CHUNK_SIZE = 64 * 1024
+
+# Top-level arrays whose events carry a 'timestamp' counted in the interaction span
+TIMELINE_SECTIONS = ('mouse_interactions', 'keyboard_events', 'app_switches')
+# Sections whose timestamps are tracked per section, so each can be put on the session clock
+SPAN_SECTIONS = TIMELINE_SECTIONS + ('typing_sessions',)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _IncrementalReader:
+    """Pull parser over a text file that decodes one JSON value at a time"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Drop consumed input and append the next chunk (keeps self.pos at 0)"""
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number ending exactly at the buffer edge may continue in the next chunk
+                if end < len(self.buf) or self.eof or not self._fill():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array at the current position one by one"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+    def iter_top_level(self) -> Iterator[Tuple[str, bool, Any]]:
+        """Yield (key, is_array, value) for the top-level object
+
+        For arrays, value is an element iterator that must be consumed (or
+        drained) before advancing to the next key.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                elements = self.iter_array()
+                yield key, True, elements
+                for _ in elements:
+                    pass
+            else:
+                yield key, False, self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+
+def _matches(event: Any, event_types: Optional[Iterable[str]]) -> bool:
+    return event_types is None or (isinstance(event, dict) and event.get('type') in event_types)
+
+
+def iter_events(json_path: str, section: str,
+                event_types: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """Stream the events of one top-level array, optionally filtered by 'type'"""
+    if event_types is not None:
+        event_types = frozenset(event_types)
+
+    if IJSON_AVAILABLE:
+        with open(json_path, 'rb') as f:
+            for event in ijson.items(f, f'{section}.item', use_float=True):
+                if _matches(event, event_types):
+                    yield event
+        return
+
+    with open(json_path, 'r') as f:
+        reader = _IncrementalReader(f)
+        for key, is_array, value in reader.iter_top_level():
+            if key != section:
+                continue
+            if is_array:
+                for event in value:
+                    if _matches(event, event_types):
+                        yield event
+            return
+
+
+def _span(events: Iterable[Any], counter: Optional[list] = None) -> Optional[Tuple[float, float]]:
+    """(min, max) 'timestamp' over events, counting every element into counter[0]"""
+    first = last = None
+    for event in events:
+        if counter is not None:
+            counter[0] += 1
+        if isinstance(event, dict) and 'timestamp' in event:
+            timestamp = event['timestamp']
+            if first is None or timestamp < first:
+                first = timestamp
+            if last is None or timestamp > last:
+                last = timestamp
+    return (first, last) if first is not None else None
+
+
+def _overall_span(section_spans: Dict[str, Tuple[float, float]]) -> Tuple[Optional[float], Optional[float]]:
+    spans = [section_spans[key] for key in TIMELINE_SECTIONS if key in section_spans]
+    if not spans:
+        return None, None
+    return min(span[0] for span in spans), max(span[1] for span in spans)
+
+
+def scan_summary(json_path: str) -> Dict[str, Any]:
+    """Single streaming pass collecting session_info, section counts and timestamp spans"""
+    summary = {
+        'session_info': {},
+        'sections': {},
+        'section_spans': {},
+        'first_timestamp': None,
+        'last_timestamp': None
+    }
+
+    with open(json_path, 'r') as f:
+        reader = _IncrementalReader(f)
+        for key, is_array, value in reader.iter_top_level():
+            if not is_array:
+                if key == 'session_info' and isinstance(value, dict):
+                    summary['session_info'] = value
+                summary['sections'][key] = None
+                continue
+
+            counter = [0]
+            if key in SPAN_SECTIONS:
+                span = _span(value, counter)
+                if span is not None:
+                    summary['section_spans'][key] = span
+            else:
+                for _ in value:
+                    counter[0] += 1
+            summary['sections'][key] = counter[0]
+
+    summary['first_timestamp'], summary['last_timestamp'] = _overall_span(summary['section_spans'])
+    return summary
+
+
+def summarize_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the same summary as scan_summary from an already parsed document"""
+    section_spans = {}
+    for section in SPAN_SECTIONS:
+        if isinstance(data.get(section), list):
+            span = _span(data[section])
+            if span is not None:
+                section_spans[section] = span
+    first, last = _overall_span(section_spans)
+    return {
+        'session_info': data.get('session_info', {}),
+        'sections': {key: len(value) if isinstance(value, list) else None for key, value in data.items()},
+        'section_spans': section_spans,
+        'first_timestamp': first,
+        'last_timestamp': last
+    }
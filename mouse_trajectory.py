@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Capture-time Mouse Trajectory Compression
+
+Online simplification of the polled cursor path. Samples are fed as they
+are polled and only points that matter are emitted:
+
+- inflection points: a streaming (opening-window) Ramer-Douglas-Peucker
+  pass keeps a point only when the path since the last kept point can no
+  longer be approximated by a straight segment within `tolerance` pixels
+- hover dwells: the cursor resting within `dwell_radius` pixels for at
+  least `dwell_seconds`, e.g. pausing over a Murex control
+
+Straight-line interpolations in between are discarded.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_TOLERANCE = 8.0
+DEFAULT_DWELL_SECONDS = 0.6
+DEFAULT_DWELL_RADIUS = 4.0
+# Upper bound on buffered samples per segment so a long straight drag stays O(1) per sample
+MAX_SEGMENT_SAMPLES = 200
+
+Sample = Tuple[float, int, int]
+
+
+def _distance_to_segment(point: Sample, start: Sample, end: Sample) -> float:
+    """Perpendicular distance (pixels) from point to the segment start-end"""
+    _, px, py = point
+    _, ax, ay = start
+    _, bx, by = end
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+class TrajectoryCompressor:
+    """Feed (timestamp, x, y) samples; returns the points worth logging"""
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE,
+                 dwell_seconds: float = DEFAULT_DWELL_SECONDS,
+                 dwell_radius: float = DEFAULT_DWELL_RADIUS):
+        self.tolerance = tolerance
+        self.dwell_seconds = dwell_seconds
+        self.dwell_radius = dwell_radius
+        self.samples_in = 0
+        self.moves_out = 0
+        self.dwells_out = 0
+        self._anchor: Optional[Sample] = None
+        self._segment: List[Sample] = []
+        self._rest_start: Optional[Sample] = None
+        self._dwell: Optional[Dict] = None
+
+    def add(self, timestamp: float, x: int, y: int) -> List[Dict]:
+        """Add one polled position; returns emitted 'move' / 'dwell' points (usually none)"""
+        sample = (timestamp, x, y)
+        self.samples_in += 1
+        emitted: List[Dict] = []
+
+        if self._anchor is None:
+            self._anchor = sample
+            self._rest_start = sample
+            emitted.append(self._move(sample))
+            return emitted
+
+        self._track_dwell(sample, emitted)
+
+        if self._segment and self._breaks_segment(sample):
+            # The previous sample is where the path turned
+            emitted.extend(self._keep(self._segment[-1]))
+        self._segment.append(sample)
+        if len(self._segment) >= MAX_SEGMENT_SAMPLES:
+            if self._dwell is None:
+                emitted.extend(self._keep(self._segment[-1]))
+            else:
+                # Jitter inside an open dwell is not path: bound the buffer without emitting
+                del self._segment[:-1]
+        return emitted
+
+    def anchor_at(self, timestamp: float, x: int, y: int) -> List[Dict]:
+        """Force a kept point (e.g. where a click happened) and start a new segment there"""
+        emitted: List[Dict] = []
+        sample = (timestamp, x, y)
+        if self._anchor is not None and (x, y) != self._anchor[1:]:
+            emitted.extend(self._keep(sample))
+        return emitted
+
+    def flush(self) -> List[Dict]:
+        """Emit the final position and any open dwell at the end of recording"""
+        emitted: List[Dict] = []
+        if self._segment:
+            emitted.extend(self._keep(self._segment[-1]))
+        if self._dwell is not None:
+            emitted.append(self._close_dwell())
+        return emitted
+
+    def stats(self) -> Dict:
+        """Compression figures stored in session_info"""
+        points_out = self.moves_out + self.dwells_out
+        return {
+            'tolerance_px': self.tolerance,
+            'dwell_seconds': self.dwell_seconds,
+            'samples': self.samples_in,
+            'moves_kept': self.moves_out,
+            'dwells': self.dwells_out,
+            'compression_ratio': round(self.samples_in / points_out, 2) if points_out else None
+        }
+
+    def _breaks_segment(self, sample: Sample) -> bool:
+        return any(_distance_to_segment(point, self._anchor, sample) > self.tolerance
+                   for point in self._segment)
+
+    def _keep(self, sample: Sample) -> List[Dict]:
+        self._segment = []
+        if sample[1:] == self._anchor[1:]:
+            return []
+        move = self._move(sample)
+        self._anchor = sample
+        return [move]
+
+    def _move(self, sample: Sample) -> Dict:
+        previous = self._anchor if self._anchor is not sample else sample
+        self.moves_out += 1
+        return {
+            'kind': 'move',
+            'timestamp': sample[0],
+            'x': sample[1],
+            'y': sample[2],
+            'dx': abs(sample[1] - previous[1]),
+            'dy': abs(sample[2] - previous[2])
+        }
+
+    def _track_dwell(self, sample: Sample, emitted: List[Dict]) -> None:
+        rest = self._rest_start
+        if math.hypot(sample[1] - rest[1], sample[2] - rest[2]) <= self.dwell_radius:
+            if self._dwell is None and sample[0] - rest[0] >= self.dwell_seconds:
+                # Resting long enough: keep the resting point so the path ends there
+                emitted.extend(self._keep(rest))
+                self._dwell = {'timestamp': rest[0], 'x': rest[1], 'y': rest[2]}
+            if self._dwell is not None:
+                self._dwell['end'] = sample[0]
+            return
+        if self._dwell is not None:
+            emitted.append(self._close_dwell())
+        self._rest_start = sample
+
+    def _close_dwell(self) -> Dict:
+        dwell = self._dwell
+        self._dwell = None
+        self.dwells_out += 1
+        return {
+            'kind': 'dwell',
+            'timestamp': dwell['timestamp'],
+            'x': dwell['x'],
+            'y': dwell['y'],
+            'duration': dwell.get('end', dwell['timestamp']) - dwell['timestamp']
+        }
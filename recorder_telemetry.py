@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Recorder Performance Telemetry
+
+Live counters for a recording, cheap enough to update from the capture,
+audio and input threads:
+
+- CaptureTelemetry: per-stage timings of the video loop (grab, convert,
+  encode), late and dropped frames, write failures, encoder queue depth,
+  audio overruns and drift, plus periodic process samples
+- EventRates: interaction counts by type and the recent event rate
+- ProcessSampler: process CPU % (os.times deltas) and RSS
+
+snapshot() returns plain dicts for the GUI status area; at session end
+write_session_metrics() stores the final snapshots and the sample history
+in <recording>_metrics.json so recording quality can be correlated with
+workstation load.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+STAGE_WINDOW = 300  # recent samples kept per stage for mean/p95
+FPS_WINDOW = 64  # recent written frames used for the live fps
+EVENT_RATE_WINDOW_SECONDS = 10.0
+TELEMETRY_SAMPLE_SECONDS = 2.0  # history sample interval during a recording
+AUDIO_OVERRUN_CHUNKS = 4  # input backlog (in chunks) that counts as an overrun
+
+
+def metrics_path(base_path: str) -> str:
+    """Path of the session metrics file for a recording base path or video file"""
+    return os.path.splitext(base_path)[0] + '_metrics.json'
+
+
+class StageStats:
+    """Rolling timing statistics for one pipeline stage"""
+
+    def __init__(self, window: int = STAGE_WINDOW):
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> Dict:
+        recent = sorted(self.recent)
+        if not recent:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': round(sum(recent) / len(recent) * 1000, 2),
+            'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+            'total_s': round(self.total, 3)
+        }
+
+
+class ProcessSampler:
+    """CPU % since the previous sample and current RSS of this process"""
+
+    def __init__(self):
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self._last_wall = time.monotonic()
+        self._last_cpu = self._cpu_seconds()
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        times = os.times()
+        return times.user + times.system
+
+    def _rss_mb(self):
+        """(RSS in MB, whether it is the peak rather than the current value)"""
+        if self._process is not None:
+            return self._process.memory_info().rss / (1024 * 1024), False
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), False
+        except (OSError, ValueError, IndexError):
+            pass
+        if RESOURCE_AVAILABLE:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is bytes on macOS, kilobytes on Linux
+            return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024, True
+        return None, False
+
+    def sample(self) -> Dict:
+        now = time.monotonic()
+        cpu = self._cpu_seconds()
+        elapsed = now - self._last_wall
+        cpu_percent = (cpu - self._last_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+        self._last_wall, self._last_cpu = now, cpu
+        rss_mb, rss_is_peak = self._rss_mb()
+        return {
+            'cpu_percent': round(cpu_percent, 1),
+            'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+            'rss_is_peak': rss_is_peak,
+            'threads': threading.active_count()
+        }
+
+
+class CaptureTelemetry:
+    """Counters and stage timings for one capture pipeline"""
+
+    def __init__(self, target_fps: float = 0.0):
+        self.target_fps = target_fps
+        self.stages = {name: StageStats() for name in ('grab', 'convert', 'encode')}
+        self.started_at: Optional[float] = None
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_late = 0
+        self.frames_dropped = 0
+        self.write_failures = 0
+        self.encoder_queue_depth = 0
+        self.encoder_queue_max = 0
+        self.pre_roll_frames = 0
+        self.audio_chunks = 0
+        self.audio_overruns = 0
+        self.audio_read_errors = 0
+        self.audio_lag_seconds = 0.0
+        self.history: List[Dict] = []
+        self._write_times = deque(maxlen=FPS_WINDOW)
+        self._process = ProcessSampler()
+        self._last_process: Dict = {}
+        self._next_sample = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, now: float) -> None:
+        self.started_at = now
+        self._next_sample = now + TELEMETRY_SAMPLE_SECONDS
+
+    def stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name].add(seconds)
+
+    def frame_captured(self, lateness: float) -> None:
+        """A frame was grabbed lateness seconds after its slot (late beyond half an interval)"""
+        self.frames_captured += 1
+        if self.target_fps and lateness > 0.5 / self.target_fps:
+            self.frames_late += 1
+
+    def frames_skipped(self, count: int) -> None:
+        """Frame slots skipped because capture fell behind"""
+        self.frames_dropped += count
+
+    def frame_written(self, now: float, ok: bool) -> None:
+        if ok:
+            self.frames_written += 1
+            self._write_times.append(now)
+        else:
+            self.write_failures += 1
+
+    def encoder_queue(self, depth: int, pre_roll: int = 0) -> None:
+        """Frames waiting for the encoder and JPEG pre-roll frames buffered"""
+        self.encoder_queue_depth = depth
+        self.pre_roll_frames = pre_roll
+        if depth > self.encoder_queue_max:
+            self.encoder_queue_max = depth
+
+    def audio_read(self, backlog_frames: int, chunk: int, lag_seconds: float) -> None:
+        self.audio_chunks += 1
+        self.audio_lag_seconds = lag_seconds
+        if backlog_frames >= chunk * AUDIO_OVERRUN_CHUNKS:
+            self.audio_overruns += 1
+
+    def audio_error(self) -> None:
+        self.audio_read_errors += 1
+
+    def maybe_sample(self, now: float) -> bool:
+        """Append a history sample (with process stats) every TELEMETRY_SAMPLE_SECONDS"""
+        if self.started_at is None or now < self._next_sample:
+            return False
+        self._next_sample = now + TELEMETRY_SAMPLE_SECONDS
+        self._last_process = self._process.sample()
+        sample = self.snapshot(now)
+        sample.pop('stages')
+        self.history.append(sample)
+        return True
+
+    def live_fps(self) -> float:
+        times = list(self._write_times)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        elapsed = (now - self.started_at) if now is not None and self.started_at is not None else None
+        with self._lock:
+            stages = {name: stats.snapshot() for name, stats in self.stages.items()}
+        return {
+            'time': round(now, 3) if now is not None else None,
+            'target_fps': self.target_fps,
+            'live_fps': round(self.live_fps(), 2),
+            'average_fps': round(self.frames_written / elapsed, 2) if elapsed else None,
+            'frames_captured': self.frames_captured,
+            'frames_written': self.frames_written,
+            'frames_late': self.frames_late,
+            'frames_dropped': self.frames_dropped,
+            'write_failures': self.write_failures,
+            'encoder_queue_depth': self.encoder_queue_depth,
+            'encoder_queue_max': self.encoder_queue_max,
+            'pre_roll_frames': self.pre_roll_frames,
+            'audio': {
+                'chunks': self.audio_chunks,
+                'overruns': self.audio_overruns,
+                'read_errors': self.audio_read_errors,
+                'lag_seconds': round(self.audio_lag_seconds, 3)
+            },
+            'process': self._last_process,
+            'stages': stages
+        }
+
+
+class EventRates:
+    """Interaction counts by type and the rate over the last EVENT_RATE_WINDOW_SECONDS"""
+
+    def __init__(self, window: float = EVENT_RATE_WINDOW_SECONDS):
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = Counter()
+        self.recent = deque()
+        self.started_at = time.monotonic()
+
+    def record(self, interaction: Dict) -> None:
+        self.counts[interaction.get('type', 'unknown')] += 1
+        self.recent.append(time.monotonic())
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        while self.recent and self.recent[0] < now - self.window:
+            self.recent.popleft()
+        # At least one second so the first events of a recording do not read as a burst
+        span = max(1.0, min(self.window, now - self.started_at))
+        return {
+            'total': sum(self.counts.values()),
+            'by_type': dict(self.counts),
+            'per_second': round(len(self.recent) / span, 2)
+        }
+
+
+def format_status(recorder_snapshot: Optional[Dict], logger_snapshot: Optional[Dict]) -> str:
+    """One- or two-line summary for the recorder GUI status area"""
+    lines = []
+    snapshots = []
+    if recorder_snapshot:
+        snapshots = list(recorder_snapshot['monitors'].values()) if 'monitors' in recorder_snapshot else [recorder_snapshot]
+    if snapshots:
+        fps = sum(s['live_fps'] for s in snapshots)
+        stage_ms = {name: max(s['stages'][name].get('mean_ms', 0) for s in snapshots)
+                    for name in ('grab', 'convert', 'encode')}
+        lines.append(
+            f"📹 {fps:.1f} fps | grab {stage_ms['grab']:.0f} / convert {stage_ms['convert']:.0f} / "
+            f"encode {stage_ms['encode']:.0f} ms | late {sum(s['frames_late'] for s in snapshots)} "
+            f"dropped {sum(s['frames_dropped'] for s in snapshots)} | queue "
+            f"{max(s['encoder_queue_depth'] for s in snapshots)}")
+    parts = []
+    if snapshots and any(s['audio']['chunks'] for s in snapshots):
+        parts.append(f"🎤 overruns {sum(s['audio']['overruns'] for s in snapshots)}")
+    if logger_snapshot:
+        parts.append(f"🖱️⌨️ {logger_snapshot['per_second']:.1f} ev/s ({logger_snapshot['total']})")
+    process = next((s['process'] for s in snapshots if s.get('process')), None)
+    if process:
+        rss = f"{process['rss_mb']:.0f} MB" if process.get('rss_mb') is not None else "n/a"
+        parts.append(f"CPU {process['cpu_percent']:.0f}% RSS {rss}")
+    if parts:
+        lines.append(" | ".join(parts))
+    return "\n".join(lines)
+
+
+def write_session_metrics(path: str, recorder_snapshot: Optional[Dict], history: Dict[str, List[Dict]],
+                          logger_snapshot: Optional[Dict] = None, extra: Optional[Dict] = None) -> str:
+    """Write the final snapshots and the per-pipeline sample history as JSON"""
+    with open(path, 'w') as f:
+        json.dump({
+            'recorder': recorder_snapshot,
+            'interactions': logger_snapshot,
+            'history': history,
+            'psutil': PSUTIL_AVAILABLE,
+            **(extra or {})
+        }, f, indent=2)
+    return path
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Shared Recording Clock
+
+One monotonic timebase for every recorder thread. Video frames, audio,
+mouse, keyboard, clipboard and app switch events are all stamped as seconds
+since the clock origin (time.monotonic_ns), so they land on the same session
+timeline at capture. Each stream records when it actually started, and the
+resulting offsets are saved in session_info['clock'] so aligning streams
+afterwards is a subtraction.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class RecordingClock:
+    """Session-relative timestamps on time.monotonic_ns, shared across threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new session timeline at the current instant"""
+        with self._lock:
+            self.origin_ns = time.monotonic_ns()
+            self.origin_epoch = time.time()
+            self.stream_offsets: Dict[str, float] = {}
+
+    def now(self) -> float:
+        """Seconds since the clock origin"""
+        return (time.monotonic_ns() - self.origin_ns) / NS_PER_SECOND
+
+    def from_monotonic_ns(self, monotonic_ns: int) -> float:
+        """Session time of a time.monotonic_ns() reading taken elsewhere (e.g. an event tap)"""
+        return (monotonic_ns - self.origin_ns) / NS_PER_SECOND
+
+    def mark_stream_start(self, stream: str, at: Optional[float] = None) -> float:
+        """Record when a stream (video, audio, mouse, keyboard...) started on the session timeline"""
+        offset = self.now() if at is None else at
+        with self._lock:
+            self.stream_offsets[stream] = offset
+        return offset
+
+    def stream_offset(self, stream: str) -> float:
+        return self.stream_offsets.get(stream, 0.0)
+
+    def to_epoch(self, session_time: float) -> float:
+        return self.origin_epoch + session_time
+
+    def isoformat(self, session_time: Optional[float] = None) -> str:
+        """Wall-clock datetime for a session time (now if omitted)"""
+        if session_time is None:
+            session_time = self.now()
+        return datetime.fromtimestamp(self.to_epoch(session_time)).isoformat()
+
+    def describe(self) -> Dict:
+        """Clock metadata stored in session_info and the frame timestamp sidecar"""
+        with self._lock:
+            offsets = dict(self.stream_offsets)
+        return {
+            'timebase': 'monotonic_ns',
+            'origin_epoch': self.origin_epoch,
+            'origin_datetime': datetime.fromtimestamp(self.origin_epoch).isoformat(),
+            'stream_offsets': offsets
+        }
+
+
+def frame_sidecar_path(video_path: str) -> str:
+    """Path of the per-frame session timestamps written next to a recorded video"""
+    return os.path.splitext(video_path)[0] + '_frames.json'
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Recording Session for RPA Workflow Processing
+
+Loads an interaction JSON (and stats its video) once per run and lazily
+derives the views that the validator, generators and prompt builders need.
+Every derived view is memoized, so passing one RecordingSession through
+the whole pipeline avoids re-parsing the same file.
+
+Logs larger than RpaConfig.STREAMING_THRESHOLD_MB are never loaded whole:
+counts and the timestamp span come from one streaming scan and events are
+iterated with interaction_stream, filtered by type as they are read.
+
+All event timestamps are returned on the session timeline. Recordings made
+with the shared RecordingClock are already stamped that way; older logs
+stored keyboard events as epoch seconds, which are shifted here using the
+wall-clock start implied by the mouse events.
+"""
+
+import bisect
+import json
+import os
+import re
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+from rpa_config import RpaConfig
+from recording_clock import frame_sidecar_path
+from video_probe import VideoProbe, probe_video
+from rpa_tracing import span
+import interaction_stream
+
+# Timestamps above this are epoch seconds (legacy keyboard events), not session seconds
+EPOCH_THRESHOLD = 1e8
+
+# Recorder file names: <prefix>_YYYYmmdd_HHMMSS[_monN].mp4 and <prefix>_interactions_YYYYmmdd_HHMMSS.json
+RECORDING_STAMP = re.compile(r'(\d{8}_\d{6})(?:_mon(\d+))?$')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi')
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class RecordingSession:
+    """A single recording (interaction JSON + optional video), parsed once"""
+
+    def __init__(self, json_path: str, video_path: Optional[str] = None):
+        self.json_path = json_path
+        self.video_path = video_path
+        self._memo: Dict[Hashable, Any] = {}
+
+    @classmethod
+    def coerce(cls, source: Union[str, "RecordingSession"],
+               video_path: Optional[str] = None) -> "RecordingSession":
+        """Return source if it is already a session, else open one for the path"""
+        if isinstance(source, RecordingSession):
+            if video_path and not source.video_path:
+                source.video_path = video_path
+            return source
+        return cls(source, video_path)
+
+    def memoize(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Compute a derived view once and reuse it for the rest of the run"""
+        if key not in self._memo:
+            self._memo[key] = factory()
+        return self._memo[key]
+
+    # File level views
+
+    @cached_property
+    def json_stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.json_path)
+        except OSError:
+            return None
+
+    @cached_property
+    def video_stat(self) -> Optional[os.stat_result]:
+        if not self.video_path:
+            return None
+        try:
+            return os.stat(self.video_path)
+        except OSError:
+            return None
+
+    @property
+    def video_size_mb(self) -> float:
+        return self.video_stat.st_size / (1024 * 1024) if self.video_stat else 0.0
+
+    @cached_property
+    def video_probe(self) -> Optional[VideoProbe]:
+        """Duration, frame count, fps and size from the video's container header"""
+        return probe_video(self.video_path) if self.video_stat else None
+
+    @cached_property
+    def streaming(self) -> bool:
+        """Whether the log is large enough to be streamed instead of loaded whole"""
+        if self.json_stat is None:
+            return False
+        return self.json_stat.st_size > RpaConfig.STREAMING_THRESHOLD_MB * 1024 * 1024
+
+    @cached_property
+    def data(self) -> Dict:
+        """The parsed interaction JSON (raises json.JSONDecodeError if invalid)"""
+        with span("parse_interactions_json", bytes=self.json_stat.st_size if self.json_stat else 0):
+            if ORJSON_AVAILABLE:
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                with open(self.json_path, 'rb') as f:
+                    return orjson.loads(f.read())
+            with open(self.json_path, 'r') as f:
+                return json.load(f)
+
+    @cached_property
+    def summary(self) -> Dict[str, Any]:
+        """session_info, per-section event counts and the interaction timestamp span
+
+        Raises json.JSONDecodeError if the log is invalid.
+        """
+        if self.streaming and 'data' not in self.__dict__:
+            with span("scan_interactions_json", bytes=self.json_stat.st_size):
+                return interaction_stream.scan_summary(self.json_path)
+        return interaction_stream.summarize_data(self.data)
+
+    def has_section(self, section: str) -> bool:
+        return section in self.summary['sections']
+
+    def event_count(self, section: str) -> int:
+        return self.summary['sections'].get(section) or 0
+
+    def iter_events(self, section: str, event_types: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Iterate one event array (on the session timeline), optionally filtered by 'type'"""
+        offset = self.section_offsets.get(section, 0.0)
+        for event in self._iter_raw_events(section, event_types):
+            if offset and isinstance(event, dict):
+                event = dict(event)
+                for key in ('timestamp', 'end_timestamp'):
+                    if key in event:
+                        event[key] = event[key] - offset
+            yield event
+
+    def _iter_raw_events(self, section: str, event_types: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        if self.streaming and 'data' not in self.__dict__:
+            yield from interaction_stream.iter_events(self.json_path, section, event_types)
+            return
+        event_types = frozenset(event_types) if event_types is not None else None
+        for event in self.data.get(section, []):
+            if event_types is None or event.get('type') in event_types:
+                yield event
+
+    # Timebase
+
+    @property
+    def clock_info(self) -> Dict:
+        """session_info['clock'] written by RecordingClock (empty for older recordings)"""
+        return self.session_info.get('clock') or {}
+
+    def stream_offset(self, stream: str) -> float:
+        """When a stream (video, audio, mouse, keyboard) started on the session timeline"""
+        return self.clock_info.get('stream_offsets', {}).get(stream, 0.0)
+
+    @cached_property
+    def epoch_origin(self) -> Optional[float]:
+        """Wall-clock epoch of session time 0"""
+        if 'origin_epoch' in self.clock_info:
+            return self.clock_info['origin_epoch']
+        # Older logs: mouse events carry both a session timestamp and a local datetime
+        local_origin = self._local_datetime_offset('mouse_interactions')
+        if local_origin is None:
+            try:
+                # start_time was written at save time, duration seconds after the start
+                local_origin = (datetime.fromisoformat(self.session_info['start_time']).timestamp()
+                                - self.session_info.get('duration', 0))
+            except (KeyError, TypeError, ValueError):
+                return None
+        # Keyboard events carry an epoch timestamp and a local datetime; their difference
+        # corrects for the recording machine's timezone
+        correction = self._local_datetime_offset('keyboard_events')
+        return local_origin - (correction or 0.0)
+
+    def _local_datetime_offset(self, section: str) -> Optional[float]:
+        """datetime (read as local time) minus timestamp for the first event that has both"""
+        for event in self._iter_raw_events(section):
+            try:
+                return datetime.fromisoformat(event['datetime']).timestamp() - event['timestamp']
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+
+    @cached_property
+    def section_offsets(self) -> Dict[str, float]:
+        """Seconds to subtract from each section's timestamps to put it on the session timeline"""
+        offsets = {}
+        for section, span in self.summary.get('section_spans', {}).items():
+            if span[0] > EPOCH_THRESHOLD and self.epoch_origin is not None:
+                offsets[section] = self.epoch_origin
+        return offsets
+
+    @cached_property
+    def frame_sidecar(self) -> Dict:
+        """The recorder's <video>_frames.json (empty if absent)"""
+        if not self.video_path:
+            return {}
+        try:
+            with open(frame_sidecar_path(self.video_path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def frame_timestamps(self) -> Optional[List[float]]:
+        """Session time of every video frame, from the recorder's sidecar (None if absent)"""
+        return self.frame_sidecar.get('frame_timestamps') or None
+
+    @property
+    def video_is_segmented(self) -> bool:
+        """Whether video playback time departs from session time
+
+        True when idle periods were cut (activity-triggered recording) or captured
+        at a lower rate than the container fps (adaptive frame rate).
+        """
+        sidecar = self.frame_sidecar
+        return bool(sidecar.get('activity_triggered') or sidecar.get('adaptive_fps'))
+
+    def frame_index_at(self, session_time: float) -> Optional[int]:
+        """Index of the video frame showing the screen at session_time"""
+        frames = self.frame_timestamps
+        if frames:
+            return max(0, bisect.bisect_right(frames, session_time) - 1)
+        fps = self.session_info.get('fps')
+        if fps:
+            return max(0, int((session_time - self.stream_offset('video')) * fps))
+        return None
+
+    def video_time_at(self, session_time: float) -> float:
+        """Playback position in the video file of the frame captured at session_time"""
+        fps = self.frame_sidecar.get('fps')
+        if self.frame_timestamps and fps:
+            return self.frame_index_at(session_time) / fps
+        return max(0.0, session_time - self.stream_offset('video'))
+
+    # Raw sections
+
+    @property
+    def session_info(self) -> Dict:
+        return self.summary['session_info']
+
+    @cached_property
+    def app_switches(self) -> List[Dict]:
+        return list(self.iter_events('app_switches'))
+
+    @cached_property
+    def typing_sessions(self) -> List[Dict]:
+        return list(self.iter_events('typing_sessions'))
+
+    # Derived views
+
+    @cached_property
+    def duration(self) -> float:
+        return self.session_info.get('duration', 0)
+
+    @cached_property
+    def timestamps(self) -> List[float]:
+        """Timestamps of every mouse, keyboard and app switch event"""
+        timestamps = []
+        for section in interaction_stream.TIMELINE_SECTIONS:
+            timestamps.extend(event['timestamp'] for event in self.iter_events(section) if 'timestamp' in event)
+        return timestamps
+
+    @cached_property
+    def interaction_span(self) -> Tuple[float, float]:
+        """(first, last) interaction timestamp on the session timeline, or (0, duration) if empty"""
+        section_spans = self.summary.get('section_spans', {})
+        spans = [
+            (section_spans[section][0] - self.section_offsets.get(section, 0.0),
+             section_spans[section][1] - self.section_offsets.get(section, 0.0))
+            for section in interaction_stream.TIMELINE_SECTIONS if section in section_spans
+        ]
+        if spans:
+            return min(span[0] for span in spans), max(span[1] for span in spans)
+        return 0, self.duration
+
+
+def discover_sessions(records_dir: str = RpaConfig.RECORDS_DIR) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Pair the recordings in a directory as (video_path, json_path), in recording order
+
+    The recorder names the video when recording starts and the interaction log
+    when it stops, so each log belongs to the last video started since the
+    previous log. Multi-monitor recordings pair with their lowest monitor's
+    file. Unpaired files are returned with None on the missing side.
+    """
+    videos: Dict[str, Tuple[int, str]] = {}
+    logs = []
+    for filename in os.listdir(records_dir):
+        stem, extension = os.path.splitext(filename)
+        match = RECORDING_STAMP.search(stem)
+        if not match:
+            continue
+        stamp, monitor = match.group(1), int(match.group(2) or 0)
+        path = os.path.join(records_dir, filename)
+        if extension.lower() in VIDEO_EXTENSIONS:
+            if stamp not in videos or monitor < videos[stamp][0]:
+                videos[stamp] = (monitor, path)
+        elif extension.lower() == '.json' and '_interactions_' in filename:
+            logs.append((stamp, path))
+
+    # Walk videos and logs in time order; a video sorts before a log with the same stamp
+    timeline = sorted([(stamp, 0, path) for stamp, (_, path) in videos.items()] +
+                      [(stamp, 1, path) for stamp, path in logs])
+    pairs: List[Tuple[Optional[str], Optional[str]]] = []
+    pending_video = None
+    for _, kind, path in timeline:
+        if kind == 0:
+            if pending_video:
+                pairs.append((pending_video, None))
+            pending_video = path
+        else:
+            pairs.append((pending_video, path))
+            pending_video = None
+    if pending_video:
+        pairs.append((pending_video, None))
+    return pairs
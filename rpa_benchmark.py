@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+RPA Pipeline Benchmarks
+
+Times the parts of the processing pipeline that run before the Gemini API
+call, using the sample recordings in records/. No API request is made.
+
+--suite times the parse and timeline functions one by one on every log in
+records/ and on synthetic sessions of increasing size, writes the results
+as JSON and, given a baseline results file, exits non-zero on regressions.
+It also measures the import time of every rpa_cli subcommand with
+python -X importtime and fails when one exceeds IMPORT_BUDGETS_MS.
+
+Usage:
+    python rpa_benchmark.py [video.mp4 interactions.json] [--repeat N] [--events N]
+                            [--timeline-events N] [--monitor-scaling]
+    python rpa_benchmark.py --suite [--sizes 1000,10000,...] [--output FILE] [--baseline FILE]
+    python rpa_benchmark.py --imports [--repeat N]
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# The processors refuse to start without a key; nothing is sent during benchmarks
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-no-requests-sent")
+
+from complete_video_processor import CompleteVideoProcessor
+from enhanced_murex_rpa_generator import UIInteraction
+from recording_session import RecordingSession
+from rpa_config import RpaConfig
+from workflow_validator import WorkflowValidator
+import interaction_stream
+import rpa_cli
+import timeline_analytics
+
+SUITE_SIZES = (1000, 10000, 100000, 1000000)  # add 10000000 with --sizes for the full scale-up
+SUITE_RESULTS_FILE = "benchmark_results.json"
+REGRESSION_THRESHOLD = 1.25  # median slower than baseline by this factor counts as a regression
+REGRESSION_MIN_MS = 5.0  # ignore regressions on timings below this (scheduler and cache noise)
+# Import-time budget per rpa_cli subcommand (rpa_cli plus the modules the command loads)
+IMPORT_BUDGETS_MS = {
+    'list': 75.0,
+    'validate': 100.0,
+    'process': 250.0,
+    'batch': 250.0,
+    'record': 350.0
+}
+
+
+def time_call(fn: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Run fn repeat times (stdout silenced) and return timing statistics in ms"""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'max_ms': max(samples),
+        'repeat': repeat
+    }
+
+
+def pre_api_per_step(processor: CompleteVideoProcessor, video_path: str, json_path: str) -> str:
+    """Pre-API stage the way it ran before RecordingSession: every step re-opens its inputs"""
+    validator = processor.validator
+    validator.validate_video_file(video_path, health_check=False)
+    validator.validate_json_file(json_path)
+    validator.validate_time_synchronization(video_path, json_path)
+    duration, first, last = processor.analyze_complete_video_duration(json_path)
+    interactions = processor.extract_enhanced_interactions(json_path)
+    timeline = processor.create_complete_timeline(interactions, duration, first, last)
+    prompt = processor.create_complete_workflow_prompt(timeline, duration)
+    os.path.getsize(video_path)
+    with open(video_path, 'rb') as f:
+        base64.b64encode(f.read())
+    return prompt
+
+
+def pre_api_shared_session(processor: CompleteVideoProcessor, video_path: str, json_path: str) -> str:
+    """Pre-API stage as process_complete_workflow runs it, with one shared RecordingSession"""
+    session = RecordingSession(json_path, video_path)
+    processor.validator.validate_complete_workflow(video_path, session, health_check=False)
+    duration, first, last = processor.analyze_complete_video_duration(session)
+    interactions = processor.extract_enhanced_interactions(session)
+    timeline = processor.create_complete_timeline(interactions, duration, first, last, session)
+    prompt = processor.create_complete_workflow_prompt(timeline, duration)
+    session.video_size_mb
+    with open(video_path, 'rb') as f:
+        base64.b64encode(f.read())
+    return prompt
+
+
+def benchmark_pre_api(video_path: str, json_path: str, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Compare end-to-end pre-API time with and without a shared session"""
+    processor = CompleteVideoProcessor()
+    return {
+        'pre_api_per_step': time_call(lambda: pre_api_per_step(processor, video_path, json_path), repeat),
+        'pre_api_shared_session': time_call(lambda: pre_api_shared_session(processor, video_path, json_path), repeat)
+    }
+
+
+def write_synthetic_log(path: str, event_count: int, seed: int = 7) -> str:
+    """Write an interaction log with a recorder-like event mix (mostly mouse_move)"""
+    rng = random.Random(seed)
+    mouse_count = int(event_count * 0.8)
+    keyboard_count = event_count - mouse_count
+    duration = max(60.0, event_count * 0.05)
+
+    with open(path, 'w') as f:
+        f.write('{\n  "session_info": ')
+        json.dump({'platform': 'Darwin', 'duration': duration, 'interaction_count': mouse_count,
+                   'keyboard_event_count': keyboard_count, 'capture_method': 'synthetic'}, f)
+        f.write(',\n  "mouse_interactions": [\n')
+        x, y = 1200, 800
+        for i in range(mouse_count):
+            roll = rng.random()
+            event_type = 'mouse_move' if roll < 0.9 else ('mouse_press' if roll < 0.95 else 'mouse_release')
+            x += rng.randint(-40, 40)
+            y += rng.randint(-40, 40)
+            event = {'type': event_type, 'timestamp': duration * i / mouse_count,
+                     'datetime': '2025-08-05T16:25:54.285501', 'position': {'x': x, 'y': y},
+                     'source': 'multiscreen_enhanced'}
+            if event_type == 'mouse_move':
+                event['movement'] = {'dx': 15, 'dy': 1}
+            else:
+                event['button'] = 'left'
+            f.write(('    ' if i == 0 else ',\n    ') + json.dumps(event))
+        f.write('\n  ],\n  "keyboard_events": [\n')
+        for i in range(keyboard_count):
+            key = rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') if rng.random() < 0.9 else 'Return'
+            event = {'datetime': '2025-08-05T16:25:58.715103', 'source': 'enhanced_keyboard_logger',
+                     'type': 'key_press', 'key_code': 0, 'key_name': key, 'modifiers': [],
+                     'is_character': key != 'Return', 'is_special': key == 'Return',
+                     'timestamp': duration * i / keyboard_count, 'capture_method': 'core_graphics'}
+            f.write(('    ' if i == 0 else ',\n    ') + json.dumps(event))
+        f.write('\n  ]\n}')
+    return path
+
+
+def measure_memory(fn: Callable[[], object]) -> Dict[str, float]:
+    """Run fn once and report wall time and peak traced allocation"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'elapsed_ms': elapsed * 1000, 'peak_mb': peak / (1024 * 1024)}
+
+
+def benchmark_streaming(json_path: str) -> Dict[str, Dict[str, float]]:
+    """Full json.load vs streaming scan: time to first click and peak memory"""
+
+    def first_click_full():
+        with open(json_path) as f:
+            data = json.load(f)
+        return next(e for e in data['mouse_interactions'] if e['type'] == 'mouse_press')
+
+    def first_click_streamed():
+        return next(interaction_stream.iter_events(json_path, 'mouse_interactions', ('mouse_press',)))
+
+    def clicks_full():
+        with open(json_path) as f:
+            data = json.load(f)
+        return [e for e in data['mouse_interactions'] if e['type'] == 'mouse_press']
+
+    def clicks_streamed():
+        return list(interaction_stream.iter_events(json_path, 'mouse_interactions', ('mouse_press',)))
+
+    return {
+        'first_click_json_load': measure_memory(first_click_full),
+        'first_click_streamed': measure_memory(first_click_streamed),
+        'all_clicks_json_load': measure_memory(clicks_full),
+        'all_clicks_streamed': measure_memory(clicks_streamed),
+        'summary_scan_streamed': measure_memory(lambda: interaction_stream.scan_summary(json_path))
+    }
+
+
+def synthetic_interactions(event_count: int, seed: int = 7) -> List[UIInteraction]:
+    """Chronological UIInteractions with bursty spacing (typing bursts, idle pauses)"""
+    rng = random.Random(seed)
+    interactions = []
+    timestamp = 0.0
+    for _ in range(event_count):
+        roll = rng.random()
+        timestamp += rng.uniform(0.05, 0.3) if roll < 0.9 else rng.uniform(2.0, 12.0)
+        interactions.append(UIInteraction(timestamp=timestamp, action_type='click',
+                                          description="Click at screen location"))
+    return interactions
+
+
+def benchmark_timeline(event_count: int = 1000000, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Loop-based vs NumPy gaps, windows and density on synthetic interactions"""
+    processor = CompleteVideoProcessor()
+    interactions = synthetic_interactions(event_count)
+    duration = interactions[-1].timestamp + 10.0 if interactions else 0.0
+    results = {}
+
+    numpy_available = timeline_analytics.NUMPY_AVAILABLE
+    try:
+        timeline_analytics.NUMPY_AVAILABLE = False
+        results['gaps_python_loop'] = time_call(lambda: processor._find_interaction_gaps(interactions, duration), repeat)
+        results['windows_python_loop'] = time_call(lambda: processor._create_time_windows(interactions), repeat)
+        results['density_python_loop'] = time_call(lambda: processor._interaction_density(interactions, duration), repeat)
+    finally:
+        timeline_analytics.NUMPY_AVAILABLE = numpy_available
+
+    if not numpy_available:
+        return results
+
+    timestamps = timeline_analytics.timestamp_array(interactions)
+    results['timestamp_array_build'] = time_call(lambda: timeline_analytics.timestamp_array(interactions), repeat)
+    results['gaps_numpy'] = time_call(lambda: timeline_analytics.find_gaps(timestamps, duration), repeat)
+    results['windows_numpy'] = time_call(
+        lambda: timeline_analytics.create_time_windows(interactions, timestamps=timestamps), repeat)
+    results['window_breakpoints_numpy'] = time_call(lambda: timeline_analytics.window_breakpoints(timestamps), repeat)
+    results['density_numpy'] = time_call(
+        lambda: timeline_analytics.interaction_density(timestamps, duration), repeat)
+    return results
+
+
+def write_session_log(path: str, event_count: int, seed: int = 7) -> str:
+    """Write a recorder-format log with the event mix of the sample recordings
+
+    About three quarters mouse events (moves, press/release pairs) and one
+    quarter keyboard events (typed characters with Tab/Return/Delete, key
+    releases, modifier changes, typing session ends and app switches), with
+    bursty timing: fast typing and pointer runs separated by idle pauses.
+    """
+    rng = random.Random(seed)
+    start = 1754404000.0
+    characters = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    mouse, keyboard = [], []
+    timestamp = start
+    x, y = 1200, 800
+    while len(mouse) + len(keyboard) < event_count:
+        timestamp += rng.uniform(0.01, 0.25) if rng.random() < 0.97 else rng.uniform(2.0, 15.0)
+        when = datetime.fromtimestamp(timestamp).isoformat()
+        roll = rng.random()
+        if roll < 0.60:
+            dx, dy = rng.randint(-40, 40), rng.randint(-40, 40)
+            x, y = x + dx, y + dy
+            mouse.append({'type': 'mouse_move', 'timestamp': timestamp, 'datetime': when,
+                          'position': {'x': x, 'y': y}, 'movement': {'dx': abs(dx), 'dy': abs(dy)},
+                          'source': 'multiscreen_enhanced'})
+        elif roll < 0.72:
+            # A click: press and release at the same position (two events, hence the smaller share)
+            for event_type in ('mouse_press', 'mouse_release'):
+                mouse.append({'type': event_type, 'timestamp': timestamp, 'datetime': when,
+                              'position': {'x': x, 'y': y}, 'button': 'left', 'source': 'multiscreen_enhanced'})
+                timestamp += rng.uniform(0.05, 0.15)
+                when = datetime.fromtimestamp(timestamp).isoformat()
+        else:
+            event = {'datetime': when, 'source': 'enhanced_keyboard_logger', 'timestamp': timestamp}
+            key_roll = rng.random()
+            if key_roll < 0.80:
+                special = rng.random()
+                key = ('Return' if special < 0.04 else 'Tab' if special < 0.08
+                       else 'Delete' if special < 0.12 else 'Space' if special < 0.2 else rng.choice(characters))
+                event.update({'type': 'key_press', 'key_code': 0, 'key_name': key, 'modifiers': [],
+                              'is_character': len(key) == 1 or key == 'Space',
+                              'is_special': len(key) > 1 and key != 'Space', 'capture_method': 'core_graphics'})
+            elif key_roll < 0.90:
+                event.update({'type': 'key_release', 'key_code': 36, 'key_name': 'Return', 'modifiers': [],
+                              'capture_method': 'core_graphics'})
+            elif key_roll < 0.95:
+                event.update({'type': 'typing_session_end', 'key_count': rng.randint(3, 30),
+                              'duration': rng.uniform(1.0, 8.0), 'typing_speed': rng.uniform(1.0, 5.0)})
+            elif key_roll < 0.98:
+                event.update({'type': 'modifier_change', 'modifiers': [], 'capture_method': 'core_graphics'})
+            else:
+                event.update({'type': 'app_switch', 'from_app': 'Python', 'to_app': 'RmiLoader',
+                              'inferred_shortcut': 'Cmd+Tab or mouse click'})
+            keyboard.append(event)
+
+    with open(path, 'w') as f:
+        f.write('{\n  "session_info": ')
+        json.dump({'start_time': datetime.fromtimestamp(start).isoformat(), 'duration': timestamp - start,
+                   'platform': 'Darwin', 'interaction_count': len(mouse),
+                   'keyboard_event_count': len(keyboard), 'capture_method': 'synthetic'}, f)
+        for name, events in (('mouse_interactions', mouse), ('keyboard_events', keyboard)):
+            f.write(f',\n  "{name}": [\n')
+            f.write(',\n'.join('    ' + json.dumps(event) for event in events))
+            f.write('\n  ]')
+        f.write('\n}')
+    return path
+
+
+def synthetic_rpa_commands(interactions: List[UIInteraction]) -> str:
+    """Generator-style output with one numbered step per interaction"""
+    lines = ["**Login**", "1. Enter username and password and press Enter", ""]
+    for step, interaction in enumerate(interactions, 2):
+        lines.append(f"{step}. {interaction.description} in the input field and type the value")
+    lines.append("**Completion**: close the summary window when done")
+    return "\n".join(lines)
+
+
+def benchmark_session_functions(json_path: str, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Time each parse/timeline function on one log, with throughput in session events/s
+
+    Every extraction gets a fresh RecordingSession, so parsing is included
+    and nothing is served from the session memo.
+    """
+    processor = CompleteVideoProcessor()
+    validator = WorkflowValidator()
+    session = RecordingSession(json_path)
+    event_count = sum(session.event_count(section) for section in interaction_stream.TIMELINE_SECTIONS)
+    duration, first, last = processor.analyze_complete_video_duration(session)
+    interactions = processor.extract_enhanced_interactions(session)
+    keyboard_events = list(session.iter_events('keyboard_events', ('key_press',)))
+    rpa_commands = synthetic_rpa_commands(interactions)
+
+    results = {
+        'extract_enhanced_interactions': time_call(
+            lambda: processor.extract_enhanced_interactions(RecordingSession(json_path)), repeat),
+        '_group_text_sequences': time_call(lambda: processor._group_text_sequences(keyboard_events), repeat),
+        'create_complete_timeline': time_call(
+            lambda: processor.create_complete_timeline(interactions, duration, first, last), repeat),
+        '_find_interaction_gaps': time_call(lambda: processor._find_interaction_gaps(interactions, duration), repeat),
+        'validate_json_file': time_call(lambda: validator.validate_json_file(json_path), repeat),
+        '_assess_workflow_completeness': time_call(
+            lambda: processor._assess_workflow_completeness(rpa_commands, duration, interactions), repeat)
+    }
+    for stats in results.values():
+        stats['events'] = event_count
+        stats['events_per_s'] = round(event_count / (stats['median_ms'] / 1000), 1) if stats['median_ms'] else None
+    return results
+
+
+def run_suite(sizes=SUITE_SIZES, repeat: int = 5,
+              records_dir: str = RpaConfig.RECORDS_DIR) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Session function timings for every log in records_dir and each synthetic size"""
+    suites = {}
+    for json_path in sorted(os.listdir(records_dir)) if os.path.isdir(records_dir) else []:
+        if json_path.endswith('.json') and 'interactions' in json_path:
+            print(f"⏱️  {json_path}")
+            suites[f"records/{json_path}"] = benchmark_session_functions(os.path.join(records_dir, json_path), repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"⏱️  synthetic {size:,} events")
+            path = write_session_log(os.path.join(tmp, f"synthetic_{size}.json"), size)
+            # Large sessions take seconds per call; a single run is representative
+            runs = repeat if size <= 100000 else 1
+            suites[f"synthetic_{size}"] = benchmark_session_functions(path, runs)
+            os.remove(path)
+    return suites
+
+
+def measure_import_time(module: str, repeat: int = 5) -> Dict[str, float]:
+    """Import time of rpa_cli + module in a fresh interpreter, from python -X importtime
+
+    Returns the median/min cumulative milliseconds and the slowest direct
+    imports of module (from the median run) to show what a budget is spent on.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import rpa_cli, {module}'],
+                                cwd=here, capture_output=True, text=True, timeout=120)
+        total_us, children = 0, {}
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            cumulative_us = int(parts[1])
+            if depth == 0 and name.strip() in ('rpa_cli', module):
+                total_us += cumulative_us
+            elif depth == 1:
+                children[name.strip()] = cumulative_us
+        runs.append((total_us / 1000, children))
+    runs.sort(key=lambda run: run[0])
+    median_ms, children = runs[len(runs) // 2]
+    slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        'median_ms': round(median_ms, 2),
+        'min_ms': round(runs[0][0], 2),
+        'runs': repeat,
+        'slowest_imports': {name: round(us / 1000, 2) for name, us in slowest}
+    }
+
+
+def benchmark_import_times(repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Import time of each rpa_cli subcommand against its budget"""
+    results = {}
+    for command, module in rpa_cli.COMMAND_MODULES.items():
+        stats = measure_import_time(module, repeat)
+        stats['budget_ms'] = IMPORT_BUDGETS_MS.get(command)
+        results[command] = stats
+    return results
+
+
+def over_budget(import_times: Dict[str, Dict[str, float]]) -> List[str]:
+    return [f"{command}: {stats['median_ms']:.1f} ms > {stats['budget_ms']:.0f} ms budget "
+            f"(slowest: {', '.join(stats['slowest_imports'])})"
+            for command, stats in import_times.items()
+            if stats.get('budget_ms') and stats['median_ms'] > stats['budget_ms']]
+
+
+def save_suite_results(suites: Dict, output_path: str) -> Dict:
+    """Write suite results with enough context to compare runs"""
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy_timeline': timeline_analytics.NUMPY_AVAILABLE,
+        'json_backend': 'ijson' if interaction_stream.IJSON_AVAILABLE else 'raw_decode',
+        'suites': suites
+    }
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_with_baseline(suites: Dict, baseline_path: str,
+                          threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Descriptions of functions whose median got slower than the baseline by more than threshold"""
+    with open(baseline_path) as f:
+        baseline = json.load(f).get('suites', {})
+    regressions = []
+    for suite, functions in suites.items():
+        for name, stats in functions.items():
+            before = baseline.get(suite, {}).get(name)
+            if not before or before['median_ms'] < REGRESSION_MIN_MS:
+                continue
+            if stats['median_ms'] > before['median_ms'] * threshold:
+                regressions.append(f"{suite} {name}: {before['median_ms']:.2f} -> {stats['median_ms']:.2f} ms "
+                                   f"(x{stats['median_ms'] / before['median_ms']:.2f})")
+    return regressions
+
+
+def suite_main(args: argparse.Namespace) -> int:
+    """--suite entry point; returns the exit code"""
+    sizes, output_path, baseline_path, repeat = args.sizes, args.output, args.baseline, args.repeat
+
+    print("⏱️  RPA Session Benchmark Suite")
+    print("=" * 70)
+    suites = run_suite(sizes, repeat)
+    print("⏱️  import times (python -X importtime)")
+    suites['import_time'] = benchmark_import_times(repeat)
+    for suite, results in suites.items():
+        print_results(suite, results)
+    save_suite_results(suites, output_path)
+    print(f"\n💾 Results saved: {output_path}")
+
+    budget_failures = over_budget(suites['import_time'])
+    if budget_failures:
+        print(f"\n❌ {len(budget_failures)} command(s) over the import-time budget:")
+        for failure in budget_failures:
+            print(f"   {failure}")
+        return 1
+
+    if baseline_path:
+        regressions = compare_with_baseline(suites, baseline_path)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {baseline_path}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"\n✅ No regressions against {baseline_path}")
+    return 0
+
+
+def _capture_pipeline(monitor_index: int, output_path: str, seconds: float,
+                      size: Tuple[int, int], counts: Dict[int, int]) -> None:
+    """One recorder-style pipeline: grab, BGRA->BGR, resize, encode, as fast as it goes"""
+    width, height = size
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), 15, (width, height))
+    grabber = mss.mss() if MSS_AVAILABLE else None
+    rng = np.random.default_rng(monitor_index)
+    synthetic = rng.integers(0, 255, (height, width, 4), dtype=np.uint8)
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            if grabber is not None and monitor_index < len(grabber.monitors):
+                raw = np.array(grabber.grab(grabber.monitors[monitor_index]))
+            else:
+                raw = synthetic
+            frame = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
+            if frame.shape[1] != width or frame.shape[0] != height:
+                frame = cv2.resize(frame, (width, height))
+            writer.write(frame)
+            frames += 1
+    finally:
+        writer.release()
+        if grabber is not None:
+            grabber.close()
+    counts[monitor_index] = frames
+
+
+def benchmark_monitor_scaling(monitor_counts=(1, 2, 3), seconds: float = 3.0,
+                              size: Tuple[int, int] = (1920, 1080)) -> Dict[str, Dict[str, float]]:
+    """Throughput of N parallel capture pipelines (one thread per monitor, as MultiMonitorRecorder)
+
+    Uses real monitors through mss when available, synthetic frames otherwise.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in monitor_counts:
+            counts: Dict[int, int] = {}
+            threads = [threading.Thread(target=_capture_pipeline,
+                                        args=(index, os.path.join(tmp, f"mon{index}.mp4"), seconds, size, counts))
+                       for index in range(1, count + 1)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            per_pipeline = [frames / seconds for frames in counts.values()]
+            results[f'{count}_monitor_pipelines'] = {
+                'aggregate_fps': sum(per_pipeline),
+                'min_pipeline_fps': min(per_pipeline) if per_pipeline else 0.0
+            }
+    return results
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Print a compact results table"""
+    print(f"\n📊 {title}")
+    print("-" * 70)
+    for name, stats in results.items():
+        if stats.get('events_per_s'):
+            print(f"   {name:<40} median {stats['median_ms']:9.2f} ms  "
+                  f"({stats['events_per_s']:,.0f} events/s)")
+        elif 'budget_ms' in stats:
+            status = "✅" if not stats['budget_ms'] or stats['median_ms'] <= stats['budget_ms'] else "❌"
+            print(f"   {name:<40} median {stats['median_ms']:9.2f} ms  "
+                  f"(budget {stats['budget_ms'] or 0:.0f} ms) {status}")
+        elif 'median_ms' in stats:
+            print(f"   {name:<40} median {stats['median_ms']:9.2f} ms  "
+                  f"(min {stats['min_ms']:.2f}, max {stats['max_ms']:.2f})")
+        elif 'aggregate_fps' in stats:
+            print(f"   {name:<40} {stats['aggregate_fps']:9.1f} fps total  "
+                  f"(slowest pipeline {stats['min_pipeline_fps']:.1f} fps)")
+        else:
+            print(f"   {name:<40} {stats['elapsed_ms']:9.2f} ms  peak {stats['peak_mb']:8.2f} MB")
+
+
+def _sizes(value: str) -> Tuple[int, ...]:
+    try:
+        return tuple(int(size) for size in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated event counts, got {value!r}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="rpa_benchmark.py",
+                                     description="Benchmark the pipeline stages that run before the Gemini API call")
+    parser.add_argument("files", nargs="*", metavar="VIDEO JSON", help="Recording to time (default: a sample in records/)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--events", type=int, default=200000, help="Events in the synthetic streaming log")
+    parser.add_argument("--timeline-events", type=int, default=1000000, help="Interactions for the timeline analytics")
+    parser.add_argument("--monitor-scaling", action="store_true", help="Also time parallel monitor capture")
+    parser.add_argument("--suite", action="store_true", help="Run the benchmark suite and save the results")
+    parser.add_argument("--sizes", type=_sizes, default=SUITE_SIZES, help="Synthetic session sizes for --suite")
+    parser.add_argument("--output", default=SUITE_RESULTS_FILE, help="Results file for --suite")
+    parser.add_argument("--baseline", help="Earlier --suite results to compare against")
+    parser.add_argument("--imports", action="store_true", help="Only check rpa_cli import times against their budgets")
+    args = parser.parse_args(argv)
+    if len(args.files) not in (0, 2):
+        parser.error("give both VIDEO and JSON, or neither")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the pre-API benchmark on one recording"""
+    args = parse_args(argv)
+    repeat = args.repeat
+    synthetic_events = args.events
+    timeline_events = args.timeline_events
+    monitor_scaling = args.monitor_scaling
+    if args.suite:
+        sys.exit(suite_main(args))
+    if args.imports:
+        import_times = benchmark_import_times(repeat)
+        print_results("Import time per rpa_cli command", import_times)
+        failures = over_budget(import_times)
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1 if failures else 0)
+
+    if args.files:
+        video_path, json_path = args.files
+    else:
+        video_path = "records/enhanced_multiscreen_20250804_160311.mp4"
+        json_path = "records/enhanced_multiscreen_interactions_20250804_160338.json"
+
+    print("⏱️  RPA Pipeline Benchmarks")
+    print("=" * 70)
+    print(f"📹 Video: {video_path}")
+    print(f"📊 JSON:  {json_path}")
+
+    print_results("Pre-API pipeline", benchmark_pre_api(video_path, json_path, repeat))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_path = write_synthetic_log(os.path.join(tmp, 'synthetic_interactions.json'), synthetic_events)
+        size_mb = os.path.getsize(synthetic_path) / (1024 * 1024)
+        backend = 'ijson' if interaction_stream.IJSON_AVAILABLE else 'raw_decode'
+        print_results(f"Streaming reader ({synthetic_events:,} events, {size_mb:.1f} MB, {backend})",
+                      benchmark_streaming(synthetic_path))
+
+    print_results(f"Timeline analytics ({timeline_events:,} interactions)",
+                  benchmark_timeline(timeline_events, repeat=min(repeat, 3)))
+
+    if monitor_scaling:
+        source = 'mss' if MSS_AVAILABLE else 'synthetic frames'
+        print_results(f"Parallel monitor capture ({source})", benchmark_monitor_scaling())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+RPA Command-line Launcher
+
+One entry point for recording, validating and processing sessions:
+
+    python rpa_cli.py record [--headless ...]              # recorder GUI or headless capture
+    python rpa_cli.py process VIDEO JSON | SESSION [--generator complete|enhanced|simple] [--hedged] [--daemon]
+    python rpa_cli.py validate VIDEO JSON | --dir records [--workers N] [--daemon]
+    python rpa_cli.py list [--dir records]
+    python rpa_cli.py batch [--dir records] [--hedged]
+
+Only the standard library is imported up front. Each subcommand imports
+its modules when it runs, so listing or validating sessions never loads
+the recorder (Tk, OpenCV, mss, PyAudio, AppKit) or the HTTP client.
+rpa_benchmark --imports tracks the import time of every subcommand.
+With --daemon, process and validate hand the session to a running
+rpa_daemon instead of loading anything.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+RECORDS_DIR = "records"
+
+# Module each subcommand imports (rpa_benchmark measures these against a budget)
+COMMAND_MODULES = {
+    'record': 'enhanced_rpa_recorder_multiscreen_fixed',
+    'process': 'complete_video_processor',
+    'validate': 'workflow_validator',
+    'list': 'recording_session',
+    'batch': 'complete_video_processor'
+}
+
+GENERATORS = {
+    'complete': ('complete_video_processor', 'CompleteVideoProcessor'),
+    'enhanced': ('enhanced_murex_rpa_generator', 'EnhancedMurexRpaGenerator'),
+    'simple': ('simple_rpa_generator', 'SimpleRpaGenerator')
+}
+
+
+def load_command(command: str):
+    """Import the module behind a subcommand"""
+    return importlib.import_module(COMMAND_MODULES[command])
+
+
+def session_name(video_path: Optional[str], json_path: Optional[str]) -> str:
+    """Session name as used by batch validation (the log name, else the video name)"""
+    return os.path.splitext(os.path.basename(json_path or video_path))[0]
+
+
+def resolve_session(name: str, records_dir: str) -> Optional[Tuple[str, str]]:
+    """(video, json) of the paired session whose video or log is called name"""
+    from recording_session import discover_sessions
+    for video_path, json_path in discover_sessions(records_dir):
+        if not (video_path and json_path):
+            continue
+        names = {os.path.splitext(os.path.basename(path))[0] for path in (video_path, json_path)}
+        if name in names:
+            return video_path, json_path
+    return None
+
+
+def _session_args(args) -> Optional[Tuple[str, str]]:
+    """VIDEO JSON or a session name from the positional arguments"""
+    if len(args.files) == 2:
+        return args.files[0], args.files[1]
+    if len(args.files) == 1:
+        pair = resolve_session(args.files[0], args.dir)
+        if pair is None:
+            print(f"❌ No paired recording named {args.files[0]} in {args.dir}")
+        return pair
+    print("❌ Give VIDEO JSON or a session name")
+    return None
+
+
+def cmd_record(args, recorder_args: List[str]) -> int:
+    recorder = load_command('record')
+    recorder.main(recorder_args)
+    return 0
+
+
+def cmd_list(args) -> int:
+    from recording_session import discover_sessions
+    from video_probe import probe_video
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Not a directory: {args.dir}")
+        return 1
+    pairs = discover_sessions(args.dir)
+    print(f"📁 Recordings in '{args.dir}': {len(pairs)}")
+    print("-" * 70)
+    for index, (video_path, json_path) in enumerate(pairs, 1):
+        print(f"{index:2d}. {session_name(video_path, json_path)}")
+        if video_path:
+            probe = probe_video(video_path)
+            size_mb = os.path.getsize(video_path) / (1024 * 1024)
+            details = (f"{probe.duration:.1f}s, {probe.width}x{probe.height} @ {probe.fps:g} fps"
+                       if probe else "header not readable")
+            print(f"     Video: {os.path.basename(video_path)} ({size_mb:.1f} MB, {details})")
+        else:
+            print("     Video: ❌ missing")
+        if json_path:
+            print(f"     JSON:  {os.path.basename(json_path)} ({os.path.getsize(json_path) / 1024:.0f} KB)")
+        else:
+            print("     JSON:  ❌ missing")
+    return 0
+
+
+def cmd_validate(args) -> int:
+    if args.daemon and args.files:
+        pair = _session_args(args)
+        if pair is None:
+            return 2
+        from rpa_daemon import main as daemon_main
+        return daemon_main(['validate', *pair])
+    validator_module = load_command('validate')
+    validator = validator_module.WorkflowValidator()
+    if not args.files:
+        results = validator.validate_directory(args.dir, max_workers=args.workers)
+        valid = all(not any(result.severity == 'error' for checks in session.values() for result in checks)
+                    for session in results.values())
+        return 0 if valid else 1
+
+    pair = _session_args(args)
+    if pair is None:
+        return 2
+    results = validator.validate_complete_workflow(*pair)
+    return 0 if validator.print_validation_summary(results) else 1
+
+
+def _create_generator(name: str):
+    module_name, class_name = GENERATORS[name]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _generate(generator, name: str, video_path: str, json_path: str, hedged: bool) -> Optional[str]:
+    if name == 'complete':
+        return generator.process_complete_workflow(video_path, json_path, hedged=hedged)
+    if name == 'enhanced':
+        return generator.process_enhanced_workflow(video_path, json_path)
+    return generator.process_single_session(video_path, json_path)
+
+
+def cmd_process(args) -> int:
+    pair = _session_args(args)
+    if pair is None:
+        return 2
+    if (args.hedged or args.daemon) and args.generator != 'complete':
+        print("❌ --hedged and --daemon need the complete generator")
+        return 2
+    if args.daemon:
+        from rpa_daemon import main as daemon_main
+        return daemon_main(['submit', *pair] + (['--hedged'] if args.hedged else []))
+    generator = _create_generator(args.generator)
+    workflow = _generate(generator, args.generator, *pair, args.hedged)
+    print("\n✅ RPA workflow ready for execution" if workflow else "\n❌ Workflow generation failed")
+    return 0 if workflow else 1
+
+
+def cmd_batch(args) -> int:
+    """Validate a directory (cached) and process every valid paired session with one processor"""
+    validator_module = importlib.import_module(COMMAND_MODULES['validate'])
+    from recording_session import discover_sessions
+
+    results = validator_module.WorkflowValidator().validate_directory(args.dir, max_workers=args.workers)
+    pending = []
+    for video_path, json_path in discover_sessions(args.dir):
+        name = session_name(video_path, json_path)
+        checks = results.get(name, {})
+        if not (video_path and json_path):
+            print(f"⏭️  {name}: unpaired, skipped")
+        elif any(result.severity == 'error' for category in checks.values() for result in category):
+            print(f"⏭️  {name}: validation errors, skipped")
+        else:
+            pending.append((name, video_path, json_path))
+    if not pending:
+        print("❌ No valid sessions to process")
+        return 1
+
+    processor = _create_generator('complete')
+    outcomes = []
+    for index, (name, video_path, json_path) in enumerate(pending, 1):
+        print(f"\n🎬 [{index}/{len(pending)}] {name}")
+        started = time.perf_counter()
+        try:
+            workflow = processor.process_complete_workflow(video_path, json_path, hedged=args.hedged)
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            workflow = None
+        outcomes.append((name, bool(workflow), time.perf_counter() - started))
+
+    print("\n📊 Batch summary")
+    print("-" * 70)
+    for name, ok, elapsed in outcomes:
+        print(f"   {'✅' if ok else '❌'} {name} ({elapsed:.1f}s)")
+    succeeded = sum(ok for _, ok, _ in outcomes)
+    print(f"   {succeeded}/{len(outcomes)} sessions processed")
+    return 0 if succeeded == len(outcomes) else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="rpa_cli.py", description="Record, validate and process RPA sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("record", help="Start the recorder (other options go to the recorder, e.g. --headless)",
+                        add_help=False)
+
+    process = commands.add_parser("process", help="Generate RPA commands for one session")
+    process.add_argument("files", nargs="+", metavar="VIDEO JSON | SESSION")
+    process.add_argument("--generator", choices=sorted(GENERATORS), default="complete")
+    process.add_argument("--hedged", action="store_true", help="Race several generation configs")
+    process.add_argument("--dir", default=RECORDS_DIR, help="Where to look up a session name")
+    process.add_argument("--daemon", action="store_true", help="Submit to a running rpa_daemon")
+
+    validate = commands.add_parser("validate", help="Validate one session or a whole directory")
+    validate.add_argument("files", nargs="*", metavar="VIDEO JSON | SESSION")
+    validate.add_argument("--dir", default=RECORDS_DIR)
+    validate.add_argument("--workers", type=int, help="Worker processes for directory validation")
+    validate.add_argument("--daemon", action="store_true", help="Validate one session with a running rpa_daemon")
+
+    list_parser = commands.add_parser("list", help="List the recordings in a directory")
+    list_parser.add_argument("--dir", default=RECORDS_DIR)
+
+    batch = commands.add_parser("batch", help="Validate a directory and process every valid session")
+    batch.add_argument("--dir", default=RECORDS_DIR)
+    batch.add_argument("--workers", type=int, help="Worker processes for validation")
+    batch.add_argument("--hedged", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'record':
+        return cmd_record(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    handlers = {'process': cmd_process, 'validate': cmd_validate, 'list': cmd_list, 'batch': cmd_batch}
+    return handlers[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ Configuration settings for the Multimodal RPA Generator
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class RpaConfig:
     """Configuration class for RPA generation settings"""
@@ -29,6 +29,32 @@ class RpaConfig:
     # Processing Limits
     MAX_SESSIONS_PER_BATCH = 5
     INTERACTION_GAP_THRESHOLD = 2.0  # seconds
+    STREAMING_THRESHOLD_MB = 25  # interaction logs above this are streamed, not json.load-ed
+    VALIDATION_CACHE_FILE = ".validation_cache.json"  # per records dir, keyed on path/size/mtime
+    VALIDATION_REPORT_FILE = "validation_report.json"  # machine-readable directory validation report
+    VIDEO_HEALTH_SAMPLES = 24  # frames decoded per video for the black/frozen/truncation checks
+    MAX_CLICK_SNAPSHOTS = 12  # click close-ups (before/after) attached to the video request
+    
+    # Hedged Generation Settings (optional mode, see hedged_generation.py)
+    HEDGE_MAX_ATTEMPTS = 3
+    HEDGE_DELAY = 15.0  # seconds before firing the next hedge request (0 = fire all at once)
+    HEDGE_DEADLINE = 600  # seconds to wait for an acceptable workflow
+    HEDGE_ACCEPT_SCORE = 6  # completeness score that wins immediately
+    HEDGE_GENERATION_VARIANTS = [
+        {"temperature": 0.1, "topK": 2, "topP": 0.7},
+        {"temperature": 0.2, "topK": 3, "topP": 0.8},
+        {"temperature": 0.4, "topK": 8, "topP": 0.9},
+    ]
+    
+    # Processing Daemon Settings (see rpa_daemon.py)
+    # Per-user directory for the socket and the TCP token: $XDG_RUNTIME_DIR, else ~/.rpa_daemon
+    DAEMON_DIR = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".rpa_daemon")
+    DAEMON_SOCKET = os.path.join(DAEMON_DIR, "rpa_daemon.sock")
+    DAEMON_TOKEN_FILE = os.path.join(DAEMON_DIR, "rpa_daemon.token")  # shared secret for --port mode
+    DAEMON_WORKERS = 2  # jobs processed concurrently
+    DAEMON_SESSION_CACHE = 32  # parsed sessions / validation results kept warm
+    API_REQUESTS_PER_MINUTE = 10  # shared by every job of the daemon
+    API_MAX_CONCURRENT = 2
     
     @classmethod
     def get_generation_config(cls) -> Dict[str, Any]:
@@ -41,6 +67,14 @@ class RpaConfig:
             "responseMimeType": "text/plain"
         }
     
+    @classmethod
+    def get_hedged_generation_configs(cls, base_config: Dict[str, Any],
+                                      attempts: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get one generation config per hedge attempt, layered over base_config"""
+        attempts = attempts or cls.HEDGE_MAX_ATTEMPTS
+        variants = cls.HEDGE_GENERATION_VARIANTS[:attempts]
+        return [{**base_config, **variant} for variant in variants]
+    
     @classmethod
     def get_video_metadata(cls) -> Dict[str, Any]:
         """Get video processing metadata"""
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+RPA Processing Daemon
+
+A long-running local server that owns one CompleteVideoProcessor, so the
+per-session costs of a one-shot run (interpreter start, imports, .env
+loading, validator setup, TLS handshakes) are paid once:
+
+- API requests go through pooled per-thread HTTP sessions
+- parsed RecordingSessions and validation results stay cached, keyed on
+  each file's size and mtime, so a resubmitted or pre-validated session
+  skips the JSON parse and the sampled video decode
+- every job shares one RateLimiter (requests per minute and concurrent
+  requests), whichever client submitted it
+
+Jobs arrive as JSON over HTTP, served on a Unix socket by default or on a
+localhost TCP port. Each job's printed output is captured as its progress
+log. The socket lives in a per-user directory (RpaConfig.DAEMON_DIR). A TCP
+daemon writes a fresh token to RpaConfig.DAEMON_TOKEN_FILE (mode 0600) and
+requires it as a bearer token. Both modes only accept application/json
+POSTs with a localhost Host header, so a web page cannot drive the daemon
+through the browser. DaemonClient is the thin client; it and this module's top level use
+the standard library only, so submitting costs milliseconds.
+
+    python rpa_daemon.py [--socket PATH | --port N] serve [--workers N] [--preload records]
+    python rpa_daemon.py submit VIDEO JSON [--hedged] [--no-wait]
+    python rpa_daemon.py validate VIDEO JSON
+    python rpa_daemon.py status | stop
+
+--socket and --port come before the command and select the daemon for
+every command, e.g. python rpa_daemon.py --port 8765 submit VIDEO JSON.
+
+Endpoints: GET /status, POST /jobs, GET /jobs/<id>?since=N, POST /validate,
+POST /shutdown.
+"""
+
+import argparse
+import hmac
+import http.client
+import http.server
+import io
+import itertools
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from rpa_config import RpaConfig
+
+POLL_INTERVAL = 0.25  # seconds between client progress polls
+PERMIT_POLL_SECONDS = 0.1  # how often a request waiting for a concurrency permit checks for cancellation
+FINISHED_JOBS_KEPT = 200
+ALLOWED_HOSTS = frozenset(['127.0.0.1', 'localhost'])
+
+
+# Rate limiting
+
+class RateLimiter:
+    """Caps API requests per minute and in flight across every job of the daemon"""
+
+    def __init__(self, requests_per_minute: int = RpaConfig.API_REQUESTS_PER_MINUTE,
+                 max_concurrent: int = RpaConfig.API_MAX_CONCURRENT):
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent = max_concurrent
+        self._in_flight = threading.BoundedSemaphore(max_concurrent)
+        self._starts = deque()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.cancelled = 0
+        self.waited_seconds = 0.0
+
+    def _room_delay(self, now: float) -> float:
+        """Seconds until the last minute has room for another request (0 if it has); call under _lock"""
+        while self._starts and self._starts[0] <= now - 60:
+            self._starts.popleft()
+        if len(self._starts) < self.requests_per_minute:
+            return 0.0
+        return self._starts[0] + 60 - now
+
+    def _wait_for_room(self, cancel) -> bool:
+        while True:
+            with self._lock:
+                delay = self._room_delay(time.monotonic())
+            if delay <= 0:
+                return True
+            if cancel is None:
+                time.sleep(delay)
+            elif cancel.wait(delay):
+                return False
+
+    def _acquire_permit(self, cancel) -> bool:
+        if cancel is None:
+            return self._in_flight.acquire()
+        while not self._in_flight.acquire(timeout=PERMIT_POLL_SECONDS):
+            if cancel.is_set():
+                return False
+        return True
+
+    def _acquire(self, cancel) -> bool:
+        """Take a slot; False if cancel was set while waiting"""
+        started = time.monotonic()
+        while True:
+            # Wait for per-minute room before taking a permit, so a job held back by the
+            # minute cap does not block requests of other jobs that could run
+            if not self._wait_for_room(cancel) or not self._acquire_permit(cancel):
+                with self._lock:
+                    self.cancelled += 1
+                return False
+            with self._lock:
+                now = time.monotonic()
+                if self._room_delay(now) <= 0:
+                    self._starts.append(now)
+                    self.granted += 1
+                    self.waited_seconds += now - started
+                    return True
+            # Another request took the room while this one waited for its permit
+            self._in_flight.release()
+
+    @contextmanager
+    def slot(self, cancel=None):
+        """Hold one request slot: room in the last minute, then a concurrency permit
+
+        cancel (a hedged attempt's CancelToken or a threading.Event) ends the
+        wait early; the block then runs without a slot and receives False, and
+        the caller must not send its request.
+        """
+        granted = self._acquire(cancel)
+        try:
+            yield granted
+        finally:
+            if granted:
+                self._in_flight.release()
+
+    def status(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(start > now - 60 for start in self._starts)
+        return {
+            'requests_per_minute': self.requests_per_minute,
+            'max_concurrent': self.max_concurrent,
+            'requests_last_minute': recent,
+            'granted': self.granted,
+            'cancelled_waits': self.cancelled,
+            'waited_seconds': round(self.waited_seconds, 3)
+        }
+
+
+# Warm caches
+
+def file_fingerprint(path: Optional[str]) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+class WarmCache:
+    """LRU of parsed sessions and validation results, invalidated by file size/mtime"""
+
+    def __init__(self, max_sessions: int = RpaConfig.DAEMON_SESSION_CACHE):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[tuple, object]" = OrderedDict()
+        self._validations: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, store: OrderedDict, key: tuple, factory: Callable):
+        with self._lock:
+            if key in store:
+                store.move_to_end(key)
+                self.hits += 1
+                return store[key]
+            self.misses += 1
+        value = factory()
+        with self._lock:
+            store[key] = value
+            while len(store) > self.max_sessions:
+                store.popitem(last=False)
+        return value
+
+    def session(self, json_path: str, video_path: Optional[str]):
+        from recording_session import RecordingSession
+        key = (file_fingerprint(json_path), file_fingerprint(video_path))
+        return self._get(self._sessions, key, lambda: RecordingSession(json_path, video_path))
+
+    def validation(self, video_path: str, json_path: str, factory: Callable[[], Dict],
+                   health_check: bool = True) -> Dict:
+        fingerprints = (file_fingerprint(video_path), file_fingerprint(json_path))
+        if not health_check:
+            # A cached full validation (with the video health check) answers a quick one too
+            with self._lock:
+                full = self._validations.get(fingerprints + (True,))
+                if full is not None:
+                    self.hits += 1
+                    return full
+        return self._get(self._validations, fingerprints + (health_check,), factory)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {'sessions': len(self._sessions), 'validations': len(self._validations),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def _cached_validator(cache: WarmCache):
+    """WorkflowValidator whose input validation is answered from the warm cache"""
+    from workflow_validator import WorkflowValidator
+
+    class CachedWorkflowValidator(WorkflowValidator):
+        def validate_complete_workflow(self, video_path, json_path, rpa_commands=None, health_check=True):
+            if rpa_commands:
+                return super().validate_complete_workflow(video_path, json_path, rpa_commands, health_check)
+            path = getattr(json_path, 'json_path', json_path)
+            return cache.validation(video_path, path,
+                                    lambda: super(CachedWorkflowValidator, self).validate_complete_workflow(
+                                        video_path, json_path, health_check=health_check),
+                                    health_check)
+
+    return CachedWorkflowValidator()
+
+
+# Jobs and progress capture
+
+@dataclass
+class Job:
+    """One processing request and its captured progress"""
+    id: str
+    video_path: str
+    json_path: str
+    hedged: bool = False
+    status: str = 'queued'  # queued, running, done, failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: List[str] = field(default_factory=list)
+    output_path: Optional[str] = None
+    rpa_commands: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self, since: int = 0) -> Dict:
+        count = len(self.progress)  # lines appended while serialising go to the next poll
+        data = asdict(self)
+        data['progress'] = self.progress[since:count]
+        data['progress_next'] = count
+        data['queue_ms'] = round((self.started_at - self.submitted_at) * 1000, 2) if self.started_at else None
+        data['run_ms'] = (round((self.finished_at - self.started_at) * 1000, 2)
+                          if self.started_at and self.finished_at else None)
+        return data
+
+
+class ProgressRouter(io.TextIOBase):
+    """sys.stdout replacement sending each job thread's prints to that job's progress log"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    @contextmanager
+    def capture(self, job: Job):
+        self._local.job, self._local.partial = job, ''
+        try:
+            yield
+        finally:
+            if self._local.partial:
+                job.progress.append(self._local.partial)
+            self._local.job = None
+
+    def write(self, text: str) -> int:
+        job = getattr(self._local, 'job', None)
+        if job is None:
+            return self.stream.write(text)
+        lines = (self._local.partial + text).split('\n')
+        self._local.partial = lines.pop()
+        job.progress.extend(lines)
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class ProcessingService:
+    """The warm processor, its caches, the shared rate limiter and the job queue"""
+
+    def __init__(self, workers: int = RpaConfig.DAEMON_WORKERS):
+        from complete_video_processor import CompleteVideoProcessor
+        self.started_at = time.time()
+        self.cache = WarmCache()
+        self.rate_limiter = RateLimiter()
+        self.processor = CompleteVideoProcessor()
+        self.processor.validator = _cached_validator(self.cache)
+        self.processor.rate_limiter = self.rate_limiter
+        self.router = ProgressRouter(sys.stdout)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rpa-job')
+        self.workers = workers
+
+    def preload(self, records_dir: str) -> int:
+        """Parse and validate every paired recording in records_dir ahead of the first job"""
+        from recording_session import discover_sessions
+        count = 0
+        for video_path, json_path in discover_sessions(records_dir):
+            if video_path and json_path:
+                self.validate(video_path, json_path)
+                count += 1
+        return count
+
+    def submit(self, video_path: str, json_path: str, hedged: bool = False) -> Job:
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", video_path, json_path, hedged)
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, queued in self.jobs.items() if queued.status in ('done', 'failed')]
+            for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+                del self.jobs[job_id]
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: Job) -> None:
+        job.status, job.started_at = 'running', time.time()
+        with self.router.capture(job):
+            try:
+                if not (os.path.exists(job.video_path) and os.path.exists(job.json_path)):
+                    raise FileNotFoundError(f"missing input: {job.video_path} / {job.json_path}")
+                session = self.cache.session(job.json_path, job.video_path)
+                job.rpa_commands = self.processor.process_complete_workflow(job.video_path, session,
+                                                                            hedged=job.hedged)
+                if job.rpa_commands:
+                    base_name = os.path.splitext(os.path.basename(job.video_path))[0]
+                    job.output_path = os.path.join(RpaConfig.OUTPUT_DIR, f"{base_name}_RPA_commands.txt")
+                    job.status = 'done'
+                else:
+                    job.status, job.error = 'failed', 'workflow generation failed'
+            except Exception as e:
+                job.status, job.error = 'failed', str(e)
+                print(f"❌ {e}")
+        job.finished_at = time.time()
+        print(f"{'✅' if job.status == 'done' else '❌'} {job.id} {job.status} "
+              f"({job.finished_at - job.started_at:.2f}s): {os.path.basename(job.json_path)}")
+
+    def validate(self, video_path: str, json_path: str) -> Dict:
+        """Input validation of one session (cached until either file changes)"""
+        session = self.cache.session(json_path, video_path)
+        results = self.processor.validator.validate_complete_workflow(video_path, session)
+        return {
+            'valid': not any(result.severity == 'error' for checks in results.values() for result in checks),
+            'results': {category: [asdict(result) for result in checks] for category, checks in results.items()}
+        }
+
+    def status(self) -> Dict:
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'pid': os.getpid(),
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'workers': self.workers,
+            'jobs': counts,
+            'cache': self.cache.status(),
+            'rate_limiter': self.rate_limiter.status()
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# HTTP transport
+
+class DaemonRequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "RpaDaemon/1.0"
+
+    @property
+    def service(self) -> ProcessingService:
+        return self.server.service
+
+    def _send(self, status: int, body: Dict) -> None:
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _rejected(self) -> bool:
+        """Send an error and return True unless the request is from a local client holding the token"""
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        if host not in ALLOWED_HOSTS:
+            self._send(403, {'error': 'requests must be addressed to localhost'})
+            return True
+        token = self.server.token
+        if token is not None:
+            supplied = self.headers.get('Authorization') or ''
+            if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+                self._send(401, {'error': f'missing or wrong token (see {RpaConfig.DAEMON_TOKEN_FILE})'})
+                return True
+        return False
+
+    def do_GET(self):
+        if self._rejected():
+            return
+        url = urlparse(self.path)
+        if url.path == '/status':
+            return self._send(200, self.service.status())
+        if url.path.startswith('/jobs/'):
+            job = self.service.jobs.get(url.path[len('/jobs/'):])
+            if job is None:
+                return self._send(404, {'error': 'unknown job'})
+            try:
+                since = int(parse_qs(url.query).get('since', ['0'])[0])
+            except ValueError:
+                since = -1
+            if since < 0:
+                return self._send(400, {'error': 'since must be a non-negative integer'})
+            return self._send(200, job.to_dict(since))
+        self._send(404, {'error': f'unknown endpoint {url.path}'})
+
+    def do_POST(self):
+        if self._rejected():
+            return
+        # Browsers can send text/plain or form bodies cross-origin without a preflight; JSON they cannot
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            return self._send(415, {'error': 'Content-Type must be application/json'})
+        try:
+            body = self._body()
+        except ValueError:
+            return self._send(400, {'error': 'invalid JSON body'})
+        if self.path in ('/jobs', '/validate') and not (body.get('video') and body.get('json')):
+            return self._send(400, {'error': 'video and json paths are required'})
+        if self.path == '/jobs':
+            job = self.service.submit(body['video'], body['json'], bool(body.get('hedged')))
+            return self._send(202, {'id': job.id})
+        if self.path == '/validate':
+            try:
+                return self._send(200, self.service.validate(body['video'], body['json']))
+            except Exception as e:
+                return self._send(500, {'error': str(e)})
+        if self.path == '/shutdown':
+            self._send(200, {'stopping': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        self._send(404, {'error': f'unknown endpoint {self.path}'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    token = None  # access is limited by the socket's directory and file mode
+
+    def get_request(self):
+        # Unix socket peers have no (host, port); BaseHTTPRequestHandler expects one
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+class TcpHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    token = None
+
+
+def _write_token(path: str) -> str:
+    """Write a new random token readable by this user only"""
+    token = secrets.token_urlsafe(32)
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+
+def _read_token(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def serve(socket_path: Optional[str] = None, port: Optional[int] = None,
+          workers: int = RpaConfig.DAEMON_WORKERS, preload_dir: Optional[str] = None) -> None:
+    started = time.perf_counter()
+    service = ProcessingService(workers)
+    sys.stdout = service.router
+
+    os.makedirs(RpaConfig.DAEMON_DIR, mode=0o700, exist_ok=True)
+    if port is not None:
+        server = TcpHTTPServer(('127.0.0.1', port), DaemonRequestHandler)
+        server.token = _write_token(RpaConfig.DAEMON_TOKEN_FILE)
+        where = f"http://127.0.0.1:{port} (token in {RpaConfig.DAEMON_TOKEN_FILE})"
+    else:
+        socket_path = socket_path or RpaConfig.DAEMON_SOCKET
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700, exist_ok=True)
+        if os.path.exists(socket_path):
+            if _socket_alive(socket_path):
+                print(f"❌ A daemon is already listening on {socket_path}")
+                return
+            os.remove(socket_path)
+        # Created owner-only: other local users must not submit jobs on this user's API key
+        previous_umask = os.umask(0o177)
+        try:
+            server = UnixHTTPServer(socket_path, DaemonRequestHandler)
+        finally:
+            os.umask(previous_umask)
+        where = socket_path
+    server.service = service
+    print(f"🛰️  RPA daemon ready on {where} ({workers} workers, started in {time.perf_counter() - started:.2f}s)")
+    if preload_dir:
+        # Warm the caches in the background; jobs are accepted meanwhile
+        threading.Thread(target=lambda: print(f"🔥 Preloaded {service.preload(preload_dir)} sessions "
+                                              f"from {preload_dir}"), name='rpa-preload', daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+        if port is not None and _read_token(RpaConfig.DAEMON_TOKEN_FILE) == server.token:
+            os.remove(RpaConfig.DAEMON_TOKEN_FILE)
+        sys.stdout = service.router.stream
+        print("👋 RPA daemon stopped")
+
+
+def _socket_alive(socket_path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+# Thin client
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonClient:
+    """Talks to a running daemon; standard library only"""
+
+    def __init__(self, socket_path: Optional[str] = None, port: Optional[int] = None, timeout: float = 30.0):
+        self.socket_path = socket_path or RpaConfig.DAEMON_SOCKET
+        self.port = port
+        self.timeout = timeout
+        self.token = _read_token(RpaConfig.DAEMON_TOKEN_FILE) if port is not None else None
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        connection = (http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+                      if self.port is not None else _UnixHTTPConnection(self.socket_path, self.timeout))
+        try:
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            headers = {'Content-Type': 'application/json'}
+            if self.token:
+                headers['Authorization'] = f"Bearer {self.token}"
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            data = json.loads(response.read() or b'{}')
+            if response.status >= 400:
+                raise RuntimeError(data.get('error', f"HTTP {response.status}"))
+            return data
+        finally:
+            connection.close()
+
+    def available(self) -> bool:
+        try:
+            self.status()
+            return True
+        except (OSError, RuntimeError):
+            return False
+
+    def status(self) -> Dict:
+        return self._request('GET', '/status')
+
+    def submit(self, video_path: str, json_path: str, hedged: bool = False) -> str:
+        body = {'video': os.path.abspath(video_path), 'json': os.path.abspath(json_path), 'hedged': hedged}
+        return self._request('POST', '/jobs', body)['id']
+
+    def job(self, job_id: str, since: int = 0) -> Dict:
+        return self._request('GET', f'/jobs/{job_id}?since={since}')
+
+    def wait(self, job_id: str, on_progress: Optional[Callable[[str], None]] = print) -> Dict:
+        """Poll until the job finishes, passing each new progress line to on_progress"""
+        since = 0
+        while True:
+            job = self.job(job_id, since)
+            if on_progress:
+                for line in job['progress']:
+                    on_progress(line)
+            since = job['progress_next']
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(POLL_INTERVAL)
+
+    def validate(self, video_path: str, json_path: str) -> Dict:
+        return self._request('POST', '/validate', {'video': os.path.abspath(video_path),
+                                                   'json': os.path.abspath(json_path)})
+
+    def shutdown(self) -> Dict:
+        return self._request('POST', '/shutdown', {})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="rpa_daemon.py", description="Warm RPA processing daemon")
+    parser.add_argument("--socket", help=f"Unix socket path (default: {RpaConfig.DAEMON_SOCKET})")
+    parser.add_argument("--port", type=int, help="Use HTTP on 127.0.0.1:PORT instead of the Unix socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the daemon in the foreground")
+    serve_parser.add_argument("--workers", type=int, default=RpaConfig.DAEMON_WORKERS)
+    serve_parser.add_argument("--preload", metavar="DIR", help="Parse and validate the recordings in DIR at start")
+    submit = commands.add_parser("submit", help="Submit a session and follow its progress")
+    submit.add_argument("video")
+    submit.add_argument("json")
+    submit.add_argument("--hedged", action="store_true")
+    submit.add_argument("--no-wait", action="store_true", help="Print the job id and return")
+    validate = commands.add_parser("validate", help="Validate a session with the daemon's warm caches")
+    validate.add_argument("video")
+    validate.add_argument("json")
+    commands.add_parser("status", help="Show jobs, cache and rate limiter state")
+    commands.add_parser("stop", help="Stop the daemon")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket, args.port, args.workers, args.preload)
+        return 0
+
+    client = DaemonClient(args.socket, args.port)
+    try:
+        if args.command == "submit":
+            job_id = client.submit(args.video, args.json, args.hedged)
+            if args.no_wait:
+                print(job_id)
+                return 0
+            job = client.wait(job_id)
+            print(f"\n{'✅' if job['status'] == 'done' else '❌'} {job_id} {job['status']} "
+                  f"(queued {job['queue_ms'] or 0:.0f} ms, ran {job['run_ms'] or 0:.0f} ms)"
+                  + (f": {job['output_path']}" if job['output_path'] else ""))
+            return 0 if job['status'] == 'done' else 1
+        if args.command == "validate":
+            result = client.validate(args.video, args.json)
+            for category, checks in result['results'].items():
+                for check in checks:
+                    icon = {'error': '❌', 'warning': '⚠️'}.get(check['severity'], '✅')
+                    print(f"   {icon} [{category}] {check['message']}")
+            return 0 if result['valid'] else 1
+        if args.command == "status":
+            print(json.dumps(client.status(), indent=2))
+            return 0
+        client.shutdown()
+        print("🛑 Daemon stopping")
+        return 0
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Daemon not reachable ({e}); start it with: python rpa_daemon.py serve")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
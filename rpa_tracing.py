@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Pipeline Stage Tracing
+
+Nested timing spans for the processing pipeline (validation, parsing,
+timeline building, base64 encoding, upload and model time, output writing)
+with attributes such as bytes and tokens:
+
+    with span("encode_video", bytes=size) as s:
+        ...
+        s.set(encoded_bytes=len(data))
+
+    @traced("validate_json_file")
+    def validate_json_file(...): ...
+
+Tracing is off by default; span() then returns a shared no-op object and
+traced() adds a single flag check per call. Finished spans can be exported
+as Chrome trace JSON (chrome://tracing, Perfetto) or aggregated into a
+per-stage table.
+
+Set RPA_TRACE=trace.json to trace a whole run: the trace is written and the
+stage table printed when the process exits.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+TRACE_ENV_VAR = "RPA_TRACE"
+
+
+@dataclass
+class SpanRecord:
+    """A finished span (times in ns on the perf_counter clock)"""
+    name: str
+    start_ns: int
+    end_ns: int
+    thread_id: int
+    thread_name: str
+    depth: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    child_ns: int = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def self_ms(self) -> float:
+        """Duration minus the time spent in direct child spans"""
+        return (self.end_ns - self.start_ns - self.child_ns) / 1e6
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """An open span; use as a context manager"""
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.child_ns = 0
+
+    def set(self, **attributes) -> None:
+        """Add or overwrite attributes (bytes, tokens, counts...)"""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self._tracer._push(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self._tracer._pop(self, end_ns)
+        return False
+
+
+class Tracer:
+    """Collects finished spans from every thread"""
+
+    def __init__(self):
+        self.enabled = False
+        self.origin_ns = time.perf_counter_ns()
+        self._records: List[SpanRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span: Span) -> None:
+        self._stack().append(span)
+
+    def _pop(self, span: Span, end_ns: int) -> None:
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elapsed = end_ns - span.start_ns
+        if stack:
+            stack[-1].child_ns += elapsed
+        thread = threading.current_thread()
+        record = SpanRecord(span.name, span.start_ns, end_ns, thread.ident, thread.name,
+                            len(stack), span.attributes, span.child_ns)
+        with self._lock:
+            self._records.append(record)
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def records(self) -> List[SpanRecord]:
+        with self._lock:
+            return sorted(self._records, key=lambda record: record.start_ns)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records = []
+        self.origin_ns = time.perf_counter_ns()
+
+
+_tracer = Tracer()
+
+
+def enable() -> None:
+    _tracer.enabled = True
+
+
+def disable() -> None:
+    _tracer.enabled = False
+
+
+def is_enabled() -> bool:
+    return _tracer.enabled
+
+
+def reset() -> None:
+    """Drop all recorded spans"""
+    _tracer.reset()
+
+
+def records() -> List[SpanRecord]:
+    """Finished spans in start order"""
+    return _tracer.records()
+
+
+def span(name: str, **attributes):
+    """Context manager timing a stage; a shared no-op while tracing is disabled"""
+    if not _tracer.enabled:
+        return _NOOP
+    return Span(_tracer, name, attributes)
+
+
+def annotate(**attributes) -> None:
+    """Set attributes on the innermost open span of this thread (e.g. tokens from an API response)"""
+    if _tracer.enabled:
+        current = _tracer.current()
+        if current is not None:
+            current.set(**attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping every call of a function in a span (named after it by default)"""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return fn(*args, **kwargs)
+            with Span(_tracer, span_name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Export
+
+def chrome_trace(span_records: Optional[List[SpanRecord]] = None) -> Dict:
+    """Chrome trace event format: one complete ('X') event per span, microsecond timestamps"""
+    span_records = records() if span_records is None else span_records
+    pid = os.getpid()
+    events = []
+    thread_names = {}
+    for record in span_records:
+        thread_names[record.thread_id] = record.thread_name
+        events.append({
+            'name': record.name,
+            'cat': 'rpa',
+            'ph': 'X',
+            'ts': (record.start_ns - _tracer.origin_ns) / 1000,
+            'dur': (record.end_ns - record.start_ns) / 1000,
+            'pid': pid,
+            'tid': record.thread_id,
+            'args': record.attributes
+        })
+    for thread_id, thread_name in thread_names.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id,
+                       'args': {'name': thread_name}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path: str, span_records: Optional[List[SpanRecord]] = None) -> str:
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(span_records), f, default=str)
+    return path
+
+
+def stage_table(span_records: Optional[List[SpanRecord]] = None) -> List[Dict]:
+    """Per-stage aggregate: calls, total/self/mean/max ms and summed numeric attributes, slowest first"""
+    span_records = records() if span_records is None else span_records
+    stages: Dict[str, Dict] = {}
+    for record in span_records:
+        stage = stages.setdefault(record.name, {'stage': record.name, 'calls': 0, 'total_ms': 0.0,
+                                                'self_ms': 0.0, 'max_ms': 0.0, 'attributes': {}})
+        stage['calls'] += 1
+        stage['total_ms'] += record.duration_ms
+        stage['self_ms'] += record.self_ms
+        stage['max_ms'] = max(stage['max_ms'], record.duration_ms)
+        for key, value in record.attributes.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stage['attributes'][key] = stage['attributes'].get(key, 0) + value
+    for stage in stages.values():
+        stage['mean_ms'] = stage['total_ms'] / stage['calls']
+    return sorted(stages.values(), key=lambda stage: stage['total_ms'], reverse=True)
+
+
+def print_stage_table(span_records: Optional[List[SpanRecord]] = None) -> None:
+    table = stage_table(span_records)
+    if not table:
+        return
+    print("\n⏱️  Pipeline stages")
+    print("-" * 100)
+    print(f"   {'stage':<56} {'calls':>5} {'total ms':>11} {'self ms':>11} {'max ms':>10}")
+    for stage in table:
+        extras = ", ".join(f"{key}={value:,.0f}" for key, value in stage['attributes'].items())
+        print(f"   {stage['stage']:<56} {stage['calls']:>5} {stage['total_ms']:>11.1f} "
+              f"{stage['self_ms']:>11.1f} {stage['max_ms']:>10.1f}" + (f"  {extras}" if extras else ""))
+
+
+def _export_at_exit(path: str) -> None:
+    if not records():
+        return
+    export_chrome_trace(path)
+    print_stage_table()
+    print(f"💾 Trace saved: {path}")
+
+
+def _configure_from_env() -> None:
+    path = os.environ.get(TRACE_ENV_VAR)
+    if not path:
+        return
+    import multiprocessing
+    # Worker processes (batch validation) inherit the variable but must not overwrite the trace
+    if multiprocessing.parent_process() is None:
+        enable()
+        atexit.register(_export_at_exit, path)
+
+
+_configure_from_env()
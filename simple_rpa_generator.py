@@ -8,11 +8,13 @@ and generating RPA commands. Good for testing and debugging.
 import os
 import json
 import base64
-import requests
+import contextlib
+import threading
 from datetime import datetime
-from typing import Optional
-from dotenv import load_dotenv
+from typing import Optional, Union
 from rpa_config import RpaConfig
+from recording_session import RecordingSession
+from rpa_tracing import span, traced
 
 class SimpleRpaGenerator:
     """Simplified RPA generator for single sessions"""
@@ -21,9 +23,30 @@ class SimpleRpaGenerator:
         """Initialize the simple RPA generator"""
         self.api_key = self._load_api_key()
         self.config = RpaConfig()
+        # Optional limiter shared by every caller of this generator (see rpa_daemon.RateLimiter)
+        self.rate_limiter = None
+        self._http_local = threading.local()
+    
+    @property
+    def http(self):
+        """Per-thread pooled HTTP session, so TLS connections to the API stay open between requests"""
+        session = getattr(self._http_local, 'session', None)
+        if session is None:
+            import requests
+            session = self._http_local.session = requests.Session()
+        return session
+    
+    def api_slot(self, cancel=None):
+        """Context manager held around each API request, yielding whether a slot was granted
+        
+        No-op without a rate limiter. cancel (a CancelToken or threading.Event)
+        ends the wait for a slot early; the request must then not be sent.
+        """
+        return self.rate_limiter.slot(cancel) if self.rate_limiter else contextlib.nullcontext(True)
         
     def _load_api_key(self) -> str:
         """Load API key from environment"""
+        from dotenv import load_dotenv
         load_dotenv()
         api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
         if not api_key:
@@ -58,25 +81,24 @@ class SimpleRpaGenerator:
             print(f"     JSON:  {os.path.basename(files['json'])}")
             print()
     
-    def load_interaction_summary(self, json_path: str) -> str:
+    @traced()
+    def load_interaction_summary(self, json_path: Union[str, RecordingSession]) -> str:
         """Load and create a summary of interactions"""
         try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-            
-            session_info = data.get('session_info', {})
+            session = RecordingSession.coerce(json_path)
+            session_info = session.session_info
             
             # Count different interaction types
-            mouse_count = len(data.get('mouse_interactions', []))
-            keyboard_count = len(data.get('keyboard_events', []))
-            app_switches = len(data.get('app_switches', []))
+            mouse_count = session.event_count('mouse_interactions')
+            keyboard_count = session.event_count('keyboard_events')
+            app_switches = session.event_count('app_switches')
             
             # Get typing sessions if available
-            typing_sessions = data.get('typing_sessions', [])
+            typing_sessions = session.typing_sessions
             typed_text = []
-            for session in typing_sessions:
-                if session.get('final_text'):
-                    typed_text.append(f"'{session['final_text']}'")
+            for typing in typing_sessions:
+                if typing.get('final_text'):
+                    typed_text.append(f"'{typing['final_text']}'")
             
             summary = []
             summary.append("=== SESSION SUMMARY ===")
@@ -98,6 +120,7 @@ class SimpleRpaGenerator:
         except Exception as e:
             return f"Error loading interaction summary: {e}"
     
+    @traced()
     def create_simple_prompt(self, interaction_summary: str) -> str:
         """Create a simplified prompt for RPA generation"""
         
@@ -127,6 +150,7 @@ Generate ONLY the RPA commands, no additional explanation."""
 
         return prompt
     
+    @traced()
     def process_single_session(self, video_path: str, json_path: str, 
                              output_name: Optional[str] = None) -> Optional[str]:
         """Process a single recording session"""
@@ -135,8 +159,10 @@ Generate ONLY the RPA commands, no additional explanation."""
         print(f"📹 Video: {os.path.basename(video_path)}")
         print(f"📊 JSON:  {os.path.basename(json_path)}")
         
+        session = RecordingSession(json_path, video_path)
+        
         # Check file size
-        size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        size_mb = session.video_size_mb
         if size_mb > self.config.MAX_FILE_SIZE_MB:
             print(f"❌ Video file too large: {size_mb:.1f} MB (max: {self.config.MAX_FILE_SIZE_MB} MB)")
             return None
@@ -144,7 +170,7 @@ Generate ONLY the RPA commands, no additional explanation."""
         print(f"✅ Video size OK: {size_mb:.1f} MB")
         
         # Load interaction summary
-        interaction_summary = self.load_interaction_summary(json_path)
+        interaction_summary = self.load_interaction_summary(session)
         print("📋 Interaction summary loaded")
         
         # Create prompt
@@ -153,9 +179,11 @@ Generate ONLY the RPA commands, no additional explanation."""
         # Encode video
         print("🔄 Encoding video to base64...")
         try:
-            with open(video_path, 'rb') as f:
-                video_bytes = f.read()
-            video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+            with span("encode_video") as encode_span:
+                with open(video_path, 'rb') as f:
+                    video_bytes = f.read()
+                video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+                encode_span.set(bytes=len(video_bytes), encoded_bytes=len(video_base64))
             print("✅ Video encoded successfully")
         except Exception as e:
             print(f"❌ Error encoding video: {e}")
@@ -180,7 +208,8 @@ Generate ONLY the RPA commands, no additional explanation."""
             "generationConfig": self.config.get_generation_config()
         }
         
-        # Make API request
+        # Make API request (requests is only loaded on paths that call the API)
+        import requests
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.config.GEMINI_MODEL}:generateContent"
         headers = {
             "Content-Type": "application/json",
@@ -189,8 +218,10 @@ Generate ONLY the RPA commands, no additional explanation."""
         
         print("🚀 Sending to Gemini API...")
         try:
-            response = requests.post(url, headers=headers, json=payload, 
-                                   timeout=self.config.API_TIMEOUT)
+            with self.api_slot(), span("gemini_request", upload_bytes=len(video_base64)) as request_span:
+                response = self.http.post(url, headers=headers, json=payload, 
+                                          timeout=self.config.API_TIMEOUT)
+                request_span.set(response_bytes=len(response.content))
             
             if response.status_code == 200:
                 result = response.json()
@@ -199,6 +230,9 @@ Generate ONLY the RPA commands, no additional explanation."""
                 if "usageMetadata" in result:
                     usage = result["usageMetadata"]
                     total_tokens = usage.get('totalTokenCount', 0)
+                    request_span.set(prompt_tokens=usage.get('promptTokenCount', 0),
+                                     output_tokens=usage.get('candidatesTokenCount', 0),
+                                     total_tokens=total_tokens)
                     estimated_cost = (total_tokens / 1000) * 0.00015
                     print(f"💰 Tokens: {total_tokens}, Cost: ${estimated_cost:.6f}")
                 
@@ -218,7 +252,7 @@ Generate ONLY the RPA commands, no additional explanation."""
                         output_dir = self.config.ensure_output_dir()
                         output_path = os.path.join(output_dir, output_name)
                         
-                        with open(output_path, 'w') as f:
+                        with span("write_output", bytes=len(rpa_commands)), open(output_path, 'w') as f:
                             f.write(f"# RPA Commands Generated: {datetime.now()}\n")
                             f.write(f"# Source Video: {os.path.basename(video_path)}\n")
                             f.write(f"# Source JSON: {os.path.basename(json_path)}\n\n")
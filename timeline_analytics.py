@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Vectorized Timeline Analytics
+
+NumPy implementations of the timeline computations used by the generators:
+interaction gaps, time windows and interaction density. Results have the
+same shapes as the loop-based methods in EnhancedMurexRpaGenerator /
+CompleteVideoProcessor, which fall back to their Python loops when NumPy is
+not installed.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def timestamp_array(interactions: Sequence) -> "np.ndarray":
+    """Timestamps of UIInteraction objects as a float64 array (input order)"""
+    return np.fromiter((interaction.timestamp for interaction in interactions),
+                       dtype=np.float64, count=len(interactions))
+
+
+def find_gaps(timestamps: "np.ndarray", session_duration: float,
+              gap_threshold: float = 5.0) -> List[Dict]:
+    """Gaps longer than gap_threshold, including before the first and after the last event"""
+    if timestamps.size == 0:
+        return [{'start': 0, 'end': session_duration, 'duration': session_duration}]
+
+    ordered = np.sort(timestamps, kind='stable')
+    gaps = []
+
+    first_timestamp = float(ordered[0])
+    if first_timestamp > gap_threshold:
+        gaps.append({'start': 0, 'end': first_timestamp, 'duration': first_timestamp})
+
+    durations = np.diff(ordered)
+    for index in np.flatnonzero(durations > gap_threshold).tolist():
+        gaps.append({
+            'start': float(ordered[index]),
+            'end': float(ordered[index + 1]),
+            'duration': float(durations[index])
+        })
+
+    last_timestamp = float(ordered[-1])
+    if session_duration - last_timestamp > gap_threshold:
+        gaps.append({
+            'start': last_timestamp,
+            'end': session_duration,
+            'duration': session_duration - last_timestamp
+        })
+
+    return gaps
+
+
+def window_breakpoints(timestamps: "np.ndarray", window_size: float = 2.0) -> "np.ndarray":
+    """Start index of every window; a new window opens after a step > window_size"""
+    if timestamps.size == 0:
+        return np.zeros(0, dtype=np.intp)
+    breaks = np.flatnonzero(np.diff(timestamps) > window_size) + 1
+    return np.concatenate(([0], breaks))
+
+
+def create_time_windows(interactions: Sequence, window_size: float = 2.0,
+                        timestamps: Optional["np.ndarray"] = None) -> List[Dict]:
+    """Group interactions into windows ({'start', 'end', 'interactions'})"""
+    if not interactions:
+        return []
+    if timestamps is None:
+        timestamps = timestamp_array(interactions)
+
+    starts = window_breakpoints(timestamps, window_size)
+    ends = np.append(starts[1:], len(interactions))
+    return [
+        {
+            'start': float(timestamps[start]),
+            'end': float(timestamps[end - 1]),
+            'interactions': list(interactions[start:end])
+        }
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def interaction_density(timestamps: "np.ndarray", session_duration: float,
+                        bin_seconds: float = 5.0) -> Dict[str, List]:
+    """Interaction counts per bin_seconds bucket over the whole session, in one pass"""
+    span = max(session_duration, float(timestamps.max()) if timestamps.size else 0.0)
+    bin_count = max(1, int(np.ceil(span / bin_seconds)))
+    bins = np.clip((timestamps // bin_seconds).astype(np.intp), 0, bin_count - 1)
+    counts = np.bincount(bins, minlength=bin_count)
+    return {
+        'bin_seconds': bin_seconds,
+        'bin_starts': (np.arange(bin_count) * bin_seconds).tolist(),
+        'counts': counts.tolist()
+    }
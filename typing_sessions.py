@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Typing Session Reconstruction
+
+Incremental text-buffer state machine fed with key presses as they are
+captured. It applies Backspace/Delete edits, Shift for capitals and symbols,
+treats Command/Control combinations as shortcuts rather than text, and closes
+a typing session on Return, Tab, Escape, an idle pause, a click or an app
+switch. Finished sessions carry the final typed text so downstream code can
+read them directly instead of re-scanning every key event.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+# US layout Shift variants for the non-letter keys produced by _key_code_to_name
+SHIFTED_SYMBOLS = {
+    '1': '!', '2': '@', '3': '#', '4': '$', '5': '%', '6': '^', '7': '&', '8': '*',
+    '9': '(', '0': ')', '-': '_', '=': '+', '[': '{', ']': '}', '\\': '|',
+    ';': ':', "'": '"', ',': '<', '.': '>', '/': '?', '`': '~', '§': '±'
+}
+
+END_ACTIONS = {
+    'Return': 'enter',
+    'Enter': 'enter',
+    'Tab': 'tab',
+    'Escape': 'escape'
+}
+
+DELETE_KEYS = ('Delete', 'BackSpace')
+SHORTCUT_MODIFIERS = ('Command', 'Control')
+
+
+class TypingSessionTracker:
+    """Builds typing sessions (final text + how they ended) from live key presses"""
+
+    def __init__(self, idle_timeout: float = 3.0):
+        self.idle_timeout = idle_timeout
+        self.sessions: List[Dict] = []
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._buffer: List[str] = []
+        self._start: Optional[float] = None
+        self._last: Optional[float] = None
+        self._key_count = 0
+        self._deletions = 0
+        self._shortcuts: List[str] = []
+        self._app: Optional[str] = None
+
+    def feed_key(self, key_name: str, modifiers: List[str], timestamp: float,
+                 app: Optional[str] = None) -> Optional[Dict]:
+        """Apply one key press; returns a session if this key finished one"""
+        with self._lock:
+            finished = None
+            if self._last is not None and timestamp - self._last > self.idle_timeout:
+                finished = self._finish('pause', self._last)
+
+            if app:
+                self._app = app
+
+            if key_name in END_ACTIONS:
+                return self._finish(END_ACTIONS[key_name], timestamp) or finished
+
+            self._touch(timestamp)
+
+            if any(modifier in modifiers for modifier in SHORTCUT_MODIFIERS):
+                combo = '+'.join([m for m in modifiers if m != 'Shift'] + [key_name])
+                self._shortcuts.append(combo)
+            elif key_name in DELETE_KEYS:
+                if self._buffer:
+                    self._buffer.pop()
+                else:
+                    self._deletions += 1
+            else:
+                char = self._to_char(key_name, 'Shift' in modifiers)
+                if char is not None:
+                    self._buffer.append(char)
+                    self._key_count += 1
+
+            return finished
+
+    def finish(self, end_action: str, timestamp: float) -> Optional[Dict]:
+        """Close the current session (click, app switch, stop...) if it has content"""
+        with self._lock:
+            return self._finish(end_action, timestamp)
+
+    def _touch(self, timestamp: float):
+        if self._start is None:
+            self._start = timestamp
+        self._last = timestamp
+
+    def _finish(self, end_action: str, timestamp: float) -> Optional[Dict]:
+        if self._start is None:
+            self._reset()
+            return None
+
+        session = {
+            'timestamp': self._start,
+            'end_timestamp': max(timestamp, self._last),
+            'final_text': ''.join(self._buffer),
+            'end_action': end_action,
+            'key_count': self._key_count,
+            'deletions_before_start': self._deletions,
+            'shortcuts': self._shortcuts,
+            'app': self._app
+        }
+        self._reset()
+        if not session['final_text'] and not session['shortcuts']:
+            return None
+        self.sessions.append(session)
+        return session
+
+    @staticmethod
+    def _to_char(key_name: str, shift: bool) -> Optional[str]:
+        if key_name == 'Space':
+            return ' '
+        if len(key_name) != 1:
+            return None
+        if shift:
+            return key_name.upper() if key_name.isalpha() else SHIFTED_SYMBOLS.get(key_name, key_name)
+        return key_name
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Sampled-decode Video Health Checks
+
+Catches recordings that are technically valid files but useless to the
+generator: black stretches, a frozen picture, frames missing at the end
+(writer recovery re-creating the file, a crashed recorder) or frames whose
+size does not match the stream.
+
+Only a stratified sample of frames is decoded: the video is cut into equal
+strata and one frame per stratum is read by seeking, plus a bisection for
+the last decodable frame. A seek decodes from the preceding keyframe, so
+when the MP4 keyframe table is too sparse for that to pay off (screen
+recordings often have a single keyframe) only frames that are cheap to
+reach are read: short grab() walks from the start and from just after a
+few keyframes, within a fixed decode budget. The result is then marked
+approximate, and the end of the stream is only checked if a walk gets
+there. Luminance
+and frame-difference statistics are computed on small greyscale
+thumbnails as one NumPy array.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from video_probe import VideoProbe, keyframe_indices, probe_video
+
+DEFAULT_SAMPLES = 24
+THUMBNAIL_SIZE = (160, 90)
+BLACK_MEAN = 12.0  # mean luminance (0-255) at or below which a frame counts as black
+BLACK_STD = 4.0  # ...provided it is also this uniform
+FROZEN_DIFF = 0.3  # mean absolute thumbnail difference below which two samples are identical
+FROZEN_MIN_SECONDS = 30.0  # shorter unchanged stretches are normal for UI recordings
+TRUNCATION_TOLERANCE = 2  # frames the header may list beyond the last decodable one
+MAX_DECODED_FRAMES = 48  # decode budget per video with sparse keyframes (~1 s at 4K)
+SEEK_LEAD = 16  # OpenCV seeks to the keyframe at least this many frames before the target
+
+
+@dataclass
+class VideoHealth:
+    """Sampled health statistics for one video (times in seconds of video)"""
+    frame_count: int
+    fps: float
+    samples: int
+    decoded: int
+    last_decodable_frame: int
+    access: str = 'seek'  # 'seek' or 'keyframes' (sparse keyframes, see approximate)
+    approximate: bool = False  # samples limited to keyframes and a bounded walk
+    end_checked: bool = True  # whether last_decodable_frame is exact or only a lower bound
+    black_segments: List[Tuple[float, float]] = field(default_factory=list)
+    frozen_segments: List[Tuple[float, float]] = field(default_factory=list)
+    resolution_mismatches: List[Dict] = field(default_factory=list)
+    mean_luminance: Optional[float] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def truncated(self) -> bool:
+        return self.end_checked and self.frame_count - 1 - self.last_decodable_frame > TRUNCATION_TOLERANCE
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), 'truncated': self.truncated}
+
+
+def check_video_health(video_path: str, probe: Optional[VideoProbe] = None,
+                       samples: int = DEFAULT_SAMPLES, seed: int = 0) -> Optional[VideoHealth]:
+    """Decode a stratified sample of frames and summarise them; None if the video cannot be opened"""
+    started = time.perf_counter()
+    probe = probe or probe_video(video_path)
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        return None
+    try:
+        frame_count = probe.frame_count if probe else int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = (probe.fps if probe else capture.get(cv2.CAP_PROP_FPS)) or 1.0
+        expected_size = (probe.width, probe.height) if probe else None
+        if frame_count <= 0:
+            return VideoHealth(0, fps, 0, 0, -1, elapsed_ms=_elapsed_ms(started))
+
+        # One random frame inside each of `samples` equal strata
+        rng = random.Random(seed)
+        strata = min(samples, frame_count)
+        bounds = np.linspace(0, frame_count, strata + 1).astype(int)
+        indices = sorted({rng.randrange(bounds[i], max(bounds[i] + 1, bounds[i + 1])) for i in range(strata)})
+
+        # Seeking costs about one GOP per sample; with fewer keyframes than half
+        # the samples only the frames reachable within the grab budget are read
+        keyframes = keyframe_indices(video_path)
+        sparse = keyframes is not None and len(keyframes) * 2 < strata
+        end_checked = True
+        if sparse:
+            frames, last_decodable, end_checked = _sample_sparse(capture, frame_count, indices, keyframes)
+        else:
+            frames = ((index, _read_frame(capture, index)) for index in indices)
+            last_decodable = None
+
+        thumbnails, decoded_indices, mismatches = [], [], []
+        for index, frame in frames:
+            if frame is None:
+                continue
+            height, width = frame.shape[:2]
+            if expected_size and (width, height) != expected_size:
+                mismatches.append({'time': round(index / fps, 3), 'size': [width, height],
+                                   'expected': list(expected_size)})
+            grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            thumbnails.append(cv2.resize(grey, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA))
+            decoded_indices.append(index)
+
+        health = VideoHealth(
+            frame_count=frame_count,
+            fps=fps,
+            samples=len(indices),
+            decoded=len(decoded_indices),
+            last_decodable_frame=(last_decodable if sparse
+                                  else _last_decodable_frame(capture, frame_count)),
+            access='keyframes' if sparse else 'seek',
+            approximate=sparse,
+            end_checked=end_checked,
+            resolution_mismatches=mismatches
+        )
+        if thumbnails:
+            stack = np.stack(thumbnails).astype(np.float32)
+            means = stack.mean(axis=(1, 2))
+            stds = stack.std(axis=(1, 2))
+            diffs = np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2))
+            times = np.asarray(decoded_indices) / fps
+            health.mean_luminance = round(float(means.mean()), 2)
+            health.black_segments = _runs(times, (means <= BLACK_MEAN) & (stds <= BLACK_STD))
+            frozen = _runs(times, np.append(diffs < FROZEN_DIFF, False), extend_to_next=True)
+            health.frozen_segments = [span for span in frozen if span[1] - span[0] >= FROZEN_MIN_SECONDS]
+        health.elapsed_ms = _elapsed_ms(started)
+        return health
+    finally:
+        capture.release()
+
+
+def _read_frame(capture, index: int):
+    capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+    ok, frame = capture.read()
+    return frame if ok and frame is not None else None
+
+
+def _sample_sparse(capture, frame_count: int, indices: List[int], keyframes: List[int]):
+    """Bounded walks from cheap seek targets: ([(index, frame)], last decodable index, end checked)
+
+    Seeking to SEEK_LEAD frames past a keyframe decodes from that keyframe,
+    so landing there costs SEEK_LEAD + 1 frames. A third of the budget is
+    kept for walking; each walk retrieves its first frame and the sampled
+    ones it passes. The end of the stream is known only if the last walk
+    reaches it or a grab fails.
+    """
+    wanted = set(indices)
+    seek_cost = SEEK_LEAD + 1
+    later = [index for index in keyframes if 0 < index and index + SEEK_LEAD < frame_count]
+    affordable = (MAX_DECODED_FRAMES * 2 // 3) // seek_cost
+    if len(later) > affordable:
+        later = [later[round(i * (len(later) - 1) / max(1, affordable - 1))] for i in range(affordable)]
+    starts = [0] + [index + SEEK_LEAD for index in later]
+    walk = max(1, (MAX_DECODED_FRAMES - len(later) * seek_cost) // len(starts))
+
+    frames = {}
+    last = -1
+    end_checked = False
+    for start in starts:
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        stop = min(frame_count, start + walk)
+        for index in range(start, stop):
+            if not capture.grab():
+                end_checked = start == starts[-1]
+                break
+            last = max(last, index)
+            if index == start or index in wanted:
+                ok, frame = capture.retrieve()
+                frames[index] = frame if ok else None
+    return sorted(frames.items()), last, end_checked or last == frame_count - 1
+
+
+def _last_decodable_frame(capture, frame_count: int) -> int:
+    """Bisect for the last frame that can be sought to and decoded (-1 if none)"""
+    if _read_frame(capture, frame_count - 1) is not None:
+        return frame_count - 1
+    low, high = -1, frame_count - 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if _read_frame(capture, middle) is not None:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _runs(times: np.ndarray, mask: np.ndarray, extend_to_next: bool = False) -> List[Tuple[float, float]]:
+    """(start, end) times of consecutive True samples; extend_to_next ends a run at the following sample"""
+    runs = []
+    start = None
+    for i, flagged in enumerate(mask):
+        if flagged and start is None:
+            start = i
+        if not flagged and start is not None:
+            end = i if extend_to_next else i - 1
+            runs.append((round(float(times[start]), 3), round(float(times[end]), 3)))
+            start = None
+    if start is not None:
+        runs.append((round(float(times[start]), 3), round(float(times[-1]), 3)))
+    return runs
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Header-only Video Probe
+
+Reads duration, frame count, fps and resolution straight from the container
+headers through mmap, without decoding any frame:
+
+- MP4/MOV: moov/mvhd for the movie duration, and for the video track
+  tkhd (resolution), mdhd (timescale) and stbl/stts (per-sample durations,
+  so the frame count and variable frame timing are exact); stbl/stss lists
+  the keyframes for seek planning (keyframe_indices)
+- AVI: RIFF hdrl/avih and the video stream's strh (rate, scale, length)
+
+Only the header pages are touched, so probing a batch of recordings costs
+little more than opening the files.
+"""
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MICROSECONDS = 1_000_000
+# Boxes that only contain other boxes on the way to the video track's tables
+MP4_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+@dataclass
+class VideoProbe:
+    """Container facts about a video file (times in microseconds)"""
+    container: str
+    duration_us: int
+    frame_count: int
+    fps: float
+    width: int
+    height: int
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return self.duration_us / MICROSECONDS
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def probe_video(path: str) -> Optional[VideoProbe]:
+    """Probe an MP4/MOV or AVI file; None if it is missing, empty or not understood"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < 12:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[0:4] == b'RIFF' and data[8:12] == b'AVI ':
+                    return _probe_avi(data)
+                return _probe_mp4(data)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+# MP4 / MOV
+
+def _boxes(data, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload start, box end) for the boxes between start and end"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            # Truncated file: stop at the last complete box
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _child(data, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    for found, payload, box_end in _boxes(data, start, end):
+        if found == box_type:
+            return payload, box_end
+    return None
+
+
+def _probe_mp4(data) -> Optional[VideoProbe]:
+    moov = _child(data, 0, len(data), b'moov')
+    if moov is None:
+        return None
+
+    movie_duration_us = 0
+    mvhd = _child(data, moov[0], moov[1], b'mvhd')
+    if mvhd:
+        timescale, duration = _full_box_time(data, mvhd[0])
+        if timescale:
+            movie_duration_us = duration * MICROSECONDS // timescale
+
+    for box_type, payload, box_end in _boxes(data, moov[0], moov[1]):
+        if box_type != b'trak':
+            continue
+        track = _probe_video_track(data, payload, box_end)
+        if track is not None:
+            timescale, sample_count, sample_duration_total, width, height = track
+            duration_us = sample_duration_total * MICROSECONDS // timescale if timescale else movie_duration_us
+            fps = sample_count * MICROSECONDS / duration_us if duration_us else 0.0
+            return VideoProbe('mp4', duration_us or movie_duration_us, sample_count, round(fps, 3), width, height)
+    return None
+
+
+def _full_box_time(data, payload: int) -> Tuple[int, int]:
+    """(timescale, duration) from an mvhd or mdhd payload (version 0 or 1)"""
+    version = data[payload]
+    if version == 1:
+        timescale, duration = struct.unpack_from('>IQ', data, payload + 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', data, payload + 12)
+    return timescale, duration
+
+
+def _probe_video_track(data, start: int, end: int):
+    """(timescale, sample count, summed sample durations, width, height) of a video trak"""
+    mdia = _child(data, start, end, b'mdia')
+    if mdia is None:
+        return None
+    hdlr = _child(data, mdia[0], mdia[1], b'hdlr')
+    if hdlr is None or data[hdlr[0] + 8:hdlr[0] + 12] != b'vide':
+        return None
+
+    width = height = 0
+    tkhd = _child(data, start, end, b'tkhd')
+    if tkhd:
+        # Width and height are the last two 16.16 fixed-point fields
+        width, height = (value >> 16 for value in struct.unpack_from('>II', data, tkhd[1] - 8))
+
+    timescale = 0
+    mdhd = _child(data, mdia[0], mdia[1], b'mdhd')
+    if mdhd:
+        timescale, _ = _full_box_time(data, mdhd[0])
+
+    sample_count = sample_duration_total = 0
+    minf = _child(data, mdia[0], mdia[1], b'minf')
+    stbl = _child(data, minf[0], minf[1], b'stbl') if minf else None
+    stts = _child(data, stbl[0], stbl[1], b'stts') if stbl else None
+    if stts:
+        entry_count = struct.unpack_from('>I', data, stts[0] + 4)[0]
+        for index in range(entry_count):
+            count, delta = struct.unpack_from('>II', data, stts[0] + 8 + index * 8)
+            sample_count += count
+            sample_duration_total += count * delta
+    return timescale, sample_count, sample_duration_total, width, height
+
+
+def keyframe_indices(path: str) -> Optional[List[int]]:
+    """0-based keyframe (sync sample) indices of an MP4's video track; None if not known
+
+    A track without an stss box has only keyframes, so every index is returned.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < 12:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                moov = _child(data, 0, len(data), b'moov')
+                if moov is None:
+                    return None
+                for box_type, payload, box_end in _boxes(data, moov[0], moov[1]):
+                    if box_type != b'trak':
+                        continue
+                    track = _probe_video_track(data, payload, box_end)
+                    if track is None:
+                        continue
+                    stbl = _descend(data, payload, box_end, (b'mdia', b'minf', b'stbl'))
+                    stss = _child(data, stbl[0], stbl[1], b'stss') if stbl else None
+                    if stss is None:
+                        return list(range(track[1]))
+                    entry_count = struct.unpack_from('>I', data, stss[0] + 4)[0]
+                    # stss sample numbers are 1-based
+                    return [number - 1 for number in struct.unpack_from(f'>{entry_count}I', data, stss[0] + 8)]
+    except (OSError, ValueError, struct.error):
+        return None
+    return None
+
+
+def _descend(data, start: int, end: int, path: Tuple[bytes, ...]) -> Optional[Tuple[int, int]]:
+    span = (start, end)
+    for box_type in path:
+        span = _child(data, span[0], span[1], box_type)
+        if span is None:
+            return None
+    return span
+
+
+# AVI
+
+def _chunks(data, start: int, end: int) -> Iterator[Tuple[bytes, int, int, bytes]]:
+    """Yield (id, payload start, payload end, list type) for RIFF chunks (list type for LISTs)"""
+    offset = start
+    while offset + 8 <= end:
+        chunk_id, size = struct.unpack_from('<4sI', data, offset)
+        payload = offset + 8
+        payload_end = min(payload + size, end)
+        list_type = data[payload:payload + 4] if chunk_id in (b'LIST', b'RIFF') else b''
+        yield chunk_id, payload, payload_end, list_type
+        offset = payload + size + (size & 1)
+
+
+def _probe_avi(data) -> Optional[VideoProbe]:
+    hdrl = next(((payload + 4, end) for chunk_id, payload, end, list_type in _chunks(data, 12, len(data))
+                 if chunk_id == b'LIST' and list_type == b'hdrl'), None)
+    if hdrl is None:
+        return None
+
+    micro_sec_per_frame = total_frames = width = height = 0
+    stream_rate = None
+    for chunk_id, payload, end, list_type in _chunks(data, hdrl[0], hdrl[1]):
+        if chunk_id == b'avih':
+            micro_sec_per_frame, _, _, _, total_frames = struct.unpack_from('<5I', data, payload)
+            width, height = struct.unpack_from('<II', data, payload + 32)
+        elif chunk_id == b'LIST' and list_type == b'strl' and stream_rate is None:
+            strh = next(((p, e) for cid, p, e, _ in _chunks(data, payload + 4, end) if cid == b'strh'), None)
+            if strh and data[strh[0]:strh[0] + 4] == b'vids':
+                scale, rate, _, length = struct.unpack_from('<4I', data, strh[0] + 20)
+                if scale and rate:
+                    stream_rate = (rate / scale, length)
+
+    if stream_rate:
+        fps, frame_count = stream_rate
+        frame_count = frame_count or total_frames
+    elif micro_sec_per_frame:
+        fps, frame_count = MICROSECONDS / micro_sec_per_frame, total_frames
+    else:
+        return None
+    duration_us = int(round(frame_count * MICROSECONDS / fps)) if fps else 0
+    return VideoProbe('avi', duration_us, frame_count, round(fps, 3), width, height)
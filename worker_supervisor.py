@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Supervised Recorder Worker Threads
+
+Cooperative shutdown for the recorder's background threads. Each component
+(video, keyboard, mouse...) owns a WorkerSupervisor; its threads wait on the
+supervisor's threading.Event instead of sleeping, so a stop request wakes
+them immediately. Blocking calls that cannot wait on an Event (a CFRunLoop,
+a sync barrier, a sleeping rate controller) register a cancel callback that
+the stop request runs.
+
+Every supervisor is kept in a registry so thread liveness and stop latency
+(stop request -> thread exit) can be reported after a recording.
+"""
+
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_JOIN_TIMEOUT = 5.0
+
+_registry: "weakref.WeakSet[WorkerSupervisor]" = weakref.WeakSet()
+
+
+class Worker:
+    """One supervised thread and its timings"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = time.monotonic()
+        self.stop_requested_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def stop_latency_ms(self) -> Optional[float]:
+        """Stop request to thread exit (0 if it had already finished)"""
+        if self.stop_requested_at is None or self.stopped_at is None:
+            return None
+        return round(max(0.0, self.stopped_at - self.stop_requested_at) * 1000, 2)
+
+    def status(self) -> Dict:
+        return {
+            'name': self.name,
+            'alive': self.alive,
+            'stop_latency_ms': self.stop_latency_ms,
+            'error': self.error
+        }
+
+
+class WorkerSupervisor:
+    """Starts named worker threads and stops them together through one Event"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stop_event = threading.Event()
+        self.workers: List[Worker] = []
+        self._cancel_callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        _registry.add(self)
+
+    @property
+    def stopping(self) -> bool:
+        return self.stop_event.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to seconds; True as soon as a stop has been requested"""
+        return self.stop_event.wait(max(0.0, seconds))
+
+    def start(self, name: str, target: Callable, *args) -> Worker:
+        """Run target(*args) on a new daemon thread; it should return once stopping is set"""
+        worker = Worker(name)
+        worker.thread = threading.Thread(target=self._run, args=(worker, target, args),
+                                         name=f"{self.name}:{name}", daemon=True)
+        with self._lock:
+            self.workers.append(worker)
+        worker.thread.start()
+        return worker
+
+    def on_stop(self, callback: Callable[[], None]) -> None:
+        """Register a cancel callback for a blocking call (run at once if already stopping)"""
+        with self._lock:
+            if not self.stop_event.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    def request_stop(self) -> None:
+        """Signal every worker to finish; returns immediately"""
+        with self._lock:
+            if self.stop_event.is_set():
+                return
+            now = time.monotonic()
+            for worker in self.workers:
+                worker.stop_requested_at = now
+            self.stop_event.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ {self.name} cancel callback error: {e}")
+
+    def join(self, timeout: float = DEFAULT_JOIN_TIMEOUT) -> bool:
+        """Wait for all workers (one shared deadline); True if none is left running"""
+        deadline = time.monotonic() + timeout
+        for worker in list(self.workers):
+            if worker.thread is not threading.current_thread():
+                worker.thread.join(max(0.0, deadline - time.monotonic()))
+        stuck = [worker.name for worker in self.workers if worker.alive]
+        if stuck:
+            print(f"⚠️ {self.name} workers still running after {timeout:.0f}s: {', '.join(stuck)}")
+        return not stuck
+
+    def stop(self, timeout: float = DEFAULT_JOIN_TIMEOUT) -> bool:
+        self.request_stop()
+        return self.join(timeout)
+
+    def status(self) -> Dict:
+        """Liveness and stop latency of each worker, stored in session_info"""
+        latencies = [w.stop_latency_ms for w in self.workers if w.stop_latency_ms is not None]
+        return {
+            'supervisor': self.name,
+            'workers': [worker.status() for worker in self.workers],
+            'max_stop_latency_ms': max(latencies) if latencies else None
+        }
+
+    def _run(self, worker: Worker, target: Callable, args) -> None:
+        try:
+            target(*args)
+        except Exception as e:
+            worker.error = str(e)
+            print(f"❌ Worker {self.name}:{worker.name} failed: {e}")
+        finally:
+            worker.stopped_at = time.monotonic()
+
+
+def registry_status() -> List[Dict]:
+    """Status of every live supervisor"""
+    return [supervisor.status() for supervisor in list(_registry)]
+
+
+def running_workers() -> List[str]:
+    """Names of supervised threads that are still alive"""
+    return [f"{supervisor.name}:{worker.name}"
+            for supervisor in list(_registry) for worker in supervisor.workers if worker.alive]
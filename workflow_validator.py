@@ -8,10 +8,23 @@ Helps ensure high-quality RPA command generation.
 
 import json
 import os
+import sys
+import time
 import logging
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional, Union
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from recording_session import RecordingSession, discover_sessions
+from rpa_config import RpaConfig
+from rpa_tracing import traced
+from video_probe import probe_video
+
+# Largest accepted gap between the logged session and the video's real duration
+SYNC_TOLERANCE_SECONDS = 2.0
+# Largest accepted gap between the video's playback length and its captured time span
+DRIFT_TOLERANCE_SECONDS = 1.0
+# Bump when the checks change so cached directory results are recomputed
+VALIDATION_CACHE_VERSION = 2
 
 @dataclass
 class ValidationResult:
@@ -35,12 +48,24 @@ class WorkflowValidator:
         )
         self.logger = logging.getLogger(__name__)
     
-    def validate_video_file(self, video_path: str) -> List[ValidationResult]:
-        """Validate video file for RPA processing"""
+    @traced()
+    def validate_video_file(self, video_path: str, session: Optional[RecordingSession] = None,
+                            health_check: bool = True) -> List[ValidationResult]:
+        """Validate video file for RPA processing
+        
+        health_check=False skips the sampled-decode health check, which decodes
+        most of a sparse-keyframe H.264 file (seconds per recording).
+        """
         results = []
+        video_stat = session.video_stat if session and session.video_path == video_path else None
+        if video_stat is None:
+            try:
+                video_stat = os.stat(video_path)
+            except OSError:
+                video_stat = None
         
         # Check file existence
-        if not os.path.exists(video_path):
+        if video_stat is None:
             results.append(ValidationResult(
                 is_valid=False,
                 message=f"Video file not found: {video_path}",
@@ -50,7 +75,7 @@ class WorkflowValidator:
             return results
         
         # Check file size
-        size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        size_mb = video_stat.st_size / (1024 * 1024)
         if size_mb > 100:  # Assuming 100MB limit for Gemini API
             results.append(ValidationResult(
                 is_valid=False,
@@ -80,18 +105,95 @@ class WorkflowValidator:
                 severity='error',
                 suggestion="Use MP4, MOV, or AVI format for best compatibility"
             ))
+            return results
+        
+        if health_check:
+            probe = session.video_probe if session and session.video_path == video_path else probe_video(video_path)
+            results.extend(self._check_video_health(video_path, probe))
         
         return results
     
-    def validate_json_file(self, json_path: str) -> List[ValidationResult]:
+    @traced()
+    def _check_video_health(self, video_path: str, probe) -> List[ValidationResult]:
+        """Sampled-decode checks for black, frozen, truncated or resized stretches"""
+        from video_health import check_video_health  # loads OpenCV/NumPy, only needed here
+        health = check_video_health(video_path, probe, samples=RpaConfig.VIDEO_HEALTH_SAMPLES)
+        if health is None:
+            return [ValidationResult(
+                is_valid=False,
+                message="Video cannot be opened for decoding",
+                severity='error',
+                suggestion="The file may be corrupt or use a codec OpenCV cannot read"
+            )]
+        if health.decoded == 0:
+            return [ValidationResult(
+                is_valid=False,
+                message=f"No frame could be decoded ({health.samples} sampled)",
+                severity='error',
+                suggestion="Re-record the workflow; the video stream is unreadable"
+            )]
+        
+        results = []
+        if health.truncated:
+            missing = health.frame_count - 1 - health.last_decodable_frame
+            results.append(ValidationResult(
+                is_valid=False,
+                message=(f"Video truncated: last decodable frame {health.last_decodable_frame} "
+                         f"of {health.frame_count} ({missing / health.fps:.1f}s missing)"),
+                severity='error',
+                suggestion="The recorder likely crashed or re-created the writer; re-record the workflow"
+            ))
+        for start, end in health.black_segments:
+            results.append(ValidationResult(
+                is_valid=True,
+                message=f"Black video from {start:.1f}s to {end:.1f}s",
+                severity='warning',
+                suggestion="Check screen recording permission and that the recorded monitor was awake"
+            ))
+        approximate = " (approximate, keyframes only)" if health.approximate else ""
+        for start, end in health.frozen_segments:
+            results.append(ValidationResult(
+                is_valid=True,
+                message=f"Frozen video from {start:.1f}s to {end:.1f}s ({end - start:.0f}s unchanged){approximate}",
+                severity='warning',
+                suggestion="The capture may have stalled; compare with the interaction log for that period"
+            ))
+        if health.resolution_mismatches:
+            first = health.resolution_mismatches[0]
+            results.append(ValidationResult(
+                is_valid=True,
+                message=(f"{len(health.resolution_mismatches)} sampled frame(s) differ from the stream size "
+                         f"{first['expected']}, first at {first['time']:.1f}s: {first['size']}"),
+                severity='warning',
+                suggestion="The display resolution or recorded monitor changed during the recording"
+            ))
+        results.append(ValidationResult(
+            is_valid=True,
+            message=(f"Video health: {health.decoded}/{health.samples} sampled frames decoded "
+                     f"({health.access}), mean luminance {health.mean_luminance}, {health.elapsed_ms:.0f} ms"),
+            severity='info'
+        ))
+        if health.approximate:
+            end = ("end of stream checked" if health.end_checked
+                   else f"truncation not checked past frame {health.last_decodable_frame}")
+            results.append(ValidationResult(
+                is_valid=True,
+                message=f"Video health is approximate: sparse keyframes, only cheaply reachable frames read ({end})",
+                severity='info'
+            ))
+        return results
+    
+    @traced()
+    def validate_json_file(self, json_path: Union[str, RecordingSession]) -> List[ValidationResult]:
         """Validate JSON interaction file"""
         results = []
+        session = RecordingSession.coerce(json_path)
         
         # Check file existence
-        if not os.path.exists(json_path):
+        if session.json_stat is None:
             results.append(ValidationResult(
                 is_valid=False,
-                message=f"JSON file not found: {json_path}",
+                message=f"JSON file not found: {session.json_path}",
                 severity='error',
                 suggestion="Check the file path and ensure the interaction JSON file exists"
             ))
@@ -99,8 +201,7 @@ class WorkflowValidator:
         
         # Parse JSON
         try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
+            summary = session.summary
         except json.JSONDecodeError as e:
             results.append(ValidationResult(
                 is_valid=False,
@@ -112,7 +213,7 @@ class WorkflowValidator:
         
         # Validate JSON structure
         required_keys = ['mouse_interactions', 'keyboard_events']
-        missing_keys = [key for key in required_keys if key not in data]
+        missing_keys = [key for key in required_keys if not session.has_section(key)]
         
         if missing_keys:
             results.append(ValidationResult(
@@ -123,8 +224,8 @@ class WorkflowValidator:
             ))
         
         # Check interaction counts
-        mouse_count = len(data.get('mouse_interactions', []))
-        keyboard_count = len(data.get('keyboard_events', []))
+        mouse_count = session.event_count('mouse_interactions')
+        keyboard_count = session.event_count('keyboard_events')
         
         if mouse_count == 0 and keyboard_count == 0:
             results.append(ValidationResult(
@@ -148,7 +249,7 @@ class WorkflowValidator:
             ))
         
         # Check session duration
-        session_info = data.get('session_info', {})
+        session_info = summary['session_info']
         duration = session_info.get('duration', 0)
         
         if duration == 0:
@@ -168,36 +269,66 @@ class WorkflowValidator:
         
         return results
     
-    def validate_time_synchronization(self, video_path: str, json_path: str) -> List[ValidationResult]:
+    @traced()
+    def validate_time_synchronization(self, video_path: str, 
+                                      json_path: Union[str, RecordingSession]) -> List[ValidationResult]:
         """Check if video and JSON timestamps are synchronized"""
         results = []
         
         try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
+            session = RecordingSession.coerce(json_path, video_path)
             
             # Get session duration from JSON
-            json_duration = data.get('session_info', {}).get('duration', 0)
+            json_duration = session.duration
             
-            # Get video duration (approximate check using file size)
-            video_size_mb = os.path.getsize(video_path) / (1024 * 1024)
+            # Exact video duration and frame count from the container header
+            if session.video_path == video_path:
+                probe = session.video_probe
+            else:
+                probe = probe_video(video_path)
             
-            # Rough estimate: 1MB per 10 seconds for UI recording
-            estimated_video_duration = video_size_mb * 10
+            if probe is None:
+                results.append(ValidationResult(
+                    is_valid=True,
+                    message="Could not read the video container header",
+                    severity='warning',
+                    suggestion="The file may be truncated or not MP4/MOV/AVI - check that it plays"
+                ))
+                return results
             
-            if json_duration > 0:
-                duration_diff = abs(json_duration - estimated_video_duration)
-                if duration_diff > 30:  # More than 30 seconds difference
+            results.append(ValidationResult(
+                is_valid=True,
+                message=f"Video: {probe.duration:.2f}s, {probe.frame_count} frames at {probe.fps:g} fps, "
+                        f"{probe.width}x{probe.height} ({probe.container})",
+                severity='info'
+            ))
+            
+            sidecar = session.frame_sidecar if session.video_path == video_path else {}
+            results.extend(self._check_frame_sidecar(probe, sidecar))
+            
+            if session.video_is_segmented and session.video_path == video_path:
+                results.append(ValidationResult(
+                    is_valid=True,
+                    message="Video is time-remapped (activity-triggered or adaptive FPS); synchronization follows the frame sidecar",
+                    severity='info'
+                ))
+            elif json_duration > 0:
+                # The video starts when its stream started on the session clock
+                expected_video_duration = json_duration - session.stream_offset('video')
+                duration_diff = probe.duration - expected_video_duration
+                if abs(duration_diff) > SYNC_TOLERANCE_SECONDS:
                     results.append(ValidationResult(
                         is_valid=True,
-                        message=f"Potential timing mismatch between video and JSON",
+                        message=f"Timing mismatch: video is {probe.duration:.1f}s, session log covers "
+                                f"{expected_video_duration:.1f}s ({duration_diff:+.1f}s)",
                         severity='warning',
-                        suggestion="Verify that video and JSON were recorded in the same session"
+                        suggestion="Verify that video and JSON were recorded in the same session; "
+                                   "a shorter video usually means dropped frames or a truncated file"
                     ))
                 else:
                     results.append(ValidationResult(
                         is_valid=True,
-                        message="Video and JSON timing appears synchronized",
+                        message=f"Video and JSON timing synchronized ({duration_diff:+.2f}s)",
                         severity='info'
                     ))
             
@@ -211,6 +342,41 @@ class WorkflowValidator:
         
         return results
     
+    def _check_frame_sidecar(self, probe, sidecar: Dict) -> List[ValidationResult]:
+        """Compare the recorder's frame timestamp sidecar with what the container holds"""
+        results = []
+        timestamps = sidecar.get('frame_timestamps') or []
+        if not timestamps:
+            return results
+        
+        if abs(len(timestamps) - probe.frame_count) > 1:
+            results.append(ValidationResult(
+                is_valid=True,
+                message=f"Frame count mismatch: recorder logged {len(timestamps)} frames, video holds {probe.frame_count}",
+                severity='warning',
+                suggestion="Frames were lost while writing (e.g. writer recovery) - click times may map to the wrong frame"
+            ))
+        
+        if not (sidecar.get('activity_triggered') or sidecar.get('adaptive_fps')) and probe.fps:
+            # Frames are written at a nominal rate; a slower real capture rate makes playback drift
+            captured_span = timestamps[-1] - timestamps[0] + 1.0 / probe.fps
+            drift = probe.duration - captured_span
+            if abs(drift) > DRIFT_TOLERANCE_SECONDS:
+                results.append(ValidationResult(
+                    is_valid=True,
+                    message=f"Playback drift: video plays {probe.duration:.1f}s for {captured_span:.1f}s of capture ({drift:+.1f}s)",
+                    severity='warning',
+                    suggestion="Capture could not keep up with the configured FPS - use the frame sidecar for timing or record at a lower FPS"
+                ))
+            else:
+                results.append(ValidationResult(
+                    is_valid=True,
+                    message=f"Frame timing consistent with playback ({drift:+.2f}s drift)",
+                    severity='info'
+                ))
+        return results
+    
+    @traced()
     def validate_workflow_output(self, rpa_commands: str) -> List[ValidationResult]:
         """Validate generated RPA workflow commands"""
         results = []
@@ -281,16 +447,25 @@ class WorkflowValidator:
         
         return results
     
-    def validate_complete_workflow(self, video_path: str, json_path: str, 
-                                 rpa_commands: Optional[str] = None) -> Dict[str, List[ValidationResult]]:
-        """Perform complete validation of the workflow generation process"""
+    @traced()
+    def validate_complete_workflow(self, video_path: str, json_path: Union[str, RecordingSession], 
+                                 rpa_commands: Optional[str] = None,
+                                 health_check: bool = True) -> Dict[str, List[ValidationResult]]:
+        """Perform complete validation of the workflow generation process
+        
+        json_path may be a RecordingSession so that the JSON is parsed and the
+        video stat-ed only once for validation and the steps that follow. The
+        generators pass health_check=False: the video health check runs for
+        explicit and directory validation, not before every API call.
+        """
         
         print("🔍 Running complete workflow validation...")
         
+        session = RecordingSession.coerce(json_path, video_path)
         validation_results = {
-            'video': self.validate_video_file(video_path),
-            'json': self.validate_json_file(json_path),
-            'synchronization': self.validate_time_synchronization(video_path, json_path)
+            'video': self.validate_video_file(video_path, session, health_check),
+            'json': self.validate_json_file(session),
+            'synchronization': self.validate_time_synchronization(video_path, session)
         }
         
         if rpa_commands:
@@ -298,6 +473,91 @@ class WorkflowValidator:
         
         return validation_results
     
+    @traced()
+    def validate_directory(self, records_dir: str = RpaConfig.RECORDS_DIR, max_workers: Optional[int] = None,
+                           report_path: Optional[str] = None) -> Dict[str, Dict[str, List[ValidationResult]]]:
+        """Validate every recording in a directory, re-checking only sessions whose files changed
+        
+        Sessions come from discover_sessions. Results are cached in
+        RpaConfig.VALIDATION_CACHE_FILE keyed on each file's path, size and mtime;
+        changed sessions are validated in parallel worker processes. A JSON report
+        with per-check timings is written to report_path (default:
+        RpaConfig.VALIDATION_REPORT_FILE in records_dir). Returns the validation
+        results per session name, as validate_complete_workflow does for one pair.
+        """
+        started = time.perf_counter()
+        cache_path = os.path.join(records_dir, RpaConfig.VALIDATION_CACHE_FILE)
+        cache = _load_validation_cache(cache_path)
+        
+        sessions = {}
+        for video_path, json_path in discover_sessions(records_dir):
+            name = os.path.splitext(os.path.basename(json_path or video_path))[0]
+            sessions[name] = {
+                'video': video_path,
+                'json': json_path,
+                'fingerprint': [_file_fingerprint(video_path), _file_fingerprint(json_path)]
+            }
+        
+        stale = [name for name, info in sessions.items()
+                 if cache.get(name, {}).get('fingerprint') != info['fingerprint']]
+        print(f"🔍 Validating {len(sessions)} sessions in {records_dir} "
+              f"({len(sessions) - len(stale)} cached, {len(stale)} to check)")
+        
+        if len(stale) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                outcomes = list(pool.map(_validate_session_files,
+                                         [sessions[name]['video'] for name in stale],
+                                         [sessions[name]['json'] for name in stale]))
+        else:
+            outcomes = [_validate_session_files(sessions[name]['video'], sessions[name]['json']) for name in stale]
+        for name, outcome in zip(stale, outcomes):
+            cache[name] = {'fingerprint': sessions[name]['fingerprint'], **outcome}
+        
+        # Drop sessions whose files are gone
+        cache = {name: cache[name] for name in sessions}
+        _save_validation_cache(cache_path, cache)
+        
+        report_sessions = []
+        all_results = {}
+        for name, info in sessions.items():
+            entry = cache[name]
+            all_results[name] = {category: [ValidationResult(**result) for result in results]
+                                 for category, results in entry['results'].items()}
+            flat = [result for results in entry['results'].values() for result in results]
+            report_sessions.append({
+                'name': name,
+                'video': info['video'],
+                'json': info['json'],
+                'cached': name not in stale,
+                'valid': not any(result['severity'] == 'error' for result in flat),
+                'errors': sum(result['severity'] == 'error' for result in flat),
+                'warnings': sum(result['severity'] == 'warning' for result in flat),
+                'timings_ms': entry['timings_ms'],
+                'results': entry['results']
+            })
+            status = "✅" if report_sessions[-1]['valid'] else "❌"
+            print(f"   {status} {name}: {report_sessions[-1]['errors']} errors, "
+                  f"{report_sessions[-1]['warnings']} warnings{' (cached)' if name not in stale else ''}")
+        
+        report = {
+            'records_dir': records_dir,
+            'generated_at': datetime.now().isoformat(),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+            'session_count': len(sessions),
+            'checked': len(stale),
+            'cached': len(sessions) - len(stale),
+            'valid_sessions': sum(session['valid'] for session in report_sessions),
+            'sessions': report_sessions
+        }
+        report_path = report_path or os.path.join(records_dir, RpaConfig.VALIDATION_REPORT_FILE)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Validation report: {report_path} ({report['valid_sessions']}/{len(sessions)} valid, "
+              f"{report['elapsed_ms']:.0f} ms)")
+        
+        return all_results
+    
     def print_validation_summary(self, validation_results: Dict[str, List[ValidationResult]]):
         """Print a formatted summary of validation results"""
         
@@ -340,10 +600,75 @@ class WorkflowValidator:
         return total_errors == 0
 
 
+def _file_fingerprint(path: Optional[str]) -> Optional[List]:
+    """[path, size, mtime_ns] of a file, or None when missing"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def _load_validation_cache(cache_path: str) -> Dict:
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != VALIDATION_CACHE_VERSION:
+        return {}
+    return cache.get('sessions', {})
+
+
+def _save_validation_cache(cache_path: str, sessions: Dict) -> None:
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump({'version': VALIDATION_CACHE_VERSION, 'sessions': sessions}, f)
+    except OSError as e:
+        print(f"⚠️ Could not write validation cache: {e}")
+
+
+def _validate_session_files(video_path: Optional[str], json_path: Optional[str]) -> Dict:
+    """Validate one discovered session (runs in a worker process); results as plain dicts"""
+    validator = WorkflowValidator()
+    session = RecordingSession(json_path, video_path) if json_path else None
+    checks = []
+    if video_path:
+        checks.append(('video', lambda: validator.validate_video_file(video_path, session)))
+    else:
+        checks.append(('video', lambda: [ValidationResult(
+            is_valid=False, message="No video found for this interaction log", severity='error',
+            suggestion="Check that the recording was made with video enabled")]))
+    if json_path:
+        checks.append(('json', lambda: validator.validate_json_file(session)))
+    else:
+        checks.append(('json', lambda: [ValidationResult(
+            is_valid=False, message="No interaction log found for this video", severity='error',
+            suggestion="The recording may have stopped before the interactions were saved")]))
+    if video_path and json_path:
+        checks.append(('synchronization', lambda: validator.validate_time_synchronization(video_path, session)))
+    
+    results, timings = {}, {}
+    for category, check in checks:
+        started = time.perf_counter()
+        results[category] = [asdict(result) for result in check()]
+        timings[category] = round((time.perf_counter() - started) * 1000, 3)
+    return {'results': results, 'timings_ms': timings}
+
+
 def main():
     """Test the validator with sample files"""
     validator = WorkflowValidator()
     
+    # python workflow_validator.py --dir records [--workers N]
+    if '--dir' in sys.argv:
+        records_dir = sys.argv[sys.argv.index('--dir') + 1]
+        workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else None
+        validator.validate_directory(records_dir, max_workers=workers)
+        return
+    
     # Example validation
     video_path = "records/enhanced_multiscreen_20250803_064201.mp4"
     json_path = "records/enhanced_multiscreen_interactions_20250803_064519.json"